@@ -1,31 +1,124 @@
-from flask import Flask, request, jsonify, render_template
-import pandas as pd
-import numpy as np
-import joblib
+# Imported first so the startup report can time the heavy imports below
+from startup import startup_report
+from flask import Flask, Blueprint, Response, request, jsonify, render_template
 import os
-from datetime import datetime
+import hmac
+import threading
+from feature_encoder import DICT_STP, FeatureEncoder, SOURCES
+from model_backends import make_predictor
+from prediction_cache import PredictionCache
+from micro_batcher import MicroBatcher
+from model_bundle import booster_version, load_bundle, load_tree_bundle, SCHEMA_FILE
+from metrics import MetricsRegistry, NULL_TIMER
+from profiling import RequestProfiler
+from memory import MemoryMonitor, deep_sizeof, model_sizeof
 import warnings
 warnings.filterwarnings('ignore')
 
-app = Flask(__name__)
+api = Blueprint('api', __name__)
 
 # Global variables for model and encoders
 model = None
 dict_air = None
 dict_des = None
 dict_stp = None
+encoder = None
+predictor = None
+model_version = None
+micro_batcher = None
+
+# Native model bundle directory, preferred over the pickles when present ('' disables it)
+MODEL_BUNDLE = os.environ.get('MODEL_BUNDLE', 'model_bundle')
+
+# Scoring backend: 'booster' (Booster.inplace_predict), 'sklearn' (XGBRegressor.predict)
+# or 'numpy' (flattened trees from the model bundle, xgboost is never imported)
+PREDICT_BACKEND = os.environ.get('PREDICT_BACKEND', 'booster')
+# Optional XGBoost thread count for prediction (default: leave as trained)
+PREDICT_NTHREAD = os.environ.get('PREDICT_NTHREAD')
+
+# Prediction cache keyed on encoded features (size 0 disables it)
+prediction_cache = PredictionCache(
+    maxsize=int(os.environ.get('PREDICTION_CACHE_SIZE', 10000)),
+    ttl=float(os.environ.get('PREDICTION_CACHE_TTL', 300)),
+)
+
+# Load the model when the app is created (in the gunicorn master with --preload)
+MODEL_PRELOAD = os.environ.get('MODEL_PRELOAD', '1') == '1'
+_load_lock = threading.Lock()
+
+# Per-stage request timing exported at /metrics; with METRICS_DIR (set by gunicorn.conf.py)
+# every worker's numbers are merged so one scrape returns service-wide totals
+metrics = MetricsRegistry(
+    enabled=os.environ.get('METRICS_ENABLED', '1') == '1',
+    directory=os.environ.get('METRICS_DIR') or None,
+    extras=lambda: metrics_extras(),
+)
+
+# Sampled request profiling (rate 0 disables it; switchable at runtime via /admin/profiling)
+profiler = RequestProfiler(
+    directory=os.environ.get('PROFILE_DIR', 'profiles'),
+    sample_rate=float(os.environ.get('PROFILE_SAMPLE_RATE', 0)),
+    mode=os.environ.get('PROFILE_MODE', 'sampling'),
+    keep=int(os.environ.get('PROFILE_KEEP', 100)),
+)
+
+# Worker memory accounting; past MAX_WORKER_RSS_MB (0 = off) gunicorn workers recycle themselves
+memory_monitor = MemoryMonitor(
+    max_rss_mb=float(os.environ.get('MAX_WORKER_RSS_MB', 0)),
+    tracemalloc_frames=int(os.environ.get('TRACEMALLOC_FRAMES', 0)),
+)
+
+# Score one sample itinerary per process before serving (python app.py, gunicorn post_fork)
+WARMUP = os.environ.get('WARMUP', '1') == '1'
+
+# Token required in X-Admin-Token for /admin endpoints (unset: /admin is disabled)
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+# Micro-batching of concurrent /predict calls (useful with threaded workers)
+MICRO_BATCH_ENABLED = os.environ.get('MICRO_BATCH_ENABLED', '0') == '1'
+MICRO_BATCH_MAX_SIZE = int(os.environ.get('MICRO_BATCH_MAX_SIZE', 64))
+MICRO_BATCH_WAIT_MS = float(os.environ.get('MICRO_BATCH_WAIT_MS', 2.0))
+
+REQUIRED_FIELDS = ['airline', 'source', 'destination', 'duration', 'total_stops', 
+                   'journey_day', 'journey_month', 'journey_year', 'dep_time', 'arrival_time']
+
+# Upper bound on itineraries accepted by /predict/batch in one request
+MAX_BATCH_SIZE = 1000
+
+def load_artifacts():
+    """Load (model, dict_air, dict_des, dict_stp, version), preferring the native bundle"""
+    if MODEL_BUNDLE and os.path.exists(os.path.join(MODEL_BUNDLE, SCHEMA_FILE)):
+        try:
+            loader = load_tree_bundle if PREDICT_BACKEND == 'numpy' else load_bundle
+            with startup_report.phase(f"load bundle {MODEL_BUNDLE}/"):
+                loaded_model, air, des, stp, schema = loader(MODEL_BUNDLE)
+            print(f"Model bundle {schema['model_version']} loaded from {MODEL_BUNDLE}/")
+            return loaded_model, air, des, stp, schema['model_version']
+        except Exception as e:
+            print(f"Could not load model bundle ({e}), falling back to pickle files")
+    
+    # joblib (and xgboost through the pickle) is only imported on this fallback path
+    import joblib
+    
+    def load_pickle(path):
+        with startup_report.phase(f"load {path}"):
+            return joblib.load(path)
+    
+    loaded_model = load_pickle("xgb_best.pkl")
+    air = load_pickle("dict_air.pkl")
+    des = load_pickle("dict_des.pkl")
+    stp = load_pickle("dict_stp.pkl")
+    print("Model loaded successfully from existing files")
+    # Versioned like the bundle, so the same model reports one version (and keeps its cache) whichever loader ran
+    return loaded_model, air, des, stp, booster_version(loaded_model)
 
 def load_model():
     """Load the trained model and encoders"""
-    global model, dict_air, dict_des, dict_stp
+    global model, dict_air, dict_des, dict_stp, encoder, predictor, model_version, micro_batcher
     
     try:
         # Try to load existing model files
-        model = joblib.load("xgb_best.pkl")
-        dict_air = joblib.load("dict_air.pkl")
-        dict_des = joblib.load("dict_des.pkl")
-        dict_stp = joblib.load("dict_stp.pkl")
-        print("Model loaded successfully from existing files")
+        model, dict_air, dict_des, dict_stp, model_version = load_artifacts()
     except FileNotFoundError:
         # If model files don't exist, create dummy data for demonstration
         print("Model files not found. Creating dummy model for demonstration.")
@@ -40,135 +133,386 @@ def load_model():
             'Kolkata': 0, 'Hyderabad': 1, 'Delhi': 2, 'Banglore': 3, 
             'Cochin': 4, 'New Delhi': 5
         }
-        dict_stp = {'non-stop': 0, '1 stop': 1, '2 stops': 2, '3 stops': 3, '4 stops': 4}
-
-def preprocess_input(data):
-    """Preprocess input data for prediction"""
-    # Create a new DataFrame with only the required columns
-    df = pd.DataFrame()
+        dict_stp = dict(DICT_STP)
+        model_version = 'dummy'
     
-    # Encode airline
-    if data['airline'] in dict_air:
-        df['Airline'] = [dict_air[data['airline']]]
-    else:
-        df['Airline'] = [0]  # Default to first airline
+    # Resolve the scoring backend and check the model's feature order once
+    columns = None
+    if model is not None:
+        kwargs = {'nthread': PREDICT_NTHREAD} if PREDICT_BACKEND == 'booster' else {}
+        with startup_report.phase(f"build {PREDICT_BACKEND} predictor"):
+            predictor = make_predictor(model, PREDICT_BACKEND, **kwargs)
+        columns = predictor.feature_names
+        print(f"Using '{predictor.name}' prediction backend")
     
-    # Encode destination
-    if data['destination'] in dict_des:
-        df['Destination'] = [dict_des[data['destination']]]
-    else:
-        df['Destination'] = [0]  # Default to first destination
-    
-    # Encode stops
-    stops_mapping = {0: 'non-stop', 1: '1 stop', 2: '2 stops', 3: '3 stops', 4: '4 stops'}
-    stops_text = stops_mapping.get(data['total_stops'], 'non-stop')
-    df['Total_Stops'] = [dict_stp.get(stops_text, 0)]
-    
-    # Process duration
-    duration_hour, duration_minutes = map(int, data['duration'].split(':'))
-    duration_total_minutes = duration_hour * 60 + duration_minutes
-    df['Duration'] = [duration_total_minutes]
-    df['Duration_hour'] = [duration_hour]
-    df['Duration_minute'] = [duration_minutes]
-    
-    # Process dates
-    df['Journey_day'] = [int(data['journey_day'])]
-    df['Journey_month'] = [int(data['journey_month'])]
-    df['Journey_year'] = [int(data['journey_year'])]
-    
-    # Process times
-    dep_hours, dep_minutes = map(int, data['dep_time'].split(':'))
-    arr_hours, arr_minutes = map(int, data['arrival_time'].split(':'))
-    df['Dep_Time_hour'] = [dep_hours]
-    df['Dep_Time_minute'] = [dep_minutes]
-    df['Arrival_Time_hour'] = [arr_hours]
-    df['Arrival_Time_minute'] = [arr_minutes]
-    
-    # Create source dummy variables
-    source_list = ["Banglore", "Kolkata", "Delhi", "Chennai", "Mumbai"]
-    for cat in source_list:
-        df[f"Source_{cat}"] = [1 if data['source'] == cat else 0]
-    
-    # Ensure all columns are numeric
-    for col in df.columns:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-    
-    # Reorder columns to match training data (exact order from model)
-    expected_columns = [
-        'Airline', 'Destination', 'Duration', 'Total_Stops', 'Journey_day', 
-        'Journey_month', 'Journey_year', 'Dep_Time_hour', 'Dep_Time_minute', 
-        'Arrival_Time_hour', 'Arrival_Time_minute', 'Duration_hour', 'Duration_minute',
-        'Source_Banglore', 'Source_Kolkata', 'Source_Delhi', 'Source_Chennai', 'Source_Mumbai'
-    ]
-    
-    # Create DataFrame with correct column order
-    ordered_df = pd.DataFrame()
-    for col in expected_columns:
-        if col in df.columns:
-            ordered_df[col] = df[col]
-        else:
-            ordered_df[col] = [0]  # Default value for missing columns
+    # Build the request encoder once from the loaded dicts, in model column order
+    with startup_report.phase("build feature encoder"):
+        encoder = FeatureEncoder(dict_air, dict_des, dict_stp, columns=columns)
     
-    return ordered_df
+    # Cached prices are only valid for the model that produced them
+    prediction_cache.bind(model_version)
+    
+    if MICRO_BATCH_ENABLED and predictor is not None:
+        micro_batcher = MicroBatcher(predictor.predict, encoder.n_features,
+                                     max_batch_size=MICRO_BATCH_MAX_SIZE,
+                                     max_wait_ms=MICRO_BATCH_WAIT_MS)
+
+def validate_input(data):
+    """Return an error message if the input is missing required fields"""
+    if not isinstance(data, dict):
+        return 'Expected a JSON object'
+    for field in REQUIRED_FIELDS:
+        if field not in data:
+            return f'Missing required field: {field}'
+    return None
+
+def dummy_prediction(data):
+    """Dummy prediction for demonstration when no model is loaded"""
+    base_price = 5000
+    airline_multiplier = dict_air.get(data['airline'], 3) * 200
+    destination_multiplier = dict_des.get(data['destination'], 2) * 300
+    duration_multiplier = int(data['duration'].split(':')[0]) * 100
+    stops_multiplier = data['total_stops'] * 500
+    
+    return base_price + airline_multiplier + destination_multiplier + duration_multiplier + stops_multiplier
+
+def preprocess_input(data):
+    """Preprocess input data for prediction into a (1, n_features) float32 row"""
+    return encoder.encode(data)
 
-@app.route('/')
+def price_result(index, prediction):
+    """Successful row of a /predict/batch response"""
+    return {
+        'index': index,
+        'predicted_price': round(float(prediction), 2),
+        'status': 'success'
+    }
+
+@api.route('/')
 def index():
     """Serve the main page"""
     return render_template('index.html')
 
-@app.route('/predict', methods=['POST'])
-def predict():
-    """Handle prediction requests"""
+def predict_one(data, timer=NULL_TIMER):
+    """Price one itinerary, returning (response payload, HTTP status)"""
+    # Validate required fields
+    error = validate_input(data)
+    timer.mark('validate')
+    if error:
+        return {'error': error}, 400
+    
+    # Make prediction, reusing the cached price for identical encoded features
+    if predictor is not None:
+        features = encoder.features(data)
+        timer.mark('preprocess')
+        prediction = prediction_cache.get(features)
+        timer.mark('cache')
+        if prediction is None:
+            processed_data = encoder.write(features)
+            if micro_batcher is not None:
+                prediction = micro_batcher.predict(processed_data[0])
+            else:
+                prediction = float(predictor.predict(processed_data)[0])
+            prediction_cache.put(features, prediction)
+            timer.mark('predict')
+    else:
+        prediction = dummy_prediction(data)
+        timer.mark('predict')
+    
+    return {
+        'predicted_price': round(float(prediction), 2),
+        'status': 'success'
+    }, 200
+
+def predict_many(items, timer=NULL_TIMER):
+    """Price a list of itineraries with one model call, returning (response payload, HTTP status)"""
+    if not isinstance(items, list):
+        return {'error': 'Expected a JSON array of itineraries'}, 400
+    if len(items) > MAX_BATCH_SIZE:
+        return {'error': f'Batch too large: {len(items)} > {MAX_BATCH_SIZE}'}, 400
+    
+    # Encode every valid row into one matrix, keeping per-row errors by position
+    results = [None] * len(items)
+    matrix = encoder.empty(len(items))
+    valid_indices = []
+    pending = []
+    for i, data in enumerate(items):
+        error = validate_input(data)
+        if error is None:
+            try:
+                if predictor is None:
+                    prediction = dummy_prediction(data)
+                else:
+                    features = encoder.features(data)
+                    prediction = prediction_cache.get(features)
+                    if prediction is None:
+                        encoder.write(features, out=matrix[len(pending)])
+                        pending.append((i, features))
+                valid_indices.append(i)
+                if prediction is not None:
+                    results[i] = price_result(i, prediction)
+                continue
+            except Exception as e:
+                error = str(e)
+        results[i] = {'index': i, 'error': error, 'status': 'error'}
+    timer.mark('preprocess')
+    
+    # Score all cache misses in one model call
+    if pending:
+        predictions = predictor.predict(matrix[:len(pending)])
+        for (i, features), prediction in zip(pending, predictions):
+            prediction = float(prediction)
+            prediction_cache.put(features, prediction)
+            results[i] = price_result(i, prediction)
+        timer.mark('predict')
+    
+    return {
+        'predictions': results,
+        'count': len(valid_indices),
+        'errors': len(items) - len(valid_indices),
+        'status': 'success'
+    }, 200
+
+def predict_raw(records, timer=NULL_TIMER):
+    """Price raw records in the Data_Train.xlsx format, returning (response payload, HTTP status)
+
+    Records are parsed by the same vectorized features module used for
+    training; pandas is only imported by the first raw request.
+    """
+    if isinstance(records, dict):
+        records = [records]
+    if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+        return {'error': 'Expected a JSON object or array of raw records'}, 400
+    if len(records) > MAX_BATCH_SIZE:
+        return {'error': f'Batch too large: {len(records)} > {MAX_BATCH_SIZE}'}, 400
+    if predictor is None:
+        return {'error': 'Raw records can only be scored with a trained model'}, 503
+    
+    import pandas as pd
+    import features
+    
+    results = []
+    if records:
+        try:
+            parsed, valid = features.parse_raw(pd.DataFrame.from_records(records))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        matrix = features.encode_features(parsed[valid], dict_air, dict_des, dict_stp,
+                                          columns=encoder.columns).to_numpy(dtype='float32')
+        timer.mark('preprocess')
+        predictions = iter(predictor.predict(matrix) if len(matrix) else [])
+        timer.mark('predict')
+        for i, ok in enumerate(valid):
+            if ok:
+                results.append(price_result(i, next(predictions)))
+            else:
+                results.append({'index': i, 'error': 'Missing, unparseable or out-of-range fields', 'status': 'error'})
+    
+    count = sum(result['status'] == 'success' for result in results)
+    return {
+        'predictions': results,
+        'count': count,
+        'errors': len(results) - count,
+        'status': 'success'
+    }, 200
+
+def score(endpoint, func):
+    """Parse, score and serialize one request, recording per-stage metrics and sampled profiles"""
+    timer = metrics.start_request(endpoint)
+    profile = None
+    status = 500
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ['airline', 'source', 'destination', 'duration', 'total_stops', 
-                          'journey_day', 'journey_month', 'journey_year', 'dep_time', 'arrival_time']
-        
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
-        
-        # Preprocess the input
-        processed_data = preprocess_input(data)
-        
-        # Make prediction
-        if model is not None:
-            prediction = model.predict(processed_data)[0]
-        else:
-            # Dummy prediction for demonstration
-            base_price = 5000
-            airline_multiplier = dict_air.get(data['airline'], 3) * 200
-            destination_multiplier = dict_des.get(data['destination'], 2) * 300
-            duration_multiplier = int(data['duration'].split(':')[0]) * 100
-            stops_multiplier = data['total_stops'] * 500
-            
-            prediction = base_price + airline_multiplier + destination_multiplier + duration_multiplier + stops_multiplier
-        
-        return jsonify({
-            'predicted_price': float(round(prediction, 2)),
-            'status': 'success'
-        })
-        
+        profile = profiler.start(endpoint)
+        body = request.get_json()
+        timer.mark('parse')
+        payload, status = func(body, timer)
+        if status == 200 and startup_report.first_prediction is None:
+            startup_report.record_first_prediction()
+        response = jsonify(payload)
+        timer.mark('serialize')
+        return response, status
     except Exception as e:
+        status = 500
         return jsonify({'error': str(e)}), 500
+    finally:
+        metrics.end_request(timer, status)
+        if profile is not None:
+            profiler.finish(profile)
+
+@api.route('/predict', methods=['POST'])
+def predict():
+    """Handle prediction requests"""
+    return score('predict', predict_one)
+
+@api.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """Handle batch prediction requests with a single model call"""
+    return score('predict_batch', predict_many)
 
-@app.route('/airlines')
+@api.route('/predict/raw', methods=['POST'])
+def predict_raw_records():
+    """Handle prediction requests for raw Data_Train-format records"""
+    return score('predict_raw', predict_raw)
+
+@api.route('/airlines')
 def get_airlines():
     """Get list of available airlines"""
     return jsonify(list(dict_air.keys()))
 
-@app.route('/destinations')
+@api.route('/destinations')
 def get_destinations():
     """Get list of available destinations"""
     return jsonify(list(dict_des.keys()))
 
-@app.route('/sources')
+@api.route('/sources')
 def get_sources():
     """Get list of available source cities"""
-    return jsonify(["Banglore", "Kolkata", "Delhi", "Chennai", "Mumbai"])
+    return jsonify(SOURCES)
+
+@api.route('/cache/stats')
+def get_cache_stats():
+    """Get prediction cache hit/miss/eviction counters"""
+    return jsonify(prediction_cache.stats())
+
+@api.route('/batcher/stats')
+def get_batcher_stats():
+    """Get micro-batcher batch-size histogram and queueing delay"""
+    if micro_batcher is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(micro_batcher.stats(), enabled=True))
+
+@api.route('/startup')
+def get_startup():
+    """Boot-time breakdown of this process: interpreter, imports, artifact loads, first prediction"""
+    return jsonify(startup_report.as_dict())
+
+def metrics_extras():
+    """Model and cache numbers reported next to this process's request metrics"""
+    return {
+        'model_version': model_version,
+        'backend': predictor.name if predictor is not None else 'dummy',
+        'cache_stats': prediction_cache.stats(),
+        'batcher_stats': micro_batcher.stats() if micro_batcher is not None else None,
+    }
+
+@api.route('/metrics')
+def get_metrics():
+    """Prometheus metrics for the service (all workers) or, without METRICS_DIR, this process"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+def admin_denied():
+    """Error response if this request may not use the /admin endpoints, else None
+
+    Without ADMIN_TOKEN the endpoints do not exist: behind a local reverse
+    proxy every client looks like loopback, so the client address proves
+    nothing.
+    """
+    if not ADMIN_TOKEN:
+        return jsonify({'error': 'Not found'}), 404
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', '').encode(), ADMIN_TOKEN.encode()):
+        return jsonify({'error': 'Forbidden'}), 403
+    return None
+
+@api.route('/admin/profiling', methods=['GET', 'POST'])
+def admin_profiling():
+    """Show or change the request profiler settings (JSON body: sample_rate, mode)"""
+    denied = admin_denied()
+    if denied is not None:
+        return denied
+    if request.method == 'POST':
+        settings = request.get_json(silent=True) or {}
+        try:
+            profiler.configure(sample_rate=settings.get('sample_rate'), mode=settings.get('mode'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    return jsonify(profiler.stats())
+
+def component_sizes():
+    """Approximate bytes held by the model, encoders and caches in this process"""
+    sizes = {
+        'model': model_sizeof(model) if model is not None else 0,
+        'dict_air': deep_sizeof(dict_air),
+        'dict_des': deep_sizeof(dict_des),
+        'dict_stp': deep_sizeof(dict_stp),
+        'feature_encoder': deep_sizeof(encoder),
+        'prediction_cache': deep_sizeof(prediction_cache._entries),
+        'metrics': deep_sizeof(metrics._histograms),
+        'profiler_stacks': deep_sizeof(profiler.stacks),
+    }
+    if micro_batcher is not None:
+        sizes['micro_batcher'] = deep_sizeof(micro_batcher.batch_sizes)
+    return {name: round(size / 1024, 1) for name, size in sizes.items()}
+
+@api.route('/admin/memory', methods=['GET', 'POST'])
+def admin_memory():
+    """RSS of every worker plus a detailed report for this one; POST {"action": "baseline"|"stop"} controls tracemalloc"""
+    denied = admin_denied()
+    if denied is not None:
+        return denied
+    if request.method == 'POST':
+        action = (request.get_json(silent=True) or {}).get('action')
+        if action == 'baseline':
+            memory_monitor.take_baseline()
+        elif action == 'stop':
+            memory_monitor.stop_tracing()
+        else:
+            return jsonify({'error': 'action must be "baseline" or "stop"'}), 400
+    report = memory_monitor.report(top=request.args.get('top', 10, type=int))
+    report['components_kb'] = component_sizes()
+    report['prediction_cache_entries'] = prediction_cache.stats()['size']
+    return jsonify(report)
+
+# Scored once per process by warmup()
+WARMUP_PAYLOAD = {
+    'airline': 'IndiGo', 'source': 'Delhi', 'destination': 'Cochin', 'duration': '02:50',
+    'total_stops': 0, 'journey_day': 24, 'journey_month': 3, 'journey_year': 2024,
+    'dep_time': '22:20', 'arrival_time': '01:10',
+}
+
+def warmup():
+    """Score one itinerary so the first real request does not pay for lazy initialization
+
+    Run it in each serving process after any fork (XGBoost's thread pool
+    must not be started in the gunicorn master).
+    """
+    ensure_model_loaded()
+    with startup_report.phase("warmup prediction", kind='prediction'):
+        payload, status = predict_one(WARMUP_PAYLOAD)
+    if status == 200:
+        startup_report.record_first_prediction('warmup')
+
+def ensure_model_loaded():
+    """Load the model once per process if it has not been loaded yet"""
+    if encoder is None:
+        with _load_lock:
+            if encoder is None:
+                load_model()
+
+def create_app(preload=None):
+    """Create the Flask app
+
+    With preload (the default, see MODEL_PRELOAD) the model and encoders are
+    loaded here. Under `gunicorn --preload` that happens once in the master
+    and the forked workers share those pages copy-on-write. Otherwise each
+    process loads them on its first request.
+    """
+    if preload is None:
+        preload = MODEL_PRELOAD
+    
+    flask_app = Flask(__name__)
+    flask_app.register_blueprint(api)
+    flask_app.teardown_request(lambda exc: memory_monitor.check())
+    
+    if preload:
+        ensure_model_loaded()
+    else:
+        flask_app.before_request(ensure_model_loaded)
+    
+    return flask_app
+
+app = create_app()
 
 if __name__ == '__main__':
-    load_model()
+    if WARMUP:
+        warmup()
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,168 @@
+"""
+Asyncio entry point for the Flight Price Prediction API
+Serves the same /predict, /predict/batch, /predict/raw, /airlines,
+/destinations, /sources, /metrics and /startup contract as app.py with
+aiohttp, with the same request profiling, first-prediction timing and
+MAX_WORKER_RSS_MB recycling. The /admin, /cache/stats and /batcher/stats
+endpoints are Flask-only. Connections are handled on the event loop; model
+scoring (and the file reads behind /metrics) runs on a bounded thread pool
+so slow or idle clients never tie up a worker. At most ASYNC_MAX_PENDING
+scoring calls are admitted per process (running or waiting for a thread);
+past that, requests are answered 503 with Retry-After instead of queueing
+without bound.
+
+Usage: python async_app.py [--port 8080]
+       gunicorn -c gunicorn.conf.py async_app:web_app --bind 0.0.0.0:8080 --worker-class aiohttp.GunicornWebWorker
+
+Under gunicorn, pass -c gunicorn.conf.py: it preloads the model in the
+master, sets up METRICS_DIR so /metrics covers every worker, and enables
+memory recycling.
+"""
+
+import argparse
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+import app as flight_app
+
+# Threads that run scoring, and how many scoring calls may be admitted (running or waiting)
+ASYNC_SCORING_THREADS = int(os.environ.get('ASYNC_SCORING_THREADS', os.cpu_count() or 1))
+ASYNC_MAX_PENDING = int(os.environ.get('ASYNC_MAX_PENDING', 256))
+# Seconds a rejected client is asked to wait before retrying
+RETRY_AFTER_SECONDS = 1
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'index.html')
+
+class ScoringQueueFull(Exception):
+    pass
+
+async def run_scoring(request, func, *args):
+    """Run a blocking scoring call on the executor; raises ScoringQueueFull when no slot is free"""
+    pending = request.app['pending']
+    # Checked and acquired without yielding to the loop, so nothing can take the slot in between
+    if pending.locked():
+        raise ScoringQueueFull()
+    async with pending:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(request.app['executor'], func, *args)
+
+def profiled(endpoint, func, body, timer):
+    """func(body, timer), profiled on the scoring thread when the request is sampled"""
+    # Started here rather than on the loop: the sampler and cProfile follow the calling thread
+    profile = flight_app.profiler.start(endpoint)
+    try:
+        return func(body, timer)
+    finally:
+        if profile is not None:
+            flight_app.profiler.finish(profile)
+
+async def read_json(request):
+    """Parse the request body, answering 400 if it is not valid JSON"""
+    try:
+        return await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text='{"error": "Invalid JSON body"}', content_type='application/json')
+
+async def index(request):
+    """Serve the main page"""
+    return web.FileResponse(TEMPLATE_PATH)
+
+async def score(request, endpoint, func):
+    """Parse, score and serialize one request, recording per-stage metrics"""
+    timer = flight_app.metrics.start_request(endpoint)
+    status = 400
+    try:
+        body = await read_json(request)
+        timer.mark('parse')
+        headers = None
+        try:
+            payload, status = await run_scoring(request, profiled, endpoint, func, body, timer)
+            if status == 200 and flight_app.startup_report.first_prediction is None:
+                flight_app.startup_report.record_first_prediction()
+        except ScoringQueueFull:
+            payload, status = {'error': 'Server busy, retry shortly'}, 503
+            headers = {'Retry-After': str(RETRY_AFTER_SECONDS)}
+        except Exception as e:
+            payload, status = {'error': str(e)}, 500
+        response = web.json_response(payload, status=status, headers=headers)
+        timer.mark('serialize')
+        return response
+    finally:
+        flight_app.metrics.end_request(timer, status)
+        flight_app.memory_monitor.check()
+
+async def predict(request):
+    """Handle prediction requests"""
+    return await score(request, 'predict', flight_app.predict_one)
+
+async def predict_batch(request):
+    """Handle batch prediction requests with a single model call"""
+    return await score(request, 'predict_batch', flight_app.predict_many)
+
+async def predict_raw(request):
+    """Handle prediction requests for raw Data_Train-format records"""
+    return await score(request, 'predict_raw', flight_app.predict_raw)
+
+async def get_airlines(request):
+    """Get list of available airlines"""
+    return web.json_response(list(flight_app.dict_air.keys()))
+
+async def get_destinations(request):
+    """Get list of available destinations"""
+    return web.json_response(list(flight_app.dict_des.keys()))
+
+async def get_sources(request):
+    """Get list of available source cities"""
+    return web.json_response(flight_app.SOURCES)
+
+async def get_metrics(request):
+    """Prometheus metrics for the service (all workers) or, without METRICS_DIR, this process"""
+    # With METRICS_DIR, rendering reads every worker's snapshot file: keep that off the loop
+    loop = asyncio.get_running_loop()
+    text = await loop.run_in_executor(request.app['executor'], flight_app.metrics.render)
+    return web.Response(text=text, content_type='text/plain')
+
+async def get_startup(request):
+    """Boot-time breakdown of this process"""
+    return web.json_response(flight_app.startup_report.as_dict())
+
+async def start_executor(web_app):
+    # Created per process on startup so forked workers never share threads
+    web_app['executor'] = ThreadPoolExecutor(max_workers=ASYNC_SCORING_THREADS,
+                                             thread_name_prefix='scoring')
+    web_app['pending'] = asyncio.Semaphore(ASYNC_MAX_PENDING)
+    if flight_app.WARMUP:
+        await asyncio.get_running_loop().run_in_executor(web_app['executor'], flight_app.warmup)
+
+async def stop_executor(web_app):
+    web_app['executor'].shutdown(wait=False)
+
+def create_web_app():
+    """Create the aiohttp application, loading the model through app.py"""
+    flight_app.ensure_model_loaded()
+
+    web_app = web.Application()
+    web_app.router.add_get('/', index)
+    web_app.router.add_post('/predict', predict)
+    web_app.router.add_post('/predict/batch', predict_batch)
+    web_app.router.add_post('/predict/raw', predict_raw)
+    web_app.router.add_get('/airlines', get_airlines)
+    web_app.router.add_get('/destinations', get_destinations)
+    web_app.router.add_get('/sources', get_sources)
+    web_app.router.add_get('/metrics', get_metrics)
+    web_app.router.add_get('/startup', get_startup)
+    web_app.on_startup.append(start_executor)
+    web_app.on_cleanup.append(stop_executor)
+    return web_app
+
+web_app = create_web_app()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Asyncio Flight Price Prediction server")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 8080)))
+    args = parser.parse_args()
+    web.run_app(web_app, host=args.host, port=args.port)
@@ -0,0 +1,4 @@
+"""
+Benchmarks for the Flight Price Prediction System
+Run from the repository root, e.g. `python -m benchmarks.preprocess`
+"""
@@ -0,0 +1,167 @@
+"""
+Latency/throughput benchmark suite for the prediction API
+Drives the Flask app in-process through its test client, or a locally
+launched server over keep-alive HTTP, through a fixed set of scenarios:
+the list endpoints, /predict (uncached and cached) and /predict/batch at
+several batch sizes. Reports p50/p95/p99 latency, requests/s and, in
+process, the peak Python memory allocated per request. Results are
+written as JSON tagged with the git commit and model version.
+
+Usage: python -m benchmarks.api [--mode inprocess|server] [--server gunicorn|flask|aiohttp]
+                                [--requests N] [--batch-sizes 1 10 100 1000] [--output FILE]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import time
+import tracemalloc
+
+# Score every request unless a scenario turns the cache on explicitly
+os.environ.setdefault('PREDICTION_CACHE_SIZE', '0')
+
+from benchmarks.common import (latency_summary, launch_server, run_metadata, sample_payloads,
+                               write_results)
+
+def build_scenarios(batch_sizes, cached=True, n_payloads=1000):
+    """(name, method, path, list of bodies) for every scenario"""
+    payloads = sample_payloads(n_payloads)
+    scenarios = [
+        ('airlines', 'GET', '/airlines', [None]),
+        ('destinations', 'GET', '/destinations', [None]),
+        ('sources', 'GET', '/sources', [None]),
+        ('predict', 'POST', '/predict', payloads),
+    ]
+    if cached:
+        scenarios.append(('predict_cached', 'POST', '/predict', payloads[:1]))
+    for size in batch_sizes:
+        batches = [payloads[i:i + size] for i in range(0, max(len(payloads) - size, 0) + 1, max(size, 1))]
+        scenarios.append((f'predict_batch_{size}', 'POST', '/predict/batch', batches))
+    return scenarios
+
+class InProcessDriver:
+    """Send requests through the Flask test client"""
+
+    def __init__(self):
+        import app
+        from prediction_cache import PredictionCache
+
+        self.app = app
+        self.client = app.app.test_client()
+        self._no_cache = app.prediction_cache
+        self._cache = PredictionCache(maxsize=10000, ttl=3600)
+        self._cache.bind(app.model_version)
+
+    def use_cache(self, enabled):
+        self.app.prediction_cache = self._cache if enabled else self._no_cache
+
+    def request(self, method, path, body):
+        if method == 'GET':
+            response = self.client.get(path)
+        else:
+            response = self.client.post(path, json=body)
+        return response.status_code
+
+class ServerDriver:
+    """Send requests to a running server over one keep-alive connection"""
+
+    def __init__(self, base_url):
+        host, port = base_url.rsplit('//', 1)[1].split(':')
+        self.host, self.port = host, int(port)
+        self.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+
+    def use_cache(self, enabled):
+        pass
+
+    def request(self, method, path, body):
+        headers = {}
+        data = None
+        if body is not None:
+            data = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        try:
+            self.connection.request(method, path, body=data, headers=headers)
+            response = self.connection.getresponse()
+            response.read()
+        except (http.client.HTTPException, OSError):
+            # Sync gunicorn workers close the connection after every response
+            self.connection.close()
+            self.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            self.connection.request(method, path, body=data, headers=headers)
+            response = self.connection.getresponse()
+            response.read()
+        if response.getheader('Connection', '').lower() == 'close':
+            self.connection.close()
+        return response.status
+
+def run_scenario(driver, method, path, bodies, n_requests, measure_allocations):
+    """Time n_requests sequential requests cycling through bodies"""
+    for body in bodies[:5]:
+        driver.request(method, path, body)
+
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for i in range(n_requests):
+        start = time.perf_counter()
+        status = driver.request(method, path, bodies[i % len(bodies)])
+        latencies.append(time.perf_counter() - start)
+        errors += status != 200
+    elapsed = time.perf_counter() - started
+
+    result = latency_summary(latencies)
+    result['requests_per_s'] = round(n_requests / elapsed, 1)
+    result['errors'] = errors
+
+    if measure_allocations:
+        # Separate pass: tracing slows every allocation down and would skew the timings
+        peaks = []
+        tracemalloc.start()
+        for i in range(min(n_requests, 200)):
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            driver.request(method, path, bodies[i % len(bodies)])
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        tracemalloc.stop()
+        result['alloc_peak_kb_per_request'] = round(sum(peaks) / len(peaks) / 1024, 2)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=['inprocess', 'server'], default='inprocess')
+    parser.add_argument('--server', choices=['gunicorn', 'flask', 'aiohttp'], default='gunicorn')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--requests', type=int, default=500, help='Requests per scenario')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--output', help='JSON output path (default: benchmark_results/api_<mode>_<commit>.json)')
+    args = parser.parse_args()
+
+    # A launched server keeps its cache off, so the cached scenario only runs in process
+    scenarios = build_scenarios(args.batch_sizes, cached=args.mode == 'inprocess')
+    results = {}
+
+    def run_all(driver):
+        print(f"{'scenario':<22} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'alloc KB':>9}")
+        for name, method, path, bodies in scenarios:
+            driver.use_cache(name == 'predict_cached')
+            row = run_scenario(driver, method, path, bodies, args.requests, args.mode == 'inprocess')
+            results[name] = row
+            print(f"{name:<22} {row['requests_per_s']:>9} {row['p50_ms']:>9} {row['p95_ms']:>9} "
+                  f"{row['p99_ms']:>9} {row.get('alloc_peak_kb_per_request', '-'):>9}")
+
+    if args.mode == 'inprocess':
+        run_all(InProcessDriver())
+        meta = run_metadata(mode='inprocess')
+    else:
+        # The server process reads the same PREDICTION_CACHE_SIZE=0 from the environment
+        with launch_server(args.server, workers=args.workers) as base_url:
+            run_all(ServerDriver(base_url))
+        meta = run_metadata(mode='server', server=args.server, workers=args.workers)
+
+    meta['requests_per_scenario'] = args.requests
+    path = write_results({'meta': meta, 'results': results}, f"api_{args.mode}", args.output)
+    print(f"\nResults written to {path}")
+
+if __name__ == "__main__":
+    main()
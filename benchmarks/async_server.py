@@ -0,0 +1,117 @@
+"""
+Benchmark the asyncio server against the gunicorn sync-worker setup
+Starts `async_app:web_app` (aiohttp workers, same gunicorn.conf.py) and the run_production.py style
+`gunicorn -c gunicorn.conf.py app:app` with the same worker count, then
+drives each with many concurrent keep-alive connections. --slow-ms makes
+every client pause between sending its headers and its body, like a slow
+client behind an edge proxy.
+
+Usage: python -m benchmarks.async_server [--connections 16 64 256 1024]
+                                         [--duration 10] [--workers 4] [--slow-ms 0]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks.common import latency_summary, launch_server, sample_payloads
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response, returning (status, keep_alive)"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed by server")
+    status = int(status_line.split()[1])
+    length = 0
+    keep_alive = True
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name = name.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'connection' and value.strip().lower() == 'close':
+            keep_alive = False
+    await reader.readexactly(length)
+    return status, keep_alive
+
+async def client(host, port, bodies, deadline, slow, results):
+    """One connection sending /predict requests back to back until the deadline"""
+    reader = writer = None
+    rng = random.Random()
+    while time.monotonic() < deadline:
+        body = rng.choice(bodies)
+        head = (f"POST /predict HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n").encode()
+        start = time.monotonic()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(head)
+            if slow:
+                await writer.drain()
+                await asyncio.sleep(slow)
+            writer.write(body)
+            status, keep_alive = await asyncio.wait_for(read_response(reader), timeout=30)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError):
+            results['errors'] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            continue
+        if status == 200:
+            results['latencies'].append(time.monotonic() - start)
+        else:
+            results['errors'] += 1
+        if not keep_alive:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+async def drive(base_url, connections, duration, slow_ms, bodies):
+    host, port = base_url.rsplit('//', 1)[1].split(':')
+    results = {'latencies': [], 'errors': 0}
+    deadline = time.monotonic() + duration
+    started = time.monotonic()
+    await asyncio.gather(*[client(host, int(port), bodies, deadline, slow_ms / 1000.0, results)
+                           for _ in range(connections)])
+    elapsed = time.monotonic() - started
+    summary = latency_summary(results['latencies'])
+    summary['requests_per_s'] = round(len(results['latencies']) / elapsed, 1)
+    summary['errors'] = results['errors']
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--connections', type=int, nargs='+', default=[16, 64, 256, 1024])
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per run')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--slow-ms', type=float, default=0.0)
+    parser.add_argument('--servers', nargs='+', default=['gunicorn', 'aiohttp'])
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    bodies = [json.dumps(payload).encode() for payload in sample_payloads(500)]
+    # Score every request so the cache does not hide the model cost
+    env = {'PREDICTION_CACHE_SIZE': '0'}
+    results = {}
+    print(f"{'server':<10} {'conns':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for kind in args.servers:
+        with launch_server(kind, workers=args.workers, env=env) as base_url:
+            for connections in args.connections:
+                row = asyncio.run(drive(base_url, connections, args.duration, args.slow_ms, bodies))
+                results[f"{kind}/{connections}"] = row
+                print(f"{kind:<10} {connections:>6} {row['requests_per_s']:>9} {row.get('p50_ms', 0):>9} "
+                      f"{row.get('p95_ms', 0):>9} {row.get('p99_ms', 0):>9} {row['errors']:>7}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'workers': args.workers, 'slow_ms': args.slow_ms, 'results': results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Cold-start benchmark for model artifact loading
+Loads the model and encoders in fresh interpreters, once from the four
+pickles and once from the native bundle, and reports import, load and
+whole-process times.
+
+Usage: python -m benchmarks.cold_start [--runs N]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+LOADERS = {
+    'pickle': """
+import joblib
+model = joblib.load("xgb_best.pkl")
+dict_air = joblib.load("dict_air.pkl")
+dict_des = joblib.load("dict_des.pkl")
+dict_stp = joblib.load("dict_stp.pkl")
+""",
+    'bundle': """
+from model_bundle import load_bundle
+model, dict_air, dict_des, dict_stp, schema = load_bundle()
+""",
+}
+
+CHILD = """
+import json, time, warnings
+warnings.filterwarnings('ignore')
+start = time.perf_counter()
+import xgboost
+imported = time.perf_counter()
+{loader}
+loaded = time.perf_counter()
+print(json.dumps({{'import_s': imported - start, 'load_s': loaded - imported}}))
+"""
+
+def run_once(loader):
+    """Run one loader in a fresh interpreter, returning its timings"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', CHILD.format(loader=loader)],
+                            capture_output=True, text=True, check=True)
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['process_s'] = time.perf_counter() - start
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join('model_bundle', 'schema.json')):
+        sys.exit("No model bundle found; run `python model_bundle.py` first")
+
+    results = {}
+    print(f"{'format':<8} {'import xgboost':>15} {'load artifacts':>15} {'process total':>15}   (median of {args.runs})")
+    for name, loader in LOADERS.items():
+        runs = [run_once(loader) for _ in range(args.runs)]
+        results[name] = {key: float(np.median([r[key] for r in runs])) for key in runs[0]}
+        row = results[name]
+        print(f"{name:<8} {row['import_s'] * 1e3:12.1f} ms {row['load_s'] * 1e3:12.1f} ms {row['process_s'] * 1e3:12.1f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
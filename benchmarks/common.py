@@ -0,0 +1,152 @@
+"""
+Shared helpers for the benchmarks: launching a local server, building
+request payloads and summarising latencies.
+"""
+
+import contextlib
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime, timezone
+
+import numpy as np
+
+from feature_encoder import SOURCES
+from model_bundle import BUNDLE_DIR, SCHEMA_FILE, booster_version, read_schema
+
+# Default directory for JSON benchmark results
+RESULTS_DIR = "benchmark_results"
+
+AIRLINES = ['Trujet', 'SpiceJet', 'Air Asia', 'IndiGo', 'GoAir', 'Vistara', 'Vistara Premium economy',
+            'Air India', 'Multiple carriers', 'Multiple carriers Premium economy', 'Jet Airways',
+            'Jet Airways Business']
+DESTINATIONS = ['Kolkata', 'Hyderabad', 'Delhi', 'Banglore', 'Cochin', 'New Delhi']
+
+def sample_payload(rng, airlines=AIRLINES, sources=SOURCES, destinations=DESTINATIONS):
+    """Random valid /predict payload drawn from the served categories"""
+    dep_hour, dep_minute = rng.randint(0, 23), rng.choice(range(0, 60, 5))
+    hours, minutes = rng.randint(1, 20), rng.choice(range(0, 60, 5))
+    arrival = (dep_hour * 60 + dep_minute + hours * 60 + minutes) % (24 * 60)
+    return {
+        'airline': rng.choice(airlines),
+        'source': rng.choice(sources),
+        'destination': rng.choice(destinations),
+        'duration': f"{hours:02d}:{minutes:02d}",
+        'total_stops': rng.randint(0, 4),
+        'journey_day': rng.randint(1, 28),
+        'journey_month': rng.randint(1, 12),
+        'journey_year': rng.choice([2024, 2025]),
+        'dep_time': f"{dep_hour:02d}:{dep_minute:02d}",
+        'arrival_time': f"{arrival // 60:02d}:{arrival % 60:02d}",
+    }
+
+def sample_payloads(n, seed=42, **categories):
+    rng = random.Random(seed)
+    return [sample_payload(rng, **categories) for _ in range(n)]
+
+def latency_summary(latencies):
+    """p50/p95/p99/mean/max in milliseconds for a list of latencies in seconds"""
+    if len(latencies) == 0:
+        return {'count': 0}
+    ms = np.asarray(latencies, dtype=np.float64) * 1e3
+    return {
+        'count': int(len(ms)),
+        'p50_ms': round(float(np.percentile(ms, 50)), 3),
+        'p95_ms': round(float(np.percentile(ms, 95)), 3),
+        'p99_ms': round(float(np.percentile(ms, 99)), 3),
+        'mean_ms': round(float(ms.mean()), 3),
+        'max_ms': round(float(ms.max()), 3),
+    }
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_for_server(base_url, timeout=60.0, process=None):
+    """Poll /sources until the server answers"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"{base_url}/sources", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"Server at {base_url} did not start within {timeout:.0f}s")
+
+# Commands that serve the app on {port}; {workers} is the process count
+SERVERS = {
+    'flask': [sys.executable, '-c', 'import app; app.app.run(host="127.0.0.1", port={port}, threaded=True)'],
+    'gunicorn': ['gunicorn', '-c', 'gunicorn.conf.py', '--bind', '127.0.0.1:{port}',
+                 '--workers', '{workers}', 'app:app'],
+    'aiohttp': ['gunicorn', '-c', 'gunicorn.conf.py', 'async_app:web_app', '--bind', '127.0.0.1:{port}', '--workers', '{workers}',
+                '--worker-class', 'aiohttp.GunicornWebWorker'],
+}
+
+@contextlib.contextmanager
+def launch_server(kind='gunicorn', workers=4, env=None, port=None):
+    """Start one of SERVERS locally and yield its base URL"""
+    port = port or free_port()
+    command = [part.format(port=port, workers=workers) for part in SERVERS[kind]]
+    process = subprocess.Popen(command, env=dict(os.environ, **(env or {})),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_for_server(base_url, process=process)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def git_commit():
+    """Short commit hash of the working tree, with a -dirty suffix for local changes"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f"{commit}-dirty" if dirty else commit
+
+def model_version():
+    """Version of the model the server would load (bundle first, then the pickle)"""
+    if os.path.exists(os.path.join(BUNDLE_DIR, SCHEMA_FILE)):
+        return read_schema()['model_version']
+    if os.path.exists("xgb_best.pkl"):
+        import joblib
+        return booster_version(joblib.load("xgb_best.pkl"))
+    return 'dummy'
+
+def run_metadata(**extra):
+    """Context recorded with every benchmark result file"""
+    return dict({
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'model_version': model_version(),
+        'predict_backend': os.environ.get('PREDICT_BACKEND', 'booster'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }, **extra)
+
+def write_results(results, name, output=None):
+    """Write results as JSON, by default to benchmark_results/<name>_<commit>.json"""
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{name}_{results['meta']['git_commit']}.json")
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    return output
@@ -0,0 +1,156 @@
+"""
+Benchmark for raw-record feature engineering
+Compares the project_flight notebook's cells (row-wise apply, eval'd
+durations, format-less pd.to_datetime) with features.parse_raw on
+synthetic records in the Data_Train.xlsx format, checks that both produce
+the same features and reports microseconds per row at each size so the
+scaling is visible.
+
+Usage: python -m benchmarks.features [--sizes 1000 10683 100000 1000000] [--legacy-max 100000]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import features
+from benchmarks.common import AIRLINES, DESTINATIONS
+from feature_encoder import FEATURE_COLUMNS, SOURCES
+
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+STOPS = ['non-stop', '1 stop', '2 stops', '3 stops', '4 stops']
+
+def raw_records(n_rows, seed=42):
+    """Synthetic records shaped like Data_Train.xlsx, including its duration and arrival variants"""
+    rng = np.random.default_rng(seed)
+    day = rng.integers(1, 29, n_rows)
+    month = rng.integers(3, 7, n_rows)
+    dep = rng.integers(0, 24 * 12, n_rows) * 5
+    duration = rng.integers(1, 24 * 12 * 2, n_rows) * 5
+    arrival = dep + duration
+    stops = rng.integers(0, 5, n_rows)
+
+    def duration_text(minutes):
+        hours, minutes = divmod(int(minutes), 60)
+        if not minutes:
+            return f"{hours}h"
+        return f"{hours}h {minutes}m" if hours else f"{minutes}m"
+
+    def arrival_text(d, m, minutes):
+        clock = f"{minutes // 60 % 24:02d}:{minutes % 60:02d}"
+        if minutes < 24 * 60:
+            return clock
+        return f"{clock} {d + minutes // (24 * 60):02d} {MONTHS[m - 1]}"
+
+    frame = pd.DataFrame({
+        'Airline': rng.choice(AIRLINES, n_rows),
+        'Date_of_Journey': [f"{d}/{m:02d}/2019" for d, m in zip(day, month)],
+        'Source': rng.choice(SOURCES, n_rows),
+        'Destination': rng.choice(DESTINATIONS, n_rows),
+        'Route': 'BLR → DEL',
+        'Dep_Time': [f"{t // 60:02d}:{t % 60:02d}" for t in dep],
+        'Arrival_Time': [arrival_text(d, m, t) for d, m, t in zip(day, month, arrival)],
+        'Duration': [duration_text(t) for t in duration],
+        'Total_Stops': np.array(STOPS, dtype=object)[stops],
+        'Additional_Info': 'No info',
+        'Price': 3000 + stops * 1500 + duration + rng.integers(0, 3000, n_rows),
+    })
+    # Data_Train.xlsx has a row without a stop count
+    frame.loc[frame.index[::10000], 'Total_Stops'] = np.nan
+    return frame
+
+def legacy_features(raw):
+    """The project_flight notebook's feature engineering, cell by cell"""
+    Data = raw.copy()
+    Data.dropna(inplace=True)
+    Data['Date_of_Journey'] = pd.to_datetime(Data['Date_of_Journey'], dayfirst=True)
+    # pandas 2 needs format='mixed' to accept '01:10 22 Mar' next to '13:15', as pandas 1 did
+    Data['Dep_Time'] = pd.to_datetime(Data['Dep_Time'], format='mixed')
+    Data['Arrival_Time'] = pd.to_datetime(Data['Arrival_Time'], format='mixed')
+    Data['Journey_day'] = Data['Date_of_Journey'].dt.day
+    Data['Journey_month'] = Data['Date_of_Journey'].dt.month
+    Data['Journey_year'] = Data['Date_of_Journey'].dt.year
+
+    def tme(col):
+        Data[col + '_hour'] = Data[col].dt.hour
+        Data[col + '_minute'] = Data[col].dt.minute
+
+    tme('Dep_Time')
+    tme('Arrival_Time')
+
+    def dur(x):
+        parts = x.split(' ')
+        hours = '0h'
+        minutes = '0m'
+        for i in parts:
+            if 'h' in i:
+                hours = i
+            elif 'm' in i:
+                minutes = i
+        return f"{hours} {minutes}"
+
+    Data['Duration'] = Data['Duration'].apply(dur)
+    Data['Duration_hour'] = Data['Duration'].apply(lambda x: int(x.split(' ')[0][0:-1]))
+    Data['Duration_minute'] = Data['Duration'].apply(lambda x: int(x.split(' ')[1][0:-1]))
+    Data['Duration'] = Data['Duration'].apply(lambda x: x.replace('h', '*60'))
+    Data['Duration'] = Data['Duration'].apply(lambda x: x.replace('m', '*1'))
+    Data['Duration'] = Data['Duration'].apply(lambda x: x.replace(' ', '+'))
+    Data['Duration'] = Data['Duration'].apply(eval)
+
+    for cat in Data['Source'].unique():
+        Data['Source_' + cat] = Data['Source'].apply(lambda x: 1 if x == cat else 0)
+
+    airlines = Data.groupby(['Airline'])['Price'].mean().sort_values().index
+    dict_air = {key: index for index, key in enumerate(airlines, 0)}
+    Data['Airline'] = Data['Airline'].map(dict_air)
+    destination = Data.groupby(['Destination'])['Price'].mean().sort_values().index
+    dict_des = {key: index for index, key in enumerate(destination, 0)}
+    Data['Destination'] = Data['Destination'].map(dict_des)
+    dict_stp = {'non-stop': 0, '1 stop': 1, '2 stops': 2, '3 stops': 3, '4 stops': 4}
+    Data['Total_Stops'] = Data['Total_Stops'].map(dict_stp)
+    Data.drop(['Date_of_Journey', 'Source', 'Route', 'Dep_Time', 'Arrival_Time', 'Additional_Info'],
+              axis=1, inplace=True)
+    return Data[FEATURE_COLUMNS], Data['Price'], dict_air, dict_des, dict_stp
+
+def best_time(func, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10683, 100000, 1000000])
+    parser.add_argument('--legacy-max', type=int, default=100000,
+                        help='Largest size the (slow) notebook path runs at')
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    # Both paths must agree on every feature, encoder and target
+    check = raw_records(20000, seed=7)
+    expected = legacy_features(check)
+    actual = features.build_training_set(check)
+    pd.testing.assert_frame_equal(actual[0].astype(np.int64), expected[0].astype(np.int64))
+    pd.testing.assert_series_equal(actual[1], expected[1])
+    assert actual[2:] == expected[2:], "encoders differ"
+    print(f"[OK] features.build_training_set matches the notebook on {len(check):,} records\n")
+
+    print(f"{'rows':>10} {'notebook s':>11} {'us/row':>8} {'vectorized s':>13} {'us/row':>8} {'speedup':>8}")
+    for n_rows in args.sizes:
+        raw = raw_records(n_rows)
+        repeats = args.repeats if n_rows <= 100000 else 1
+        vectorized = best_time(lambda: features.build_training_set(raw), repeats)
+        if n_rows <= args.legacy_max:
+            legacy = best_time(lambda: legacy_features(raw), repeats)
+            legacy_text = f"{legacy:>11.3f} {legacy / n_rows * 1e6:>8.2f}"
+            speedup = f"{legacy / vectorized:>7.1f}x"
+        else:
+            legacy_text, speedup = f"{'-':>11} {'-':>8}", f"{'-':>8}"
+        print(f"{n_rows:>10,} {legacy_text} {vectorized:>13.3f} {vectorized / n_rows * 1e6:>8.2f} {speedup}")
+
+if __name__ == "__main__":
+    main()
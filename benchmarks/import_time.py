@@ -0,0 +1,95 @@
+"""
+Import-time and memory report for the serving process
+Imports app:app in fresh interpreters under `-X importtime` and reports the
+total startup cost, the heaviest top-level packages, which heavy modules
+were pulled in and the resulting RSS (what each gunicorn worker starts at).
+
+Usage: python -m benchmarks.import_time [--ref GIT_REV] [--top N]
+
+The current tree is measured with the lean `numpy` backend and with the
+`booster` backend; --ref adds the same measurement for an older revision
+(e.g. the commit before lazy imports) as the "before" column.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tarfile
+import tempfile
+from collections import defaultdict
+
+HEAVY_MODULES = ['pandas', 'xgboost', 'sklearn', 'scipy', 'joblib', 'numpy', 'flask']
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+with open('/proc/self/status') as f:
+    rss_kb = next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+loaded = sorted({name.split('.')[0] for name in sys.modules} & set(%r))
+print(json.dumps({'import_s': elapsed, 'rss_kb': rss_kb, 'heavy_modules': loaded}))
+""" % HEAVY_MODULES
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+def parse_importtime(stderr):
+    """Sum -X importtime self time (us) per top-level package"""
+    per_package = defaultdict(int)
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            per_package[match.group(4).split('.')[0]] += int(match.group(1))
+    return per_package
+
+def measure(label, cwd, env_overrides):
+    """Import app in a fresh interpreter and collect timings and RSS"""
+    env = dict(os.environ, **env_overrides)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD], cwd=cwd, env=env,
+                            capture_output=True, text=True, check=True)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report['label'] = label
+    report['packages_us'] = dict(parse_importtime(result.stderr))
+    return report
+
+def export_revision(rev, directory):
+    """Extract a git revision of the repository into directory"""
+    archive = os.path.join(directory, 'tree.tar')
+    subprocess.run(['git', 'archive', '--format=tar', '-o', archive, rev], check=True)
+    with tarfile.open(archive) as tar:
+        tar.extractall(directory)
+    return directory
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ref', help='Also measure this git revision as the "before" case')
+    parser.add_argument('--top', type=int, default=8, help='Packages to list per case')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = []
+        if args.ref:
+            cases.append((f"{args.ref} (before)", export_revision(args.ref, tmp), {}))
+        cases.append(("lean (PREDICT_BACKEND=numpy)", os.getcwd(), {'PREDICT_BACKEND': 'numpy'}))
+        cases.append(("booster (PREDICT_BACKEND=booster)", os.getcwd(), {'PREDICT_BACKEND': 'booster'}))
+        reports = [measure(label, cwd, env) for label, cwd, env in cases]
+
+    for report in reports:
+        print(f"\n{report['label']}")
+        print(f"  import app:    {report['import_s'] * 1e3:8.1f} ms")
+        print(f"  RSS after:     {report['rss_kb'] / 1024:8.1f} MB")
+        print(f"  heavy modules: {', '.join(report['heavy_modules']) or '-'}")
+        heaviest = sorted(report['packages_us'].items(), key=lambda item: -item[1])[:args.top]
+        for package, self_us in heaviest:
+            print(f"    {package:<24} {self_us / 1e3:8.1f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(reports, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Concurrent load generator for the prediction API
+Drives a running server (or one it launches locally) with pooled keep-alive
+connections, in one of two modes:
+
+  closed  N clients each send their next request as soon as the previous
+          one returns (--concurrency N ...)
+  open    requests are scheduled at a fixed arrival rate regardless of how
+          fast the server answers (--rate R ...), like real traffic
+
+Payloads are drawn from the categories the server itself reports at
+/airlines, /destinations and /sources. Latencies are corrected for
+coordinated omission: in open mode every request is timed from its
+scheduled send time, so queueing behind a slow response is counted; in
+closed mode the HdrHistogram correction back-fills the requests a client
+would have sent while it was stuck. Each level prints corrected and raw
+(service time) percentiles, achieved throughput and error rates.
+
+Usage: python -m benchmarks.load [--url http://host:port | --launch gunicorn|flask|aiohttp --workers N]
+                                 [--mode closed --concurrency 1 8 32 | --mode open --rate 200 500 1000]
+                                 [--duration 30] [--endpoint predict|batch] [--batch-size 10]
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import queue
+import threading
+import time
+import urllib.parse
+from collections import Counter
+
+import numpy as np
+
+from benchmarks.common import latency_summary, launch_server, run_metadata, sample_payloads, write_results
+
+class ConnectionPool:
+    """Keep-alive HTTP connections to one server, shared by the client threads"""
+
+    def __init__(self, base_url, size, timeout=30.0):
+        parsed = urllib.parse.urlsplit(base_url)
+        self.host, self.port = parsed.hostname, parsed.port or 80
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        for _ in range(size):
+            self._idle.put(None)
+
+    def _connect(self):
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method, path, body=None):
+        """Send one request on a pooled connection and return the HTTP status"""
+        connection = self._idle.get() or self._connect()
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        try:
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # The server closed an idle keep-alive connection; retry once on a fresh one
+                connection.close()
+                connection = self._connect()
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+            response.read()
+            if response.will_close:
+                connection.close()
+                connection = None
+            return response.status
+        except Exception:
+            connection.close()
+            connection = None
+            raise
+        finally:
+            self._idle.put(connection)
+
+    def get_json(self, path):
+        connection = self._connect()
+        try:
+            connection.request('GET', path)
+            response = connection.getresponse()
+            return json.loads(response.read())
+        finally:
+            connection.close()
+
+def corrected_latencies(latencies, expected_interval):
+    """HdrHistogram coordinated-omission correction
+
+    For every latency of at least twice the expected interval between
+    requests, add the samples the stalled client would have recorded had
+    it kept sending on schedule: latency - interval, latency - 2 * interval,
+    ... down to the last one that is still >= interval (as HdrHistogram's
+    recordValueWithExpectedInterval does).
+    """
+    if expected_interval <= 0:
+        return list(latencies)
+    corrected = list(latencies)
+    for latency in latencies:
+        missed = latency - expected_interval
+        while missed >= expected_interval:
+            corrected.append(missed)
+            missed -= expected_interval
+    return corrected
+
+class LoadRun:
+    """One level of load: per-request outcomes collected from the client threads"""
+
+    def __init__(self, pool, method, path, bodies):
+        self.pool = pool
+        self.method, self.path, self.bodies = method, path, bodies
+        self.latencies = []
+        self.service_times = []
+        self.statuses = Counter()
+        self.exceptions = Counter()
+        self._lock = threading.Lock()
+
+    def send(self, index, scheduled):
+        """Send request number index, timing it from scheduled (or from its actual start)"""
+        body = self.bodies[index % len(self.bodies)]
+        start = time.perf_counter()
+        try:
+            status = self.pool.request(self.method, self.path, body)
+        except Exception as e:
+            with self._lock:
+                self.exceptions[type(e).__name__] += 1
+            return
+        end = time.perf_counter()
+        with self._lock:
+            self.statuses[status] += 1
+            if status == 200:
+                self.latencies.append(end - (scheduled if scheduled is not None else start))
+                self.service_times.append(end - start)
+
+    def closed_loop(self, concurrency, duration):
+        """concurrency clients sending back to back until the deadline"""
+        deadline = time.perf_counter() + duration
+        counter = itertools.count()
+
+        def client():
+            while time.perf_counter() < deadline:
+                self.send(next(counter), None)
+
+        return self._run_threads(client, concurrency)
+
+    def open_loop(self, rate, concurrency, duration):
+        """Requests scheduled every 1/rate seconds, served by up to concurrency threads"""
+        counter = itertools.count()
+        started = time.perf_counter() + 0.05
+        total = int(rate * duration)
+        self.max_lag = 0.0
+
+        def client():
+            while True:
+                index = next(counter)
+                if index >= total:
+                    return
+                scheduled = started + index / rate
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    self.max_lag = max(self.max_lag, -delay)
+                self.send(index, scheduled)
+
+        return self._run_threads(client, concurrency)
+
+    def _run_threads(self, target, count):
+        threads = [threading.Thread(target=target, daemon=True) for _ in range(count)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started
+
+    def summary(self, elapsed, expected_interval=None):
+        """Corrected and raw latency percentiles, throughput and error counts"""
+        completed = sum(self.statuses.values())
+        failed = completed - self.statuses.get(200, 0) + sum(self.exceptions.values())
+        attempted = completed + sum(self.exceptions.values())
+        latencies = self.latencies
+        if expected_interval is not None:
+            latencies = corrected_latencies(latencies, expected_interval)
+        latency = latency_summary(latencies)
+        if latencies:
+            latency['p999_ms'] = round(float(np.percentile(np.asarray(latencies) * 1e3, 99.9)), 3)
+        return {
+            'requests': attempted,
+            'requests_per_s': round(self.statuses.get(200, 0) / elapsed, 1),
+            'error_rate': round(failed / attempted, 5) if attempted else 0.0,
+            'status_codes': {str(code): count for code, count in sorted(self.statuses.items())},
+            'exceptions': dict(self.exceptions),
+            'latency': latency,
+            'service_time': latency_summary(self.service_times),
+        }
+
+def build_bodies(pool, endpoint, batch_size, n_payloads=2000):
+    """Encoded request bodies drawn from the categories the server reports"""
+    categories = {
+        'airlines': pool.get_json('/airlines'),
+        'destinations': pool.get_json('/destinations'),
+        'sources': pool.get_json('/sources'),
+    }
+    payloads = sample_payloads(n_payloads, **categories)
+    if endpoint == 'batch':
+        return [json.dumps(payloads[i:i + batch_size]).encode()
+                for i in range(0, len(payloads) - batch_size + 1, batch_size)]
+    return [json.dumps(payload).encode() for payload in payloads]
+
+def run_levels(base_url, args):
+    """Run every concurrency (closed) or rate (open) level against base_url"""
+    path = '/predict/batch' if args.endpoint == 'batch' else '/predict'
+    levels = args.concurrency if args.mode == 'closed' else args.rate
+    max_connections = max(args.concurrency)
+    pool = ConnectionPool(base_url, max_connections)
+    bodies = build_bodies(pool, args.endpoint, args.batch_size)
+
+    print(f"{args.mode}-loop {path} against {base_url}, {args.duration:.0f}s per level")
+    print(f"{'level':>8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'p99.9 ms':>9} "
+          f"{'raw p99':>9} {'errors':>8}")
+    results = {}
+    for level in levels:
+        if args.warmup:
+            LoadRun(pool, 'POST', path, bodies).closed_loop(min(max_connections, 4), args.warmup)
+        run = LoadRun(pool, 'POST', path, bodies)
+        if args.mode == 'closed':
+            elapsed = run.closed_loop(level, args.duration)
+            # Each client should have sent one request per (typical) service time
+            typical = float(np.median(run.service_times)) if run.service_times else 0.0
+            row = run.summary(elapsed, expected_interval=typical)
+            key = f"concurrency_{level}"
+        else:
+            elapsed = run.open_loop(level, max_connections, args.duration)
+            row = run.summary(elapsed)
+            row['target_rate'] = level
+            row['max_schedule_lag_ms'] = round(run.max_lag * 1e3, 3)
+            key = f"rate_{level}"
+        results[key] = row
+        latency = row['latency']
+        print(f"{level:>8} {row['requests_per_s']:>9} {latency.get('p50_ms', '-'):>9} "
+              f"{latency.get('p95_ms', '-'):>9} {latency.get('p99_ms', '-'):>9} "
+              f"{latency.get('p999_ms', '-'):>9} "
+              f"{row['service_time'].get('p99_ms', '-'):>9} {row['error_rate']:>8.2%}")
+        if args.mode == 'open' and row['requests_per_s'] < 0.95 * level:
+            print(f"{'':>8} target rate not sustained (schedule lag up to {row['max_schedule_lag_ms']:.0f} ms): "
+                  f"the server or this client is saturated")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--url', default=None, help='Server to load (default: launch one, see --launch)')
+    target.add_argument('--launch', choices=['gunicorn', 'flask', 'aiohttp'], default='gunicorn',
+                        help='Start this server locally when --url is not given')
+    parser.add_argument('--workers', type=int, default=4, help='Worker processes for --launch')
+    parser.add_argument('--mode', choices=['closed', 'open'], default='closed')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32],
+                        help='Clients per level (closed), or the connection pool size (open, uses the max)')
+    parser.add_argument('--rate', type=float, nargs='+', default=[100, 200, 400],
+                        help='Target requests/s per level (open mode)')
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds per level')
+    parser.add_argument('--warmup', type=float, default=2.0, help='Seconds of warm-up before each level')
+    parser.add_argument('--endpoint', choices=['predict', 'batch'], default='predict')
+    parser.add_argument('--batch-size', type=int, default=10, help='Itineraries per /predict/batch request')
+    parser.add_argument('--output', help='JSON output path (default: benchmark_results/load_<mode>_<commit>.json)')
+    args = parser.parse_args()
+
+    if args.url:
+        results = run_levels(args.url.rstrip('/'), args)
+        meta = run_metadata(url=args.url)
+    else:
+        with launch_server(args.launch, workers=args.workers) as base_url:
+            results = run_levels(base_url, args)
+        meta = run_metadata(server=args.launch, workers=args.workers)
+
+    meta.update(mode=args.mode, endpoint=args.endpoint, duration_s=args.duration)
+    if args.endpoint == 'batch':
+        meta['batch_size'] = args.batch_size
+    path = write_results({'meta': meta, 'results': results}, f"load_{args.mode}", args.output)
+    print(f"\nResults written to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Micro-benchmark for model scoring time per backend
+Times single-row and batch scoring of the trained model through every
+backend in model_backends (sklearn wrapper, Booster.inplace_predict and
+the pure-NumPy tree ensemble).
+
+Usage: python -m benchmarks.predict [--iterations N] [--batch-size N]
+"""
+
+import argparse
+import os
+import random
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from benchmarks.preprocess import DICT_AIR, DICT_DES, DICT_STP, random_request
+from feature_encoder import FeatureEncoder
+from model_backends import BACKENDS
+from model_bundle import load_bundle, BUNDLE_DIR
+
+def time_calls(func, iterations):
+    """Per-call latencies in microseconds"""
+    func()  # warm up
+    timings = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings[i] = time.perf_counter() - start
+    return timings * 1e6
+
+def report(label, func, iterations):
+    try:
+        timings = time_calls(func, iterations)
+    except Exception as e:
+        print(f"{label:<36} skipped: {e}")
+        return
+    print(f"{label:<36} p50 {np.percentile(timings, 50):9.1f} us   p99 {np.percentile(timings, 99):9.1f} us")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=BUNDLE_DIR, help='Model bundle directory or pickle file')
+    parser.add_argument('--iterations', type=int, default=1000)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--nthread', type=int, default=None)
+    args = parser.parse_args()
+
+    model = load_bundle(args.model)[0] if os.path.isdir(args.model) else joblib.load(args.model)
+    rng = random.Random(42)
+    requests_ = [random_request(rng) for _ in range(args.batch_size)]
+    encoder = FeatureEncoder(DICT_AIR, DICT_DES, DICT_STP)
+    matrix = encoder.encode_many(requests_)
+    row = matrix[:1]
+    frame = pd.DataFrame(row, columns=encoder.columns)
+
+    report("sklearn predict, 1-row DataFrame", lambda: model.predict(frame), args.iterations)
+    for name, backend in BACKENDS.items():
+        kwargs = {'nthread': args.nthread} if name == 'booster' else {}
+        try:
+            predictor = backend(model, **kwargs)
+        except Exception as e:
+            print(f"{name:<36} skipped: {e}")
+            continue
+        report(f"{name}, 1 row", lambda: predictor.predict(row), args.iterations)
+        report(f"{name}, {args.batch_size} rows", lambda: predictor.predict(matrix), args.iterations)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Micro-benchmark for request preprocessing
+Compares the original DataFrame-based preprocess_input with FeatureEncoder
+and checks that both produce the same feature values.
+
+Usage: python -m benchmarks.preprocess [--iterations N]
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from feature_encoder import DICT_STP, FeatureEncoder, FEATURE_COLUMNS, SOURCES
+
+DICT_AIR = {
+    'Trujet': 0, 'SpiceJet': 1, 'Air Asia': 2, 'IndiGo': 3, 'GoAir': 4,
+    'Vistara': 5, 'Vistara Premium economy': 6, 'Air India': 7,
+    'Multiple carriers': 8, 'Multiple carriers Premium economy': 9,
+    'Jet Airways': 10, 'Jet Airways Business': 11
+}
+DICT_DES = {'Kolkata': 0, 'Hyderabad': 1, 'Delhi': 2, 'Banglore': 3, 'Cochin': 4, 'New Delhi': 5}
+
+def legacy_preprocess_input(data, dict_air, dict_des, dict_stp):
+    """The original DataFrame-based preprocess_input from app.py"""
+    df = pd.DataFrame()
+    df['Airline'] = [dict_air[data['airline']]] if data['airline'] in dict_air else [0]
+    df['Destination'] = [dict_des[data['destination']]] if data['destination'] in dict_des else [0]
+    stops_mapping = {0: 'non-stop', 1: '1 stop', 2: '2 stops', 3: '3 stops', 4: '4 stops'}
+    stops_text = stops_mapping.get(data['total_stops'], 'non-stop')
+    df['Total_Stops'] = [dict_stp.get(stops_text, 0)]
+    duration_hour, duration_minutes = map(int, data['duration'].split(':'))
+    df['Duration'] = [duration_hour * 60 + duration_minutes]
+    df['Duration_hour'] = [duration_hour]
+    df['Duration_minute'] = [duration_minutes]
+    df['Journey_day'] = [int(data['journey_day'])]
+    df['Journey_month'] = [int(data['journey_month'])]
+    df['Journey_year'] = [int(data['journey_year'])]
+    dep_hours, dep_minutes = map(int, data['dep_time'].split(':'))
+    arr_hours, arr_minutes = map(int, data['arrival_time'].split(':'))
+    df['Dep_Time_hour'] = [dep_hours]
+    df['Dep_Time_minute'] = [dep_minutes]
+    df['Arrival_Time_hour'] = [arr_hours]
+    df['Arrival_Time_minute'] = [arr_minutes]
+    source_list = ["Banglore", "Kolkata", "Delhi", "Chennai", "Mumbai"]
+    for cat in source_list:
+        df[f"Source_{cat}"] = [1 if data['source'] == cat else 0]
+    for col in df.columns:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    ordered_df = pd.DataFrame()
+    for col in FEATURE_COLUMNS:
+        ordered_df[col] = df[col] if col in df.columns else [0]
+    return ordered_df
+
+def random_request(rng):
+    """Build a random /predict payload, including unknown categories"""
+    return {
+        'airline': rng.choice(list(DICT_AIR) + ['Unknown Air']),
+        'source': rng.choice(SOURCES + ['Pune']),
+        'destination': rng.choice(list(DICT_DES) + ['Mumbai']),
+        'duration': f"{rng.randint(0, 30):02d}:{rng.randint(0, 59):02d}",
+        'total_stops': rng.choice([0, 1, 2, 3, 4, 7]),
+        'journey_day': rng.randint(1, 31),
+        'journey_month': str(rng.randint(1, 12)),
+        'journey_year': rng.choice([2019, 2024, 2025]),
+        'dep_time': f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+        'arrival_time': f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+    }
+
+def time_per_call(func, requests_, iterations):
+    """Mean seconds per call of func over the request list"""
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(requests_[i % len(requests_)])
+    return (time.perf_counter() - start) / iterations
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    requests_ = [random_request(rng) for _ in range(500)]
+    encoder = FeatureEncoder(DICT_AIR, DICT_DES, DICT_STP)
+
+    # Both paths must agree on every feature value
+    for data in requests_:
+        expected = legacy_preprocess_input(data, DICT_AIR, DICT_DES, DICT_STP).to_numpy(dtype=np.float32)
+        np.testing.assert_array_equal(encoder.encode(data), expected)
+    print(f"[OK] Encoder output matches the DataFrame path on {len(requests_)} requests")
+
+    legacy = time_per_call(lambda d: legacy_preprocess_input(d, DICT_AIR, DICT_DES, DICT_STP),
+                           requests_, args.iterations)
+    encoded = time_per_call(encoder.encode, requests_, args.iterations)
+
+    start = time.perf_counter()
+    encoder.encode_many(requests_)
+    batch = (time.perf_counter() - start) / len(requests_)
+
+    print(f"DataFrame preprocess_input: {legacy * 1e6:10.1f} us/request")
+    print(f"FeatureEncoder.encode:      {encoded * 1e6:10.1f} us/request ({legacy / encoded:.0f}x faster)")
+    print(f"FeatureEncoder.encode_many: {batch * 1e6:10.1f} us/request")
+
+if __name__ == "__main__":
+    main()
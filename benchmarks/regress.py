@@ -0,0 +1,274 @@
+"""
+Performance regression gate
+Runs a fixed set of serving and training micro-benchmarks and compares
+them with the committed baseline in benchmarks/baseline.json. Every metric
+is a time (lower is better), measured as the best of several repeats
+within a pass, and the median of --runs passes is what gets compared. The
+command exits with status 1 when any metric is slower than its baseline by
+more than the metric's tolerance plus its noise band.
+
+Usage: python -m benchmarks.regress [--tolerance 0.25] [--update] [--only NAME ...]
+
+  --update   measure and rewrite the baseline (commit it with the change
+             that legitimately moved the numbers); stores the median of
+             --update-runs passes and its noise band, how far the upper
+             quartile of those passes sat above the median
+  --retries  metrics that look regressed get this many extra passes
+             before the gate fails; the median is taken over all of them,
+             so a burst of noise does not fail the gate but a real
+             slowdown still does
+
+Baselines are only comparable on similar hardware; the baseline records
+the machine it was taken on and a mismatch is printed as a warning.
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+# Score every request: the gate measures the model path, not cache hits
+os.environ['PREDICTION_CACHE_SIZE'] = '0'
+os.environ.setdefault('WARMUP', '0')
+
+from benchmarks.common import run_metadata, sample_payloads
+from fileutil import write_atomic
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Default allowed slowdown per metric, on top of the noise band recorded with the baseline;
+# training and the large batches (most exposed to memory bandwidth shared with neighbours) get more
+DEFAULT_TOLERANCE = 0.25
+TOLERANCES = {'train_fit_s': 0.35, 'train_total_s': 0.35,
+              'predict_batch_100_us': 0.35, 'predict_batch_1000_us': 0.35}
+
+# Machine properties that must match for the comparison to be meaningful
+MACHINE_KEYS = ('machine', 'cpu_count', 'python', 'predict_backend')
+
+TRAIN_ROWS = 10000
+
+def best_time(func, iterations, min_repeats=15, min_seconds=0.5):
+    """Best mean seconds per call of func over repeated runs of iterations calls
+
+    Runs at least min_repeats times and min_seconds in total, with the
+    garbage collector off, so one descheduled run or collection does not
+    move the result.
+    """
+    func()
+    best = float('inf')
+    repeats = 0
+    started = time.perf_counter()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while repeats < min_repeats or time.perf_counter() - started < min_seconds:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                func()
+            best = min(best, (time.perf_counter() - start) / iterations)
+            repeats += 1
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return best
+
+def serving_metrics(rounds=5, seconds_per_round=0.1):
+    """Per-call times of the request hot path, in microseconds
+
+    The benchmarks take turns in short rounds and each keeps its best
+    round, so a slow patch of a few seconds on a shared machine hits one
+    round of every metric rather than the whole measurement of one.
+    """
+    import app
+
+    app.ensure_model_loaded()
+    payloads = sample_payloads(1000)
+    next_payload = itertools.cycle(payloads[:200]).__next__
+
+    row = app.encoder.encode(payloads[0])
+    benchmarks = {
+        'preprocess_input_us': (lambda: app.preprocess_input(next_payload()), 200),
+        'model_predict_1_row_us': (lambda: app.predictor.predict(row), 50),
+        'predict_one_us': (lambda: app.predict_one(next_payload()), 50),
+    }
+    for size in (10, 100, 1000):
+        benchmarks[f'predict_batch_{size}_us'] = (lambda batch=payloads[:size]: app.predict_many(batch),
+                                                  max(1, 200 // size))
+    best = dict.fromkeys(benchmarks, float('inf'))
+    for _ in range(rounds):
+        for name, (func, iterations) in benchmarks.items():
+            seconds = best_time(func, iterations, min_repeats=3, min_seconds=seconds_per_round)
+            best[name] = min(best[name], seconds)
+    return {name: seconds * 1e6 for name, seconds in best.items()}
+
+def training_metrics(n_rows=TRAIN_ROWS, repeats=5):
+    """Training pipeline times at a fixed size, in seconds (best of repeats)"""
+    import xgboost as xgb
+    from train_model import MODEL_PARAMS, create_sample_data, preprocess_data
+
+    best = {'train_preprocess_s': float('inf'), 'train_fit_s': float('inf'),
+            'train_total_s': float('inf')}
+    for _ in range(repeats):
+        start = time.perf_counter()
+        df = create_sample_data(n_samples=n_rows)
+        X, y, *_ = preprocess_data(df)
+        preprocessed = time.perf_counter()
+        xgb.XGBRegressor(**MODEL_PARAMS).fit(X, y)
+        done = time.perf_counter()
+        best['train_preprocess_s'] = min(best['train_preprocess_s'], preprocessed - start)
+        best['train_fit_s'] = min(best['train_fit_s'], done - preprocessed)
+        best['train_total_s'] = min(best['train_total_s'], done - start)
+    return best
+
+def measure(only=None):
+    """One pass over every metric (or the named ones; each group runs if any of its metrics is named)"""
+    random.seed(0)
+    metrics = {}
+    if not only or any(not name.startswith('train_') for name in only):
+        metrics.update(serving_metrics())
+    if not only or any(name.startswith('train_') for name in only):
+        metrics.update(training_metrics())
+    if only:
+        metrics = {name: value for name, value in metrics.items() if name in only}
+    return metrics
+
+def sample(runs, only=None, samples=None):
+    """Per-metric lists of values from runs measure() passes, appended to samples if given"""
+    samples = {} if samples is None else samples
+    for _ in range(runs):
+        for name, value in measure(only).items():
+            samples.setdefault(name, []).append(value)
+    return samples
+
+def medians(samples):
+    return {name: statistics.median(values) for name, values in samples.items()}
+
+def noise_band(values):
+    """How far above the median the upper quartile of the passes sits (0 for a single pass)
+
+    A quartile rather than the slowest pass, so one pass that hit a burst
+    of noise does not widen the band for good.
+    """
+    if len(values) < 2:
+        return 0.0
+    upper = statistics.quantiles(values, n=4, method='inclusive')[2]
+    return max(upper / statistics.median(values) - 1.0, 0.0)
+
+def unit(name):
+    return 's' if name.endswith('_s') else 'us'
+
+def format_value(name, value):
+    if value is None:
+        return '-'
+    return f"{value:.3f} s" if unit(name) == 's' else f"{value:.1f} us"
+
+def compare(baseline, current, tolerance_override=None):
+    """Rows of (metric, baseline, current, change, allowed, status) and whether anything regressed"""
+    rows = []
+    regressed = False
+    for name in sorted(set(baseline) | set(current)):
+        if name not in baseline:
+            rows.append((name, None, current[name], None, None, 'NEW'))
+            continue
+        if name not in current:
+            rows.append((name, baseline[name]['value'], None, None, None, 'MISSING'))
+            continue
+        base = baseline[name]['value']
+        tolerance = tolerance_override if tolerance_override is not None else baseline[name]['tolerance']
+        # A metric that varied between passes when the baseline was taken needs a wider band
+        allowed = tolerance + baseline[name].get('noise', 0.0)
+        change = current[name] / base - 1.0
+        if change > allowed:
+            status = 'REGRESSED'
+            regressed = True
+        elif change < -allowed:
+            status = 'improved'
+        else:
+            status = 'ok'
+        rows.append((name, base, current[name], change, allowed, status))
+    return rows, regressed
+
+def print_rows(rows):
+    print(f"{'metric':<26} {'baseline':>12} {'current':>12} {'change':>8} {'allowed':>8}  status")
+    for name, base, value, change, allowed, status in rows:
+        change_text = f"{change:+.1%}" if change is not None else '-'
+        allowed_text = f"+{allowed:.0%}" if allowed is not None else '-'
+        print(f"{name:<26} {format_value(name, base):>12} {format_value(name, value):>12} "
+              f"{change_text:>8} {allowed_text:>8}  {status}")
+
+def baseline_entry(name, values):
+    return {'value': round(statistics.median(values), 4), 'unit': unit(name),
+            'tolerance': TOLERANCES.get(name, DEFAULT_TOLERANCE),
+            'noise': round(noise_band(values), 4), 'runs': len(values)}
+
+def write_baseline(entries, path):
+    baseline = {
+        'meta': run_metadata(train_rows=TRAIN_ROWS),
+        'metrics': dict(sorted(entries.items())),
+    }
+    with write_atomic(path) as f:
+        json.dump(baseline, f, indent=2)
+        f.write('\n')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, help='Override every metric tolerance (e.g. 0.25 = 25%% slower)')
+    parser.add_argument('--update', action='store_true', help='Rewrite the baseline with this run')
+    parser.add_argument('--only', nargs='+', help='Only check these metrics')
+    parser.add_argument('--runs', type=int, default=3, help='Passes per check; their median is compared')
+    parser.add_argument('--update-runs', type=int, default=7,
+                        help='Passes taken for --update (median and noise band)')
+    parser.add_argument('--retries', type=int, default=2,
+                        help='Extra passes for apparently regressed metrics before failing')
+    args = parser.parse_args()
+
+    if args.update:
+        entries = {name: baseline_entry(name, values)
+                   for name, values in sample(args.update_runs, args.only).items()}
+        if args.only and os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                entries = dict(json.load(f)['metrics'], **entries)
+        write_baseline(entries, args.baseline)
+        print(f"Baseline with {len(entries)} metrics written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; create one with --update")
+        return 1
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    here = run_metadata()
+    mismatched = [key for key in MACHINE_KEYS if baseline['meta'].get(key) != here.get(key)]
+    if mismatched:
+        print("Warning: baseline was taken on a different setup (" +
+              ', '.join(f"{key}: {baseline['meta'].get(key)} vs {here.get(key)}" for key in mismatched) + ")\n")
+
+    metrics = baseline['metrics']
+    if args.only:
+        metrics = {name: entry for name, entry in metrics.items() if name in args.only}
+    samples = sample(args.runs, args.only)
+    rows, regressed = compare(metrics, medians(samples), args.tolerance)
+    for attempt in range(args.retries):
+        if not regressed:
+            break
+        suspects = [row[0] for row in rows if row[-1] == 'REGRESSED']
+        print(f"Re-measuring {', '.join(suspects)} (retry {attempt + 1} of {args.retries})")
+        sample(1, suspects, samples)
+        rows, regressed = compare(metrics, medians(samples), args.tolerance)
+    print(f"Baseline {baseline['meta'].get('git_commit')} vs working tree {here['git_commit']}\n")
+    print_rows(rows)
+    if regressed:
+        print("\nFAIL: performance regressed past tolerance")
+        return 1
+    print("\nOK: no metric regressed past tolerance")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
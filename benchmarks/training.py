@@ -0,0 +1,158 @@
+"""
+Scaling benchmark for the training pipeline in train_model.py
+Runs create_sample_data -> preprocess_data -> train_test_split ->
+XGBRegressor.fit -> predict at increasing row counts and XGBoost thread
+counts. Every (rows, threads) case runs in a fresh interpreter so memory
+numbers do not leak between cases. Each stage reports wall time, rows/s,
+RSS after the stage and the peak RSS reached during it (the kernel's
+high-water mark, reset before every stage through /proc/self/clear_refs).
+
+Usage: python -m benchmarks.training [--sizes 1000 10000 100000 1000000 10000000]
+                                     [--threads 1 2 4] [--tree-method hist] [--timeout 3600]
+                                     [--output FILE]
+
+A case that runs out of memory or time is reported and skips the larger
+sizes for that thread count.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import run_metadata, write_results
+
+STAGES = ['generate', 'preprocess', 'split', 'fit', 'predict']
+
+def read_status_kb(field):
+    """A memory field (VmRSS, VmHWM) of this process from /proc, in kB"""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    return None
+
+def reset_peak_rss():
+    """Reset VmHWM to the current RSS; False where the kernel does not allow it"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def run_case(n_rows, threads, tree_method=None):
+    """Child side: time every pipeline stage for one case and return the measurements"""
+    import xgboost as xgb
+    from sklearn.model_selection import train_test_split
+    from train_model import MODEL_PARAMS, create_sample_data, preprocess_data
+
+    per_stage_peak = reset_peak_rss()
+    params = dict(MODEL_PARAMS, n_jobs=threads)
+    if tree_method:
+        params['tree_method'] = tree_method
+    results = {'rows': n_rows, 'threads': threads, 'tree_method': tree_method,
+               'per_stage_peak': per_stage_peak, 'baseline_rss_mb': round(read_status_kb('VmRSS') / 1024, 1), 'stages': {}}
+    state = {}
+
+    def stage(name, func):
+        reset_peak_rss()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        results['stages'][name] = {
+            'seconds': round(elapsed, 4),
+            'rows_per_s': round(state.get('stage_rows', n_rows) / elapsed, 1) if elapsed > 0 else None,
+            'rss_mb': round(read_status_kb('VmRSS') / 1024, 1),
+            'peak_rss_mb': round(read_status_kb('VmHWM') / 1024, 1),
+        }
+
+    def generate():
+        state['df'] = create_sample_data(n_samples=n_rows)
+
+    def preprocess():
+        state['X'], state['y'], *_ = preprocess_data(state.pop('df'))
+
+    def split():
+        state['X_train'], state['X_test'], state['y_train'], state['y_test'] = train_test_split(
+            state.pop('X'), state.pop('y'), test_size=0.2, random_state=42)
+
+    def fit():
+        state['stage_rows'] = len(state['X_train'])
+        state['model'] = xgb.XGBRegressor(**params)
+        state['model'].fit(state['X_train'], state['y_train'])
+
+    def predict():
+        state['stage_rows'] = len(state['X_test'])
+        state['model'].predict(state['X_test'])
+
+    for name, func in zip(STAGES, [generate, preprocess, split, fit, predict]):
+        stage(name, func)
+
+    total = sum(row['seconds'] for row in results['stages'].values())
+    results['total_seconds'] = round(total, 4)
+    results['total_rows_per_s'] = round(n_rows / total, 1)
+    results['peak_rss_mb'] = max(row['peak_rss_mb'] for row in results['stages'].values())
+    return results
+
+def launch_case(n_rows, threads, timeout, tree_method=None):
+    """Parent side: run one case in a fresh interpreter"""
+    command = [sys.executable, '-m', 'benchmarks.training', '--child', str(n_rows), str(threads)]
+    if tree_method:
+        command += ['--tree-method', tree_method]
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {'rows': n_rows, 'threads': threads, 'error': f'timed out after {timeout:.0f}s'}
+    if completed.returncode != 0:
+        # -9 is usually the OOM killer
+        reason = completed.stderr.strip().splitlines()[-1:] or [f'exit code {completed.returncode}']
+        return {'rows': n_rows, 'threads': threads, 'error': reason[0]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def print_case(case):
+    if 'error' in case:
+        print(f"{case['rows']:>10} {case['threads']:>7}  FAILED: {case['error']}")
+        return
+    stages = case['stages']
+    print(f"{case['rows']:>10} {case['threads']:>7} " +
+          ' '.join(f"{stages[name]['seconds']:>10.3f}" for name in STAGES) +
+          f" {case['total_rows_per_s']:>12,.0f} {case['peak_rss_mb']:>9.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--threads', type=int, nargs='+', default=sorted({1, os.cpu_count() or 1}))
+    parser.add_argument('--tree-method', choices=['exact', 'approx', 'hist'],
+                        help="XGBoost tree_method (default: train_model.py's, i.e. XGBoost's default)")
+    parser.add_argument('--timeout', type=float, default=3600.0, help='Seconds allowed per case')
+    parser.add_argument('--output', help='JSON output path (default: benchmark_results/training_<commit>.json)')
+    parser.add_argument('--child', nargs=2, type=int, metavar=('ROWS', 'THREADS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_case(*args.child, tree_method=args.tree_method)))
+        return
+
+    print(f"{'rows':>10} {'threads':>7} " + ' '.join(f"{name + ' s':>10}" for name in STAGES) +
+          f" {'rows/s':>12} {'peak MB':>9}")
+    cases = []
+    for threads in args.threads:
+        for n_rows in sorted(args.sizes):
+            case = launch_case(n_rows, threads, args.timeout, args.tree_method)
+            print_case(case)
+            cases.append(case)
+            if 'error' in case:
+                break
+
+    if cases and not all(case.get('per_stage_peak', True) for case in cases):
+        print("\nNote: /proc/self/clear_refs is not writable here, so peak RSS is cumulative per process.")
+
+    results = {'meta': run_metadata(tree_method=args.tree_method), 'results': cases}
+    path = write_results(results, 'training', args.output)
+    print(f"\nResults written to {path}")
+
+if __name__ == "__main__":
+    main()
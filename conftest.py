@@ -0,0 +1,22 @@
+"""
+Shared pytest fixtures: python -m pytest -q
+"""
+
+import os
+
+import pytest
+
+# Keep test processes quiet and self-contained: no warmup, no profiling, per-process metrics
+os.environ.setdefault('WARMUP', '0')
+os.environ.setdefault('PROFILE_SAMPLE_RATE', '0')
+os.environ.pop('METRICS_DIR', None)
+
+# Smoke script for a running server (python test_app.py), not a unit test
+collect_ignore = ['test_app.py']
+
+@pytest.fixture(scope='session')
+def client():
+    """Flask test client over the committed model bundle"""
+    import app
+
+    return app.create_app(preload=True).test_client()
@@ -0,0 +1,144 @@
+"""
+Chunked synthetic flight data for the Flight Price Prediction System
+Generates the same columns and pricing model as create_sample_data in
+train_model.py, but chunk by chunk with compact dtypes (categoricals for
+the city and airline columns, int8/int16 for the small integers, int32
+prices) and vectorized price synthesis, and streams the chunks to Parquet
+one row group at a time. Memory use is bounded by the chunk size, so tens of
+millions of rows can be written on a small machine.
+
+Usage: python data_generator.py [--rows 10000000] [--chunk-size 1000000] [--seed 42]
+                                [--output data/flights.parquet] [--compression snappy]
+
+Each chunk draws from its own seed derived from (seed, chunk index), so a
+given seed and chunk size always produce the same file.
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from fileutil import write_atomic
+
+AIRLINES = ['Trujet', 'SpiceJet', 'Air Asia', 'IndiGo', 'GoAir', 'Vistara',
+            'Vistara Premium economy', 'Air India', 'Multiple carriers',
+            'Multiple carriers Premium economy', 'Jet Airways', 'Jet Airways Business']
+SOURCES = ['Banglore', 'Kolkata', 'Delhi', 'Chennai', 'Mumbai']
+DESTINATIONS = ['Kolkata', 'Hyderabad', 'Delhi', 'Banglore', 'Cochin', 'New Delhi']
+YEARS = np.array([2019, 2020, 2021, 2022, 2023, 2024], dtype=np.int16)
+
+# Price components per category code, matching create_sample_data's pricing model
+BASE_PRICE = 3000
+AIRLINE_PRICE = np.arange(len(AIRLINES), dtype=np.float64) * 200
+DESTINATION_PRICE = np.arange(len(DESTINATIONS), dtype=np.float64) * 300
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+DEFAULT_OUTPUT = os.path.join('data', 'flights.parquet')
+
+def _categorical(codes, categories):
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+def generate_chunk(n_rows, rng):
+    """One chunk of n_rows synthetic flights as a compact DataFrame"""
+    airline = rng.integers(0, len(AIRLINES), n_rows, dtype=np.int8)
+    source = rng.integers(0, len(SOURCES), n_rows, dtype=np.int8)
+    destination = rng.integers(0, len(DESTINATIONS), n_rows, dtype=np.int8)
+    duration = rng.integers(60, 600, n_rows, dtype=np.int16)
+    stops = rng.integers(0, 5, n_rows, dtype=np.int8)
+    dep_hour = rng.integers(0, 24, n_rows, dtype=np.int8)
+
+    columns = {
+        'Airline': _categorical(airline, AIRLINES),
+        'Source': _categorical(source, SOURCES),
+        'Destination': _categorical(destination, DESTINATIONS),
+        'Duration': duration,
+        'Total_Stops': stops,
+        'Journey_day': rng.integers(1, 32, n_rows, dtype=np.int8),
+        'Journey_month': rng.integers(1, 13, n_rows, dtype=np.int8),
+        'Journey_year': YEARS[rng.integers(0, len(YEARS), n_rows, dtype=np.int8)],
+        'Dep_Time_hour': dep_hour,
+        'Dep_Time_minute': rng.integers(0, 60, n_rows, dtype=np.int8),
+        'Arrival_Time_hour': rng.integers(0, 24, n_rows, dtype=np.int8),
+        'Arrival_Time_minute': rng.integers(0, 60, n_rows, dtype=np.int8),
+        'Duration_hour': rng.integers(1, 12, n_rows, dtype=np.int8),
+        'Duration_minute': rng.integers(0, 60, n_rows, dtype=np.int8),
+    }
+    for code, name in enumerate(SOURCES):
+        columns[f'Source_{name}'] = (source == code).view(np.int8)
+
+    # Built in place in one float64 buffer to avoid a temporary per term
+    price = rng.normal(BASE_PRICE, 1000, n_rows)
+    price += AIRLINE_PRICE[airline]
+    price += DESTINATION_PRICE[destination]
+    price += duration * 2.0
+    price += stops * 500.0
+    price += dep_hour * 50.0
+    columns['Price'] = price.astype(np.int32)
+
+    return pd.DataFrame(columns)
+
+def generate_chunks(n_rows, chunk_size=DEFAULT_CHUNK_SIZE, seed=42):
+    """Yield DataFrames of up to chunk_size rows, n_rows in total"""
+    for index, start in enumerate(range(0, n_rows, chunk_size)):
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+        yield generate_chunk(min(chunk_size, n_rows - start), rng)
+
+def generate_frame(n_rows, chunk_size=DEFAULT_CHUNK_SIZE, seed=42):
+    """All n_rows in one compact in-memory DataFrame"""
+    return pd.concat(generate_chunks(n_rows, chunk_size, seed), ignore_index=True)
+
+def write_parquet(path, n_rows, chunk_size=DEFAULT_CHUNK_SIZE, seed=42, compression='snappy'):
+    """Stream n_rows to a Parquet file, one row group per chunk; returns the row count written"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    writer = None
+    written = 0
+    with write_atomic(path, 'wb') as f:
+        try:
+            for chunk in generate_chunks(n_rows, chunk_size, seed):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(f, table.schema, compression=compression)
+                writer.write_table(table, row_group_size=len(chunk))
+                written += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+    return written
+
+def iter_parquet(path, columns=None):
+    """Yield a generated Parquet file back one row group at a time, with its compact dtypes"""
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    for index in range(parquet_file.num_row_groups):
+        yield parquet_file.read_row_group(index, columns=columns).to_pandas()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--compression', default='snappy', help='Parquet codec (snappy, zstd, gzip, none)')
+    args = parser.parse_args()
+
+    from memory import peak_rss_bytes
+
+    start = time.perf_counter()
+    rows = write_parquet(args.output, args.rows, args.chunk_size, args.seed, args.compression)
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(args.output) / 2**20
+    print(f"Wrote {rows:,} rows to {args.output} in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+    print(f"File size {size_mb:,.1f} MB ({size_mb * 2**20 / max(rows, 1):.1f} bytes/row), "
+          f"peak RSS {peak_rss_bytes() / 2**20:,.0f} MB")
+
+if __name__ == "__main__":
+    main()
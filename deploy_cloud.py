@@ -59,7 +59,7 @@ def deploy_render():
     print("1. Go to https://render.com")
     print("2. Connect your GitHub repository")
     print("3. Set build command: pip install -r requirements.txt && python train_model.py")
-    print("4. Set start command: gunicorn --bind 0.0.0.0:$PORT app:app")
+    print("4. Set start command: gunicorn -c gunicorn.conf.py app:app")
     print("5. Deploy!")
     
     return True
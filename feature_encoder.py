@@ -0,0 +1,130 @@
+"""
+Feature encoder for the Flight Price Prediction API
+Writes prediction requests straight into float32 rows in model column order
+"""
+
+import numpy as np
+
+# Column order the model was trained with
+FEATURE_COLUMNS = [
+    'Airline', 'Destination', 'Duration', 'Total_Stops', 'Journey_day',
+    'Journey_month', 'Journey_year', 'Dep_Time_hour', 'Dep_Time_minute',
+    'Arrival_Time_hour', 'Arrival_Time_minute', 'Duration_hour', 'Duration_minute',
+    'Source_Banglore', 'Source_Kolkata', 'Source_Delhi', 'Source_Chennai', 'Source_Mumbai'
+]
+
+# Source cities that have a one-hot column
+SOURCES = ["Banglore", "Kolkata", "Delhi", "Chennai", "Mumbai"]
+
+# Number of stops sent by clients -> label used by the stops encoder
+STOPS_LABELS = {0: 'non-stop', 1: '1 stop', 2: '2 stops', 3: '3 stops', 4: '4 stops'}
+
+# Stops label -> code, the notebook's dict_stp (training and every fallback use this one map)
+DICT_STP = {label: n for n, label in STOPS_LABELS.items()}
+
+# Non one-hot features in the order _base_values() produces them
+_BASE_FEATURES = [
+    'Airline', 'Destination', 'Total_Stops', 'Duration', 'Duration_hour', 'Duration_minute',
+    'Journey_day', 'Journey_month', 'Journey_year', 'Dep_Time_hour', 'Dep_Time_minute',
+    'Arrival_Time_hour', 'Arrival_Time_minute'
+]
+
+class FeatureEncoder:
+    """Encode request dicts into float32 feature arrays
+
+    All lookup tables and column positions are resolved once at construction,
+    so encoding a request is a handful of dict lookups and one array write.
+    """
+
+    def __init__(self, dict_air, dict_des, dict_stp, columns=None):
+        self.columns = list(columns if columns is not None else FEATURE_COLUMNS)
+        self.n_features = len(self.columns)
+
+        self._airline = dict(dict_air)
+        self._destination = dict(dict_des)
+        self._stops_default = dict_stp.get('non-stop', 0)
+        self._stops = {n: dict_stp.get(label, 0) for n, label in STOPS_LABELS.items()}
+
+        # Columns missing from the model order are skipped, extra ones stay 0
+        position = {col: i for i, col in enumerate(self.columns)}
+        self._base_mask = [col in position for col in _BASE_FEATURES]
+        self._base_positions = np.array(
+            [position[col] for col in _BASE_FEATURES if col in position], dtype=np.intp)
+        self._all_base = all(self._base_mask)
+        self._source_positions = {
+            src: position[f'Source_{src}'] for src in SOURCES if f'Source_{src}' in position
+        }
+        self._source_columns = np.array(list(self._source_positions.values()), dtype=np.intp)
+
+    def _base_values(self, data):
+        """Encode the non one-hot features of one request"""
+        duration_hour, duration_minutes = map(int, data['duration'].split(':'))
+        dep_hours, dep_minutes = map(int, data['dep_time'].split(':'))
+        arr_hours, arr_minutes = map(int, data['arrival_time'].split(':'))
+
+        return [
+            self._airline.get(data['airline'], 0),
+            self._destination.get(data['destination'], 0),
+            self._stops.get(data['total_stops'], self._stops_default),
+            duration_hour * 60 + duration_minutes,
+            duration_hour,
+            duration_minutes,
+            int(data['journey_day']),
+            int(data['journey_month']),
+            int(data['journey_year']),
+            dep_hours,
+            dep_minutes,
+            arr_hours,
+            arr_minutes,
+        ]
+
+    def features(self, data):
+        """Canonical encoded feature tuple for one request
+
+        The tuple is hashable, so it doubles as a cache key that already
+        folds unknown categories and equivalent inputs together.
+        """
+        values = self._base_values(data)
+        values.append(self._source_positions.get(data['source'], -1))
+        return tuple(values)
+
+    def write(self, features, out=None):
+        """Write a features() tuple into `out` (a row view) or a new (1, n) array"""
+        if out is None:
+            out = np.zeros((1, self.n_features), dtype=np.float32)
+            row = out[0]
+        else:
+            row = out
+            row[self._source_columns] = 0
+
+        values = features[:-1]
+        if not self._all_base:
+            values = [v for v, keep in zip(values, self._base_mask) if keep]
+        row[self._base_positions] = values
+
+        if features[-1] >= 0:
+            row[features[-1]] = 1
+
+        return out
+
+    def encode(self, data, out=None):
+        """Encode one request into `out` (a row view) or a new (1, n) array"""
+        return self.write(self.features(data), out)
+
+    def encode_many(self, items):
+        """Encode a list of requests into a new (len(items), n) array"""
+        matrix = np.zeros((len(items), self.n_features), dtype=np.float32)
+        for i, data in enumerate(items):
+            self.encode(data, out=matrix[i])
+        return matrix
+
+    def empty(self, n_rows):
+        """Allocate a zeroed float32 matrix for n_rows requests"""
+        return np.zeros((n_rows, self.n_features), dtype=np.float32)
+
+def check_feature_names(columns):
+    """Raise ValueError if the model expects columns the encoder cannot produce"""
+    known = set(_BASE_FEATURES) | {f'Source_{src}' for src in SOURCES}
+    unknown = [col for col in columns if col not in known]
+    if unknown:
+        raise ValueError(f"Model expects features the encoder cannot produce: {unknown}")
@@ -0,0 +1,191 @@
+"""
+Vectorized feature engineering for raw flight records
+Turns records in the Data_Train.xlsx format (Date_of_Journey '24/03/2019',
+Dep_Time '22:20', Arrival_Time '01:10 22 Mar', Duration '2h 50m',
+Total_Stops 'non-stop', ...) into the model's feature columns. This is the
+logic of the project_flight notebook, with every step done column-wise:
+durations and clock times are parsed with one regex str.extract over their
+distinct values, the journey date with an explicit '%d/%m/%Y' format and
+the source one-hot in a single comparison. Training (train_model.py --data)
+and the /predict/raw endpoint both go through it.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from feature_encoder import DICT_STP, FEATURE_COLUMNS, SOURCES
+
+# Columns a raw record must have (Route and Additional_Info are not used)
+RAW_COLUMNS = ['Airline', 'Date_of_Journey', 'Source', 'Destination', 'Dep_Time',
+               'Arrival_Time', 'Duration', 'Total_Stops']
+
+DATE_FORMAT = '%d/%m/%Y'
+DURATION_PATTERN = r'^\s*(?:(?P<hours>\d+)\s*h)?\s*(?:(?P<minutes>\d+)\s*m)?\s*$'
+# Arrival times may carry a date suffix ('01:10 22 Mar'); only the clock is used
+CLOCK_PATTERN = r'^\s*(?P<hour>\d{1,2}):(?P<minute>\d{2})'
+
+# Engineered integer columns and their dtypes; the source one-hots are int8
+_INT_DTYPES = {
+    'Duration': np.int16, 'Duration_hour': np.int16, 'Duration_minute': np.int8,
+    'Journey_day': np.int8, 'Journey_month': np.int8, 'Journey_year': np.int16,
+    'Dep_Time_hour': np.int8, 'Dep_Time_minute': np.int8,
+    'Arrival_Time_hour': np.int8, 'Arrival_Time_minute': np.int8,
+}
+
+def load_raw(path):
+    """Read raw records from an Excel, CSV or Parquet file
+
+    Excel workbooks are read through ingest.py's typed Parquet copy, which
+    is converted once per version of the workbook.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.xlsx', '.xls'):
+        from ingest import load_ingested
+        return load_ingested(path)
+    if extension == '.parquet':
+        return pd.read_parquet(path)
+    if extension == '.csv':
+        return pd.read_csv(path)
+    raise ValueError(f"Unsupported raw data format {extension!r} (expected .xlsx, .csv or .parquet)")
+
+def _as_text(column):
+    return column if column.dtype == object else column.astype(str)
+
+def _extract(column, pattern):
+    """str.extract run once per distinct value and scattered back by code
+
+    Durations and clock times take a few hundred distinct values, so this
+    turns a per-row regex into one hash pass plus a handful of matches.
+    """
+    codes, uniques = pd.factorize(_as_text(column))
+    parts = pd.Series(uniques, dtype=object).str.extract(pattern).apply(pd.to_numeric)
+    # Code -1 (missing) picks the all-NaN row appended at the end
+    values = np.vstack([parts.to_numpy(dtype=np.float64), np.full((1, parts.shape[1]), np.nan)])
+    return pd.DataFrame(values[codes], columns=parts.columns, index=column.index)
+
+def parse_duration(column):
+    """(hours, minutes) float Series from '2h 50m' / '19h' / '5m' strings; NaN where unparseable"""
+    parts = _extract(column, DURATION_PATTERN)
+    hours, minutes = parts['hours'], parts['minutes']
+    # A string with neither part ('' or garbage) is invalid, one missing part is zero
+    missing = hours.isna() & minutes.isna()
+    hours = hours.fillna(0).mask(missing)
+    minutes = minutes.fillna(0).mask(missing)
+    return hours, minutes
+
+def parse_clock(column):
+    """(hour, minute) float Series from 'HH:MM' strings or datetimes; NaN where unparseable"""
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return column.dt.hour.astype(float), column.dt.minute.astype(float)
+    parts = _extract(column, CLOCK_PATTERN)
+    return parts['hour'], parts['minute']
+
+def parse_date(column):
+    """Datetime Series from '%d/%m/%Y' strings (Excel dates pass through); NaT where unparseable"""
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return column
+    return pd.to_datetime(_as_text(column), format=DATE_FORMAT, errors='coerce')
+
+def parse_raw(raw):
+    """Engineered columns for a DataFrame of raw records
+
+    Returns (parsed, valid): parsed keeps the categorical columns as text
+    (Airline, Source, Destination, Total_Stops) next to compact integer
+    features, with 0 wherever a value failed to parse or does not fit its
+    dtype; valid is a boolean array marking the rows that parsed
+    completely and in range.
+    """
+    missing = [column for column in RAW_COLUMNS if column not in raw.columns]
+    if missing:
+        raise ValueError(f"Raw records are missing columns: {', '.join(missing)}")
+
+    date = parse_date(raw['Date_of_Journey'])
+    duration_hour, duration_minute = parse_duration(raw['Duration'])
+    dep_hour, dep_minute = parse_clock(raw['Dep_Time'])
+    arrival_hour, arrival_minute = parse_clock(raw['Arrival_Time'])
+
+    numeric = pd.DataFrame({
+        'Duration': duration_hour * 60 + duration_minute,
+        'Duration_hour': duration_hour,
+        'Duration_minute': duration_minute,
+        'Journey_day': date.dt.day,
+        'Journey_month': date.dt.month,
+        'Journey_year': date.dt.year,
+        'Dep_Time_hour': dep_hour,
+        'Dep_Time_minute': dep_minute,
+        'Arrival_Time_hour': arrival_hour,
+        'Arrival_Time_minute': arrival_minute,
+    }, index=raw.index)
+    # Checked before narrowing: '2h 130m' would otherwise wrap to a negative int8 minute
+    fits = pd.DataFrame({column: numeric[column].between(np.iinfo(dtype).min, np.iinfo(dtype).max)
+                         for column, dtype in _INT_DTYPES.items()})
+    valid = fits.all(axis=1).to_numpy()
+    valid &= raw[['Airline', 'Source', 'Destination', 'Total_Stops']].notna().all(axis=1).to_numpy()
+
+    parsed = numeric.where(fits, 0).astype(_INT_DTYPES)
+    for column in ('Airline', 'Source', 'Destination', 'Total_Stops'):
+        parsed[column] = raw[column]
+    source_codes = pd.Categorical(raw['Source'], categories=SOURCES).codes
+    one_hot = source_codes[:, None] == np.arange(len(SOURCES))
+    for i, source in enumerate(SOURCES):
+        parsed[f'Source_{source}'] = one_hot[:, i].view(np.int8)
+    if 'Price' in raw.columns:
+        parsed['Price'] = raw['Price']
+    return parsed, valid
+
+def _encode(column, mapping, default):
+    """column mapped through mapping, default where unmapped; category columns map each category once"""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes = pd.Series(column.cat.categories).map(mapping).fillna(default).to_numpy()
+        # Code -1 (missing) picks the default appended at the end
+        return pd.Series(np.append(codes, default)[column.cat.codes], index=column.index)
+    return column.map(mapping).fillna(default)
+
+def rank_codes(mean_price):
+    """Codes 0..n-1 for the keys of a mean-price Series, cheapest first (the notebook's encoding)"""
+    return {key: idx for idx, key in enumerate(mean_price.sort_values().index, 0)}
+
+def fit_encoders(parsed, price):
+    """Airline and destination codes ranked by mean price, as in the notebook, plus the stops codes"""
+    dict_air = rank_codes(price.groupby(parsed['Airline'].to_numpy()).mean())
+    dict_des = rank_codes(price.groupby(parsed['Destination'].to_numpy()).mean())
+    return dict_air, dict_des, dict(DICT_STP)
+
+def encode_features(parsed, dict_air, dict_des, dict_stp, columns=FEATURE_COLUMNS):
+    """Feature DataFrame in model column order
+
+    Unknown airlines and destinations encode as 0 and unknown stop labels
+    as non-stop, the same as FeatureEncoder does for single requests.
+    """
+    encoded = {
+        'Airline': _encode(parsed['Airline'], dict_air, 0).astype(np.int16),
+        'Destination': _encode(parsed['Destination'], dict_des, 0).astype(np.int16),
+        'Total_Stops': _encode(parsed['Total_Stops'], dict_stp, dict_stp.get('non-stop', 0)).astype(np.int8),
+    }
+    return pd.DataFrame({column: encoded[column] if column in encoded else parsed[column]
+                         for column in columns}, index=parsed.index)
+
+def _parse_priced(raw):
+    """Parsed rows of raw records that parsed completely and have a price"""
+    if 'Price' not in raw.columns:
+        raise ValueError("Raw training records need a Price column")
+    parsed, valid = parse_raw(raw)
+    return parsed[valid & raw['Price'].notna().to_numpy()]
+
+def build_training_set(raw):
+    """(X, y, dict_air, dict_des, dict_stp) from raw records with a Price column
+
+    Rows that fail to parse or have no price are dropped, like the
+    notebook's dropna.
+    """
+    parsed = _parse_priced(raw)
+    dict_air, dict_des, dict_stp = fit_encoders(parsed, parsed['Price'])
+    X = encode_features(parsed, dict_air, dict_des, dict_stp)
+    return X, parsed['Price'], dict_air, dict_des, dict_stp
+
+def encode_training_set(raw, dict_air, dict_des, dict_stp, columns=FEATURE_COLUMNS):
+    """(X, y) from raw records with a Price column, encoded with existing encoders"""
+    parsed = _parse_priced(raw)
+    return encode_features(parsed, dict_air, dict_des, dict_stp, columns), parsed['Price']
@@ -0,0 +1,39 @@
+"""
+File helpers shared by the service, training and data tools
+Standard library only, so app.py can import them without pulling in
+pandas or xgboost.
+"""
+
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+
+def file_sha256(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+@contextmanager
+def write_atomic(path, mode='w'):
+    """Open a temporary file next to path, renamed over path when the block exits cleanly
+
+    Readers (other workers, a restarting server) see the old file or the
+    complete new one, never a partial write. If the block raises, the
+    temporary file is removed and path is left as it was.
+    """
+    # Unique per process and thread, so concurrent writers never share a temporary file
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, mode) as f:
+            yield f
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
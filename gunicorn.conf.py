@@ -0,0 +1,64 @@
+"""
+Gunicorn configuration for the Flight Price Prediction System
+The app (model and encoders included) is loaded once in the master and
+shared copy-on-write with the forked workers.
+
+Usage: gunicorn -c gunicorn.conf.py app:app
+"""
+
+import gc
+import os
+import shutil
+import tempfile
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+timeout = 120
+
+# Import app.py (and load the model) in the master before forking
+preload_app = True
+
+# Shared directory where workers publish their metrics so any worker can answer /metrics
+# with service-wide totals; set here, before the app is preloaded, so app.py sees it
+_own_metrics_dir = 'METRICS_DIR' not in os.environ
+if _own_metrics_dir:
+    os.environ['METRICS_DIR'] = tempfile.mkdtemp(prefix='flight-metrics-')
+
+def on_starting(server):
+    # Start from zero: drop snapshots a previous master left in a reused METRICS_DIR
+    import glob
+    for path in glob.glob(os.path.join(os.environ['METRICS_DIR'], '*.json')):
+        os.remove(path)
+
+def pre_fork(server, worker):
+    # Move everything loaded so far out of the garbage collector's reach, so
+    # collections in the workers do not write to (and un-share) those pages
+    gc.freeze()
+
+def post_fork(server, worker):
+    # Workers may SIGTERM themselves past MAX_WORKER_RSS_MB; the arbiter replaces them
+    import memory
+    memory.allow_recycling()
+    server.log.info("Worker %s forked with preloaded model", worker.pid)
+
+    # Continue the master's startup report in this worker, and warm up here rather than
+    # in the master so XGBoost's thread pool is created after the fork
+    import app
+    app.startup_report.fork()
+    if app.WARMUP:
+        app.warmup()
+
+def worker_exit(server, worker):
+    # Publish this worker's final numbers before it exits
+    import app
+    app.metrics.flush()
+
+def child_exit(server, worker):
+    # In the master: keep the exited worker's counters in the service totals
+    import metrics
+    metrics.retire_worker(os.environ['METRICS_DIR'], worker.pid)
+
+def on_exit(server):
+    if _own_metrics_dir:
+        shutil.rmtree(os.environ['METRICS_DIR'], ignore_errors=True)
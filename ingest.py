@@ -0,0 +1,115 @@
+"""
+Excel ingestion for the Flight Price Prediction System
+Reading Data_Train.xlsx with pd.read_excel takes seconds on every run
+(openpyxl parses the workbook XML cell by cell on one thread). This
+converts a workbook once into a typed Parquet file in data/ingested/
+(INGEST_DIR): Airline, Source, Destination, Route and Additional_Info
+become category columns and Date_of_Journey a datetime, while the other
+raw columns stay as read. The SHA-256 of the source file is stored in the
+Parquet metadata, and the file is reused as long as the source hashes the
+same, so a rerun reads it in milliseconds. features.load_raw, and through
+it train_model.py, tune.py and the training pipeline, loads .xlsx files
+this way.
+
+Usage: python ingest.py [Data_Train.xlsx Data_Test.xlsx] [--output-dir DIR] [--force]
+"""
+
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from features import DATE_FORMAT
+from fileutil import file_sha256, write_atomic
+
+INGEST_DIR = os.environ.get('INGEST_DIR', os.path.join('data', 'ingested'))
+
+DEFAULT_SOURCES = ['Data_Train.xlsx', 'Data_Test.xlsx']
+
+# Low-cardinality text columns, stored as dictionary-encoded categories
+CATEGORY_COLUMNS = ['Airline', 'Source', 'Destination', 'Route', 'Additional_Info']
+
+SOURCE_HASH_KEY = b'ingest.source_sha256'
+
+def ingested_path(source, directory=INGEST_DIR):
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(directory, f"{stem}.parquet")
+
+def read_source(source):
+    extension = os.path.splitext(source)[1].lower()
+    if extension in ('.xlsx', '.xls'):
+        return pd.read_excel(source)
+    if extension == '.csv':
+        return pd.read_csv(source)
+    raise ValueError(f"Unsupported source format {extension!r} (expected .xlsx or .csv)")
+
+def typed(raw):
+    """raw with category columns and a datetime Date_of_Journey (unparseable dates become NaT)"""
+    raw = raw.copy()
+    for column in CATEGORY_COLUMNS:
+        if column in raw.columns:
+            raw[column] = raw[column].astype('category')
+    if 'Date_of_Journey' in raw.columns and not pd.api.types.is_datetime64_any_dtype(raw['Date_of_Journey']):
+        raw['Date_of_Journey'] = pd.to_datetime(raw['Date_of_Journey'].astype(str), format=DATE_FORMAT,
+                                                errors='coerce')
+    return raw
+
+def stored_hash(path):
+    """Source hash recorded in an ingested file, or None if it is missing or unreadable"""
+    import pyarrow.parquet as pq
+    try:
+        metadata = pq.read_schema(path).metadata or {}
+    except (OSError, ValueError):
+        return None
+    value = metadata.get(SOURCE_HASH_KEY)
+    return value.decode() if value else None
+
+def convert(source, destination, source_hash=None):
+    """Write source as typed Parquet to destination (atomically), tagged with its hash"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(typed(read_source(source)), preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[SOURCE_HASH_KEY] = (source_hash or file_sha256(source)).encode()
+    os.makedirs(os.path.dirname(destination) or '.', exist_ok=True)
+    with write_atomic(destination, 'wb') as f:
+        pq.write_table(table.replace_schema_metadata(metadata), f)
+
+def ingest(source, directory=INGEST_DIR, force=False):
+    """(Parquet path, 'cached' or 'converted'), converting only when the source changed"""
+    destination = ingested_path(source, directory)
+    source_hash = file_sha256(source)
+    if not force and stored_hash(destination) == source_hash:
+        return destination, 'cached'
+    convert(source, destination, source_hash)
+    return destination, 'converted'
+
+def load_ingested(source, directory=INGEST_DIR):
+    """source as a typed DataFrame, read from its ingested Parquet file"""
+    path, _ = ingest(source, directory)
+    return pd.read_parquet(path)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('sources', nargs='*', help='Excel or CSV files (default: Data_Train.xlsx, Data_Test.xlsx)')
+    parser.add_argument('--output-dir', default=INGEST_DIR)
+    parser.add_argument('--force', action='store_true', help='Convert even if the source is unchanged')
+    args = parser.parse_args()
+
+    sources = args.sources or [path for path in DEFAULT_SOURCES if os.path.exists(path)]
+    if not sources:
+        parser.error(f"No sources given and none of {', '.join(DEFAULT_SOURCES)} found")
+    for source in sources:
+        start = time.perf_counter()
+        path, status = ingest(source, args.output_dir, args.force)
+        ingest_s = time.perf_counter() - start
+        start = time.perf_counter()
+        frame = pd.read_parquet(path)
+        read_ms = (time.perf_counter() - start) * 1000
+        print(f"{source}: {status} in {ingest_s:.2f}s -> {path} ({len(frame):,} rows, "
+              f"{os.path.getsize(path) / 1024:,.0f} KB, reads in {read_ms:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Per-worker memory accounting for the Flight Price Prediction API
+Reports the RSS of every gunicorn worker (read from /proc, so siblings can
+be compared with each other and with MAX_WORKER_RSS_MB), and for the
+answering process the Python heap as seen by tracemalloc (top
+allocators and growth since a baseline snapshot) and approximate sizes of
+long-lived objects. MemoryMonitor also checks RSS after requests and, past
+a threshold, asks the worker to exit gracefully so gunicorn replaces it.
+"""
+
+import gc
+import os
+import signal
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+# Set in gunicorn workers (see gunicorn.conf.py); elsewhere SIGTERM would just kill the server
+_recycle_allowed = False
+# The gunicorn master, whose children are this worker's siblings
+_master_pid = None
+
+def allow_recycling():
+    """Let MemoryMonitor recycle this process and report its sibling workers (call from a gunicorn worker)"""
+    global _recycle_allowed, _master_pid
+    _recycle_allowed = True
+    _master_pid = os.getppid()
+
+def child_pids(pid):
+    """Pids of a process's children, from /proc"""
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            return sorted(int(child) for child in f.read().split())
+    except OSError:
+        pass
+    # Kernels without CONFIG_PROC_CHILDREN: scan every process's parent pid
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name may contain spaces, so split after its closing parenthesis
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+def process_memory(pid):
+    """{'rss_mb', 'pss_mb'} of a process from /proc, or None if it is gone
+
+    PSS splits pages shared copy-on-write with the master and the other
+    workers between them, so it shows what each worker really adds.
+    """
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            rss = int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+    result = {'rss_mb': round(rss / 2**20, 1), 'pss_mb': None}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Pss:'):
+                    result['pss_mb'] = round(int(line.split()[1]) / 1024, 1)
+                    break
+    except OSError:
+        pass
+    return result
+
+def rss_bytes():
+    """Current resident set size of this process"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        import resource
+        # ru_maxrss (peak, in kB on Linux) is the best available without /proc
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def peak_rss_bytes():
+    """Peak resident set size of this process"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return rss_bytes()
+
+def deep_sizeof(obj, seen=None):
+    """Approximate bytes held by obj and everything reachable from it
+
+    Follows containers, instance attributes and NumPy buffers; modules,
+    classes and functions are shared and not counted.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen or isinstance(obj, (type, type(sys), type(deep_sizeof))):
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return sys.getsizeof(obj) + (obj.nbytes if obj.base is None else 0)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    if hasattr(obj, '__dict__'):
+        size += deep_sizeof(vars(obj), seen)
+    for slot in getattr(type(obj), '__slots__', ()):
+        if hasattr(obj, slot):
+            size += deep_sizeof(getattr(obj, slot), seen)
+    return size
+
+def model_sizeof(model):
+    """Bytes held by a model: the serialized booster for XGBoost, else deep_sizeof"""
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    if hasattr(booster, 'save_raw'):
+        # The C++ booster is invisible to sys.getsizeof; its serialized size is a close proxy
+        return len(booster.save_raw())
+    return deep_sizeof(model)
+
+def heap_snapshot():
+    """tracemalloc snapshot without tracemalloc's own and the import machinery's allocations"""
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ])
+
+def format_trace(statistic):
+    frame = statistic.traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+class MemoryMonitor:
+    """RSS threshold checks and tracemalloc snapshots for one process"""
+
+    def __init__(self, max_rss_mb=0, check_interval=5.0, tracemalloc_frames=0):
+        self.max_rss_bytes = int(max_rss_mb * 1024 * 1024)
+        self.check_interval = check_interval
+        self.baseline = None
+        self.baseline_time = None
+        self.recycling = False
+        self._next_check = 0.0
+        if tracemalloc_frames > 0:
+            self.start_tracing(tracemalloc_frames)
+
+    def check(self):
+        """After a request: recycle the worker if RSS passed the threshold (rate-limited, cheap)"""
+        if not self.max_rss_bytes or self.recycling:
+            return
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        rss = rss_bytes()
+        if rss > self.max_rss_bytes:
+            if not _recycle_allowed:
+                print(f"Worker {os.getpid()} RSS {rss / 2**20:.0f} MB is over MAX_WORKER_RSS_MB "
+                      f"({self.max_rss_bytes / 2**20:.0f} MB); not under gunicorn, not recycling")
+                self._next_check = now + 60.0
+                return
+            self.recycling = True
+            print(f"Worker {os.getpid()} RSS {rss / 2**20:.0f} MB is over MAX_WORKER_RSS_MB "
+                  f"({self.max_rss_bytes / 2**20:.0f} MB); recycling after the current request")
+            # Gunicorn treats SIGTERM as a graceful stop and forks a replacement
+            os.kill(os.getpid(), signal.SIGTERM)
+
+    def start_tracing(self, frames=1):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop_tracing(self):
+        tracemalloc.stop()
+        self.baseline = None
+        self.baseline_time = None
+
+    def take_baseline(self):
+        """Snapshot the heap now; later reports show growth relative to it"""
+        self.start_tracing()
+        self.baseline = heap_snapshot()
+        self.baseline_time = time.time()
+
+    def workers(self):
+        """RSS and PSS of every gunicorn worker (just this process outside gunicorn)"""
+        pids = child_pids(_master_pid) if _master_pid else [os.getpid()]
+        workers = []
+        for pid in pids:
+            usage = process_memory(pid)
+            if usage is None:
+                continue
+            usage = {'pid': pid, **usage, 'this_worker': pid == os.getpid()}
+            if self.max_rss_bytes:
+                usage['over_limit'] = usage['rss_mb'] * 2**20 > self.max_rss_bytes
+            workers.append(usage)
+        return workers
+
+    def report(self, top=10):
+        """RSS of every worker; GC and tracemalloc figures for this process"""
+        result = {
+            'pid': os.getpid(),
+            'rss_mb': round(rss_bytes() / 2**20, 1),
+            'peak_rss_mb': round(peak_rss_bytes() / 2**20, 1),
+            'max_rss_mb': round(self.max_rss_bytes / 2**20, 1) if self.max_rss_bytes else None,
+            'gc_objects': len(gc.get_objects()),
+            'gc_frozen': gc.get_freeze_count(),
+            'tracemalloc': {'tracing': tracemalloc.is_tracing()},
+        }
+        result['workers'] = self.workers()
+        if not tracemalloc.is_tracing():
+            return result
+
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = heap_snapshot()
+        result['tracemalloc'].update({
+            'traced_mb': round(current / 2**20, 2),
+            'traced_peak_mb': round(peak / 2**20, 2),
+            'top': [{'location': format_trace(stat), 'size_kb': round(stat.size / 1024, 1),
+                     'count': stat.count}
+                    for stat in snapshot.statistics('lineno')[:top]],
+        })
+        if self.baseline is not None:
+            result['tracemalloc']['baseline_age_s'] = round(time.time() - self.baseline_time, 1)
+            result['tracemalloc']['growth'] = [
+                {'location': format_trace(stat), 'size_diff_kb': round(stat.size_diff / 1024, 1),
+                 'count_diff': stat.count_diff}
+                for stat in snapshot.compare_to(self.baseline, 'lineno')[:top]
+            ]
+        return result
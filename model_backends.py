@@ -0,0 +1,85 @@
+"""
+Model scoring backends for the Flight Price Prediction API
+Each backend scores a float32 feature matrix and returns a 1-D array of prices.
+"""
+
+from feature_encoder import FEATURE_COLUMNS, check_feature_names
+
+class SklearnPredictor:
+    """Score through the XGBRegressor sklearn wrapper"""
+
+    name = 'sklearn'
+
+    def __init__(self, model):
+        self.model = model
+        booster = model.get_booster()
+        self.feature_names = list(booster.feature_names or FEATURE_COLUMNS)
+
+    def predict(self, matrix):
+        return self.model.predict(matrix)
+
+class BoosterPredictor:
+    """Score contiguous NumPy arrays directly with Booster.inplace_predict
+
+    Feature names, feature count and the iteration range are resolved once
+    here, so predict() skips the wrapper, DMatrix construction and the
+    per-call feature validation.
+    """
+
+    name = 'booster'
+
+    def __init__(self, model, nthread=None):
+        booster = model.get_booster() if hasattr(model, 'get_booster') else model
+        self.feature_names = list(booster.feature_names or FEATURE_COLUMNS)
+        check_feature_names(self.feature_names)
+        if booster.num_features() != len(self.feature_names):
+            raise ValueError(f"Model has {booster.num_features()} features, "
+                             f"expected {len(self.feature_names)}")
+        if nthread:
+            booster.set_param({'nthread': int(nthread)})
+
+        # Match XGBRegressor.predict: stop at the early-stopping best iteration
+        best_iteration = getattr(model, 'best_iteration', None)
+        self.iteration_range = (0, best_iteration + 1) if best_iteration is not None else (0, 0)
+        self.missing = getattr(model, 'missing', None)
+        if self.missing is None:
+            self.missing = float('nan')
+        self.booster = booster
+
+    def predict(self, matrix):
+        return self.booster.inplace_predict(
+            matrix,
+            iteration_range=self.iteration_range,
+            missing=self.missing,
+            validate_features=False,
+        )
+
+class NumpyTreePredictor:
+    """Score with the pure-NumPy FlatTreeEnsemble (no xgboost needed at serving time)"""
+
+    name = 'numpy'
+
+    def __init__(self, model):
+        from tree_ensemble import FlatTreeEnsemble
+
+        if isinstance(model, FlatTreeEnsemble):
+            self.ensemble = model
+        else:
+            self.ensemble = FlatTreeEnsemble.from_booster(model)
+        self.feature_names = list(self.ensemble.feature_names or FEATURE_COLUMNS)
+        check_feature_names(self.feature_names)
+
+    def predict(self, matrix):
+        return self.ensemble.predict(matrix)
+
+BACKENDS = {
+    'sklearn': SklearnPredictor,
+    'booster': BoosterPredictor,
+    'numpy': NumpyTreePredictor,
+}
+
+def make_predictor(model, backend='booster', **kwargs):
+    """Build the scoring backend named `backend` for a loaded model"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown prediction backend: {backend} (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[backend](model, **kwargs)
@@ -0,0 +1,118 @@
+"""
+Native model bundle for the Flight Price Prediction System
+A versioned directory holding the XGBoost booster in UBJSON format, one
+JSON schema file with the feature order and the category encoders, and the
+trees flattened to NumPy arrays. Loading it avoids unpickling the sklearn
+wrapper and the three encoder pickles; load_tree_bundle() does not need
+xgboost at all.
+
+Usage: python model_bundle.py   (export a bundle from the existing pickles)
+"""
+
+import hashlib
+import json
+import os
+import warnings
+from datetime import datetime, timezone
+
+from fileutil import write_atomic
+from tree_ensemble import FlatTreeEnsemble
+
+BUNDLE_DIR = "model_bundle"
+BUNDLE_FORMAT_VERSION = 1
+MODEL_FILE = "model.ubj"
+SCHEMA_FILE = "schema.json"
+TREES_FILE = "trees.npz"
+
+def ubj_version(raw):
+    """Model version: short SHA-256 of the booster's UBJ serialization"""
+    return hashlib.sha256(raw).hexdigest()[:12]
+
+def booster_version(model):
+    """The version export_bundle records for model (an XGBModel or a Booster)"""
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    return ubj_version(bytes(booster.save_raw(raw_format='ubj')))
+
+def export_bundle(model, dict_air, dict_des, dict_stp, path=BUNDLE_DIR, metadata=None):
+    """Write the booster and encoders of a trained model as a native bundle
+
+    metadata (e.g. the parent version of an incremental update) is stored
+    in the schema next to the standard fields.
+    """
+    import xgboost as xgb
+
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    raw = bytes(booster.save_raw(raw_format='ubj'))
+    schema = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'model_version': ubj_version(raw),
+        'model_file': MODEL_FILE,
+        'trees_file': TREES_FILE,
+        'xgboost_version': xgb.__version__,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'feature_names': booster.feature_names,
+        'encoders': {
+            'airline': {k: int(v) for k, v in dict_air.items()},
+            'destination': {k: int(v) for k, v in dict_des.items()},
+            'stops': {k: int(v) for k, v in dict_stp.items()},
+        },
+    }
+    if metadata:
+        schema.update(metadata)
+
+    os.makedirs(path, exist_ok=True)
+    with write_atomic(os.path.join(path, MODEL_FILE), 'wb') as f:
+        f.write(raw)
+    with write_atomic(os.path.join(path, TREES_FILE), 'wb') as f:
+        FlatTreeEnsemble.from_booster(model).save(f)
+    with write_atomic(os.path.join(path, SCHEMA_FILE)) as f:
+        json.dump(schema, f, indent=2)
+    return schema
+
+def read_schema(path=BUNDLE_DIR):
+    """Read and check the bundle schema file"""
+    with open(os.path.join(path, SCHEMA_FILE)) as f:
+        schema = json.load(f)
+    if schema.get('format_version') != BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported model bundle format: {schema.get('format_version')}")
+    return schema
+
+def load_bundle(path=BUNDLE_DIR):
+    """Load a bundle as (model, dict_air, dict_des, dict_stp, schema)
+
+    XGBoost reads the booster file by path and parses it straight into its
+    own trees, so no copy of the file passes through Python and no pickle
+    runs. The parsed trees are ordinary heap memory; forked workers share
+    them only when the master loads the model (gunicorn --preload).
+    """
+    import xgboost as xgb
+
+    schema = read_schema(path)
+    model = xgb.XGBRegressor()
+    with warnings.catch_warnings():
+        # The bundle deliberately holds a plain booster, not sklearn metadata
+        warnings.simplefilter('ignore', UserWarning)
+        model.load_model(os.path.join(path, schema['model_file']))
+    if schema.get('feature_names'):
+        model.get_booster().feature_names = schema['feature_names']
+
+    encoders = schema['encoders']
+    return model, encoders['airline'], encoders['destination'], encoders['stops'], schema
+
+def load_tree_bundle(path=BUNDLE_DIR):
+    """Load a bundle as (FlatTreeEnsemble, dict_air, dict_des, dict_stp, schema) without xgboost"""
+    schema = read_schema(path)
+    if 'trees_file' not in schema:
+        raise ValueError("Model bundle has no flattened trees; re-export it")
+    ensemble = FlatTreeEnsemble.load(os.path.join(path, schema['trees_file']))
+
+    encoders = schema['encoders']
+    return ensemble, encoders['airline'], encoders['destination'], encoders['stops'], schema
+
+if __name__ == "__main__":
+    import joblib
+
+    model = joblib.load("xgb_best.pkl")
+    schema = export_bundle(model, joblib.load("dict_air.pkl"), joblib.load("dict_des.pkl"),
+                           joblib.load("dict_stp.pkl"))
+    print(f"Exported model bundle {schema['model_version']} to {BUNDLE_DIR}/")
@@ -0,0 +1,190 @@
+"""
+Out-of-core training for the Flight Price Prediction System
+Trains on Parquet files written by data_generator.py (or any Parquet with
+the create_sample_data columns) without loading them into one DataFrame.
+A first pass over the Airline, Destination and Price columns builds the
+encoders exactly as preprocess_data would on the full data; then an
+xgb.DataIter feeds XGBoost one row group at a time, encoded with
+apply_encoders. The last row group is held out for evaluation.
+
+Modes:
+  external   DMatrix with an on-disk cache (cache_prefix): feature pages are
+             written to --cache-dir and streamed back for every boosting
+             round, so feature data in memory is bounded by the row group
+             size (trains with tree_method=approx)
+  quantile   QuantileDMatrix from the same iterator: streamed, but XGBoost
+             1.7 still builds an in-memory copy before quantizing
+  in-memory  read everything into one DataFrame first, as train_model.py does
+             (for comparison)
+
+XGBoost keeps per-row training state (gradients, predictions, row
+partitions) in memory in every mode, about 150 bytes per row with 1.7, so
+that, not the features, is what limits the row count in external mode.
+
+Usage: python out_of_core.py data/flights.parquet [--mode external] [--rounds 100]
+                             [--cache-dir DIR] [--save]
+
+Peak RSS (the kernel's high-water mark) is reported next to the size the
+encoded dataset would take in memory as float32.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pyarrow.parquet as pq
+import xgboost as xgb
+
+from features import DICT_STP, rank_codes
+from memory import peak_rss_bytes, rss_bytes
+from train_model import MODEL_PARAMS, apply_encoders, save_artifacts
+
+MODES = ('external', 'quantile', 'in-memory')
+# XGBoost 1.7 streams external-memory pages with approx; hist there loads all pages at once
+TREE_METHODS = {'external': 'approx', 'quantile': 'hist', 'in-memory': 'hist'}
+
+def native_params(params=MODEL_PARAMS, mode='external'):
+    """(xgb.train parameters, rounds) for XGBRegressor-style params in the given mode"""
+    params = dict(params)
+    rounds = params.pop('n_estimators', 100)
+    if 'random_state' in params:
+        params['seed'] = params.pop('random_state')
+    params.setdefault('objective', 'reg:squarederror')
+    params['tree_method'] = TREE_METHODS[mode]
+    return params, rounds
+
+def row_groups(paths):
+    """(ParquetFile, row group index) for every row group of the files"""
+    groups = []
+    for path in paths:
+        parquet_file = pq.ParquetFile(path)
+        groups.extend((parquet_file, index) for index in range(parquet_file.num_row_groups))
+    return groups
+
+def read_group(group, columns=None):
+    parquet_file, index = group
+    return parquet_file.read_row_group(index, columns=columns).to_pandas()
+
+def fit_encoders_streaming(groups):
+    """preprocess_data's encoders from per-row-group price sums and counts"""
+    totals = {'Airline': None, 'Destination': None}
+    for group in groups:
+        chunk = read_group(group, columns=['Airline', 'Destination', 'Price'])
+        for column in totals:
+            stats = chunk.groupby(column, observed=True)['Price'].agg(['sum', 'count'])
+            totals[column] = stats if totals[column] is None else totals[column].add(stats, fill_value=0)
+    means = {column: stats['sum'] / stats['count'] for column, stats in totals.items()}
+    return rank_codes(means['Airline']), rank_codes(means['Destination']), dict(DICT_STP)
+
+def encode_group(group, encoders):
+    """(X as float32 DataFrame, y) for one row group"""
+    X, y = apply_encoders(read_group(group), *encoders)
+    return X.astype(np.float32), y.astype(np.float32)
+
+class ParquetBatches(xgb.DataIter):
+    """Row groups of Parquet files, encoded one at a time, as an XGBoost data iterator"""
+
+    def __init__(self, groups, encoders, cache_prefix=None):
+        self.groups = groups
+        self.encoders = encoders
+        self.position = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data):
+        if self.position == len(self.groups):
+            return 0
+        X, y = encode_group(self.groups[self.position], self.encoders)
+        input_data(data=X, label=y)
+        self.position += 1
+        return 1
+
+    def reset(self):
+        self.position = 0
+
+def build_dmatrix(groups, encoders, mode, cache_dir):
+    if mode == 'external':
+        return xgb.DMatrix(ParquetBatches(groups, encoders, os.path.join(cache_dir, 'cache')))
+    if mode == 'quantile':
+        return xgb.QuantileDMatrix(ParquetBatches(groups, encoders))
+    import pandas as pd
+    parts = [encode_group(group, encoders) for group in groups]
+    return xgb.DMatrix(pd.concat([X for X, _ in parts]), label=pd.concat([y for _, y in parts]))
+
+def train_out_of_core(paths, mode='external', rounds=None, cache_dir=None, params=MODEL_PARAMS):
+    """Train on Parquet files; returns (booster, encoders, report dict)"""
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode!r}, expected one of {', '.join(MODES)}")
+    groups = row_groups(paths)
+    if len(groups) < 2:
+        raise ValueError("Need at least two row groups (one is held out for evaluation)")
+    train_groups, holdout_group = groups[:-1], groups[-1]
+    n_rows = sum(parquet_file.metadata.row_group(index).num_rows for parquet_file, index in train_groups)
+
+    xgb_params, default_rounds = native_params(params, mode)
+    rounds = rounds or default_rounds
+    owns_cache_dir = cache_dir is None
+    if mode == 'external':
+        cache_dir = cache_dir or tempfile.mkdtemp(prefix='xgb-cache-')
+        os.makedirs(cache_dir, exist_ok=True)
+
+    timings = {}
+    start = time.perf_counter()
+    encoders = fit_encoders_streaming(groups)
+    timings['encoders_s'] = time.perf_counter() - start
+    try:
+        start = time.perf_counter()
+        dtrain = build_dmatrix(train_groups, encoders, mode, cache_dir)
+        timings['dmatrix_s'] = time.perf_counter() - start
+        start = time.perf_counter()
+        booster = xgb.train(xgb_params, dtrain, num_boost_round=rounds)
+        timings['train_s'] = time.perf_counter() - start
+        del dtrain
+    finally:
+        if mode == 'external' and owns_cache_dir:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    X_holdout, y_holdout = encode_group(holdout_group, encoders)
+    predictions = booster.inplace_predict(X_holdout)
+    n_features = X_holdout.shape[1]
+    report = {
+        'mode': mode,
+        'rows': n_rows,
+        'row_groups': len(train_groups),
+        'rounds': rounds,
+        'holdout_rows': len(y_holdout),
+        'holdout_rmse': float(np.sqrt(np.mean((predictions - y_holdout.to_numpy()) ** 2))),
+        'dataset_float32_mb': n_rows * (n_features + 1) * 4 / 2**20,
+        'rss_mb': rss_bytes() / 2**20,
+        'peak_rss_mb': peak_rss_bytes() / 2**20,
+        **timings,
+    }
+    return booster, encoders, report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='+', help='Parquet files (e.g. from data_generator.py)')
+    parser.add_argument('--mode', choices=MODES, default='external')
+    parser.add_argument('--rounds', type=int, help="Boosting rounds (default: MODEL_PARAMS' n_estimators)")
+    parser.add_argument('--cache-dir', help='Directory for the external-memory cache (default: a temp dir)')
+    parser.add_argument('--save', action='store_true', help='Publish the model as the served model')
+    args = parser.parse_args()
+
+    booster, encoders, report = train_out_of_core(args.paths, args.mode, args.rounds, args.cache_dir)
+    print(f"Trained {report['rounds']} rounds on {report['rows']:,} rows in {report['row_groups']} row groups "
+          f"({report['mode']}): encoders {report['encoders_s']:.1f}s, DMatrix {report['dmatrix_s']:.1f}s, "
+          f"training {report['train_s']:.1f}s")
+    print(f"Holdout RMSE {report['holdout_rmse']:.2f} on {report['holdout_rows']:,} rows")
+    print(f"Peak RSS {report['peak_rss_mb']:,.0f} MB for a dataset of {report['dataset_float32_mb']:,.0f} MB "
+          f"as float32 (RSS now {report['rss_mb']:,.0f} MB)")
+
+    if args.save:
+        model = xgb.XGBRegressor()
+        model.load_model(bytearray(booster.save_raw(raw_format='ubj')))
+        schema = save_artifacts(model, *encoders)
+        print(f"Published model {schema['model_version']}")
+
+if __name__ == "__main__":
+    main()
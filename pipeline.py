@@ -0,0 +1,256 @@
+"""
+Cached training pipeline for the Flight Price Prediction System
+Splits training into stages, load -> parse -> encode -> split -> fit ->
+evaluate, and stores each stage's outputs on disk (Parquet for frames,
+.npy for arrays, JSON for encoders and metrics, UBJSON for the model) under
+a key that hashes the stage's parameters, the source code it runs and the
+keys of the stages it reads from. The load stage's key also hashes the
+source file's contents. A stage whose key is already on disk is not
+run, and its outputs are only read if a later stage that does run needs
+them, so changing the model parameters re-runs fit and evaluate only.
+
+The cache lives in .stage_cache/ (STAGE_CACHE_DIR); delete it to start
+over. train_model.py trains through this pipeline.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+import features
+import ingest
+from fileutil import file_sha256
+from train_model import MODEL_PARAMS, apply_encoders, create_sample_data, fit_encoders
+
+CACHE_DIR = os.environ.get('STAGE_CACHE_DIR', '.stage_cache')
+
+STAGES = ('load', 'parse', 'encode', 'split', 'fit', 'evaluate')
+
+def code_digest(*objects):
+    """Hash of the source code of functions and modules"""
+    digest = hashlib.sha256()
+    for obj in objects:
+        digest.update(inspect.getsource(obj).encode())
+    return digest.hexdigest()
+
+def _write_output(directory, name, value):
+    import xgboost as xgb
+
+    if isinstance(value, pd.DataFrame):
+        value.to_parquet(os.path.join(directory, f"{name}.parquet"))
+    elif isinstance(value, pd.Series):
+        value.to_frame().to_parquet(os.path.join(directory, f"{name}.series.parquet"))
+    elif isinstance(value, np.ndarray):
+        np.save(os.path.join(directory, f"{name}.npy"), value)
+    elif isinstance(value, xgb.XGBModel):
+        value.save_model(os.path.join(directory, f"{name}.ubj"))
+    else:
+        with open(os.path.join(directory, f"{name}.json"), 'w') as f:
+            json.dump(value, f)
+
+def _output_name(filename):
+    for suffix in ('.series.parquet', '.parquet', '.npy', '.ubj', '.json'):
+        if filename.endswith(suffix):
+            return filename[:-len(suffix)]
+    return None
+
+def _read_output(path):
+    if path.endswith('.series.parquet'):
+        return pd.read_parquet(path).iloc[:, 0]
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    if path.endswith('.npy'):
+        return np.load(path)
+    if path.endswith('.ubj'):
+        import xgboost as xgb
+        model = xgb.XGBRegressor()
+        model.load_model(path)
+        return model
+    with open(path) as f:
+        return json.load(f)
+
+class CachedOutputs(Mapping):
+    """A cached stage's outputs, each read from disk on first access"""
+
+    def __init__(self, directory):
+        self._paths = {_output_name(name): os.path.join(directory, name)
+                       for name in os.listdir(directory) if _output_name(name)}
+        self._values = {}
+
+    def __getitem__(self, name):
+        if name not in self._values:
+            self._values[name] = _read_output(self._paths[name])
+        return self._values[name]
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __len__(self):
+        return len(self._paths)
+
+class StageCache:
+    """Stage outputs on disk, one directory per (stage, key)"""
+
+    def __init__(self, directory=CACHE_DIR, enabled=True):
+        self.directory = directory
+        self.enabled = enabled
+
+    def path(self, stage, key):
+        return os.path.join(self.directory, f"{stage}-{key[:20]}")
+
+    def contains(self, stage, key):
+        return self.enabled and os.path.isdir(self.path(stage, key))
+
+    def load(self, stage, key):
+        return CachedOutputs(self.path(stage, key))
+
+    def save(self, stage, key, outputs):
+        """Write outputs to a temporary directory and rename it into place"""
+        if not self.enabled:
+            return
+        path = self.path(stage, key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(temp_path, exist_ok=True)
+        try:
+            for name, value in outputs.items():
+                _write_output(temp_path, name, value)
+            os.rename(temp_path, path)
+        except OSError:
+            # Another run finished the same stage first; its outputs are identical
+            if not os.path.isdir(path):
+                raise
+        finally:
+            shutil.rmtree(temp_path, ignore_errors=True)
+
+# Stage functions: their source is part of their cache key
+
+def load_stage(source, sample_rows):
+    """Raw records from a file, or create_sample_data rows"""
+    if source:
+        return {'raw': features.load_raw(source)}
+    return {'raw': create_sample_data(n_samples=sample_rows)}
+
+def parse_stage(raw, kind):
+    """Engineered columns; raw records go through features.parse_raw, sample rows already have them"""
+    if kind == 'sample':
+        return {'parsed': raw}
+    parsed, valid = features.parse_raw(raw)
+    if 'Price' not in raw.columns:
+        raise ValueError("Raw training records need a Price column")
+    return {'parsed': parsed[valid & raw['Price'].notna().to_numpy()]}
+
+def encode_stage(parsed, kind):
+    """Feature matrix, target and the encoders fitted on this data"""
+    if kind == 'sample':
+        dict_air, dict_des, dict_stp = fit_encoders(parsed)
+        X, y = apply_encoders(parsed.copy(), dict_air, dict_des, dict_stp)
+    else:
+        dict_air, dict_des, dict_stp = features.fit_encoders(parsed, parsed['Price'])
+        X, y = features.encode_features(parsed, dict_air, dict_des, dict_stp), parsed['Price']
+    return {'X': X, 'y': y, 'encoders': {'airline': dict_air, 'destination': dict_des, 'stops': dict_stp}}
+
+def split_stage(n_rows, test_size, random_state):
+    """Train/test row positions; the same split train_test_split(X, y) makes"""
+    from sklearn.model_selection import train_test_split
+    train_index, test_index = train_test_split(np.arange(n_rows), test_size=test_size,
+                                               random_state=random_state)
+    return {'train_index': train_index, 'test_index': test_index}
+
+def fit_stage(X, y, train_index, params):
+    import xgboost as xgb
+    model = xgb.XGBRegressor(**params)
+    model.fit(X.iloc[train_index], y.iloc[train_index])
+    return {'model': model}
+
+def evaluate_stage(model, X, y, test_index):
+    from sklearn.metrics import mean_squared_error, r2_score
+    y_test = y.iloc[test_index]
+    y_pred = model.predict(X.iloc[test_index])
+    return {'metrics': {'rmse': float(np.sqrt(mean_squared_error(y_test, y_pred))),
+                        'r2': float(r2_score(y_test, y_pred)), 'test_rows': int(len(test_index))}}
+
+class TrainingPipeline:
+    """One training run: computes stage keys up front and runs only the stages whose outputs are missing"""
+
+    def __init__(self, source=None, params=MODEL_PARAMS, test_size=0.2, random_state=42, sample_rows=1000,
+                 cache=None):
+        import sklearn
+        import xgboost as xgb
+
+        self.source = source
+        self.kind = 'raw' if source else 'sample'
+        self.sample_rows = sample_rows
+        self.params = dict(params)
+        self.test_size = test_size
+        self.random_state = random_state
+        self.cache = cache if cache is not None else StageCache()
+        self.log = []
+        self._outputs = {}
+
+        source_digest = file_sha256(source) if source else None
+        # (code, parameters, upstream stages) per stage
+        definitions = {
+            'load': ([load_stage, features.load_raw, ingest, create_sample_data],
+                     {'source': source_digest, 'sample_rows': None if source else sample_rows,
+                      'pandas': pd.__version__}, []),
+            'parse': ([parse_stage, features], {'kind': self.kind}, ['load']),
+            'encode': ([encode_stage, features, fit_encoders, apply_encoders], {'kind': self.kind}, ['parse']),
+            'split': ([split_stage], {'test_size': test_size, 'random_state': random_state,
+                                      'sklearn': sklearn.__version__}, ['encode']),
+            'fit': ([fit_stage], {'params': self.params, 'xgboost': xgb.__version__}, ['encode', 'split']),
+            'evaluate': ([evaluate_stage], {}, ['fit', 'encode', 'split']),
+        }
+        self.keys = {}
+        for stage in STAGES:
+            code, parameters, upstream = definitions[stage]
+            payload = json.dumps({'stage': stage, 'code': code_digest(*code), 'parameters': parameters,
+                                  'upstream': [self.keys[name] for name in upstream]}, sort_keys=True)
+            self.keys[stage] = hashlib.sha256(payload.encode()).hexdigest()
+
+    def output(self, stage):
+        """A stage's outputs: from memory, else from the cache, else by running it"""
+        if stage in self._outputs:
+            return self._outputs[stage]
+        key = self.keys[stage]
+        start = time.perf_counter()
+        if self.cache.contains(stage, key):
+            outputs = self.cache.load(stage, key)
+            status = 'cached'
+        else:
+            outputs = self._run(stage)
+            self.cache.save(stage, key, outputs)
+            status = 'ran'
+        elapsed = time.perf_counter() - start
+        self.log.append((stage, status, elapsed))
+        print(f"  {stage:<9} {status:<7} {elapsed * 1000:9.1f} ms  {key[:12]}")
+        self._outputs[stage] = outputs
+        return outputs
+
+    def _run(self, stage):
+        if stage == 'load':
+            return load_stage(self.source, self.sample_rows)
+        if stage == 'parse':
+            return parse_stage(self.output('load')['raw'], self.kind)
+        if stage == 'encode':
+            return encode_stage(self.output('parse')['parsed'], self.kind)
+        encoded = self.output('encode')
+        if stage == 'split':
+            return split_stage(len(encoded['y']), self.test_size, self.random_state)
+        split = self.output('split')
+        if stage == 'fit':
+            return fit_stage(encoded['X'], encoded['y'], split['train_index'], self.params)
+        return evaluate_stage(self.output('fit')['model'], encoded['X'], encoded['y'], split['test_index'])
+
+    def run(self):
+        """(model, encoders, metrics), running or loading only what they need"""
+        model = self.output('fit')['model']
+        metrics = self.output('evaluate')['metrics']
+        encoders = self.output('encode')['encoders']
+        return model, encoders, metrics
@@ -0,0 +1,226 @@
+"""
+Sampled request profiler for the Flight Price Prediction API
+Profiles a configurable fraction of requests. Every sampled request has
+its stack sampled by a background thread (PROFILE_MODE=sampling), and is
+also run under cProfile with PROFILE_MODE=cprofile. Each profile is
+written to a rotating directory, one file per request (.folded or .prof,
+the newest `keep` are kept), and all sampled stacks are aggregated per
+process into stacks-<pid>.folded, which flamegraph.pl and speedscope read
+directly.
+
+The sample rate and mode live in <directory>/settings.json. Every worker
+re-reads that file at most once a second, so writing it (by hand or
+through the admin endpoint) switches profiling on or off in all workers
+without a restart.
+"""
+
+import cProfile
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from fileutil import write_atomic
+
+MODES = ('sampling', 'cprofile')
+SETTINGS_FILE = 'settings.json'
+
+def check_settings(sample_rate, mode):
+    """Validated (sample_rate, mode); raises ValueError for anything else"""
+    if mode not in MODES:
+        raise ValueError(f"Unknown profile mode {mode!r}, expected one of {', '.join(MODES)}")
+    try:
+        sample_rate = float(sample_rate)
+    except (TypeError, ValueError):
+        raise ValueError(f"sample_rate must be a number, got {sample_rate!r}")
+    if not 0.0 <= sample_rate <= 1.0:
+        raise ValueError("sample_rate must be between 0 and 1")
+    return sample_rate, mode
+
+def fold_stack(frame):
+    """Root-first 'file:function;file:function' string for a frame"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+class StackSampler:
+    """Samples the stacks of registered threads on a fixed cadence
+
+    One background thread per process ticks every interval, independently
+    of when requests start, so a request shorter than the interval is still
+    sampled in proportion to its duration.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._active = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pid = None
+
+    def _ensure_thread(self):
+        # Threads do not survive fork, so start one per process
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name='profile-sampler', daemon=True).start()
+
+    def _run(self):
+        while True:
+            if not self._active:
+                self._wakeup.wait()
+                self._wakeup.clear()
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, stacks in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stacks[fold_stack(frame)] += 1
+
+    def add(self, thread_id):
+        with self._lock:
+            self._ensure_thread()
+            self._active[thread_id] = Counter()
+        self._wakeup.set()
+
+    def remove(self, thread_id):
+        """Stop sampling a thread and return its folded stack counts"""
+        with self._lock:
+            return self._active.pop(thread_id)
+
+class RequestProfile:
+    """Profilers attached to one sampled request"""
+
+    __slots__ = ('endpoint', 'thread_id', 'profiler')
+
+    def __init__(self, endpoint, thread_id, profiler):
+        self.endpoint = endpoint
+        self.thread_id = thread_id
+        self.profiler = profiler
+
+class RequestProfiler:
+    """Decides which requests to profile and writes their profiles to disk"""
+
+    def __init__(self, directory='profiles', sample_rate=0.0, mode='sampling', keep=100,
+                 interval_ms=1.0):
+        self.directory = directory
+        self.sample_rate, self.mode = check_settings(sample_rate, mode)
+        self.keep = keep
+        self.sampler = StackSampler(interval_ms / 1000.0)
+        self.stacks = Counter()
+        self.profiled = 0
+        self._lock = threading.Lock()
+        self._settings_mtime = None
+        self._next_check = 0.0
+
+    def _settings_path(self):
+        return os.path.join(self.directory, SETTINGS_FILE)
+
+    def _refresh(self):
+        """Pick up sample_rate/mode from the settings file if it changed"""
+        self._next_check = time.monotonic() + 1.0
+        try:
+            mtime = os.stat(self._settings_path()).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._settings_mtime:
+            return
+        self._settings_mtime = mtime
+        try:
+            with open(self._settings_path()) as f:
+                settings = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable profiler settings: {e}")
+            return
+        # A hand-edited file must never break requests: keep the current settings instead
+        try:
+            if not isinstance(settings, dict):
+                raise ValueError(f"expected a JSON object, got {type(settings).__name__}")
+            self.sample_rate, self.mode = check_settings(settings.get('sample_rate', self.sample_rate),
+                                                         settings.get('mode', self.mode))
+        except (TypeError, ValueError) as e:
+            print(f"Ignoring invalid profiler settings in {self._settings_path()}: {e}")
+
+    def configure(self, sample_rate=None, mode=None):
+        """Change the settings for every process sharing the profile directory"""
+        self.sample_rate, self.mode = check_settings(self.sample_rate if sample_rate is None else sample_rate,
+                                                     self.mode if mode is None else mode)
+        os.makedirs(self.directory, exist_ok=True)
+        with write_atomic(self._settings_path()) as f:
+            json.dump({'sample_rate': self.sample_rate, 'mode': self.mode}, f)
+        self._refresh()
+
+    def start(self, endpoint):
+        """Begin profiling this request if it is sampled, else return None (cheap)"""
+        if time.monotonic() >= self._next_check:
+            self._refresh()
+        if self.sample_rate <= 0.0 or random.random() >= self.sample_rate:
+            return None
+        thread_id = threading.get_ident()
+        self.sampler.add(thread_id)
+        profiler = None
+        if self.mode == 'cprofile':
+            profiler = cProfile.Profile()
+            profiler.enable()
+        return RequestProfile(endpoint, thread_id, profiler)
+
+    def finish(self, profile):
+        """Stop a request's profilers, write its profile and update the aggregate"""
+        if profile.profiler is not None:
+            profile.profiler.disable()
+        stacks = self.sampler.remove(profile.thread_id)
+
+        with self._lock:
+            self.profiled += 1
+            self.stacks.update(stacks)
+            name = f"{profile.endpoint}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self.profiled}"
+            # A full disk or a racing worker must never fail the request itself
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                if profile.profiler is not None:
+                    profile.profiler.dump_stats(os.path.join(self.directory, f"{name}.prof"))
+                elif stacks:
+                    self._write_folded(os.path.join(self.directory, f"{name}.folded"), stacks)
+                self._write_folded(os.path.join(self.directory, f"stacks-{os.getpid()}.folded"), self.stacks)
+                self._rotate()
+            except OSError as e:
+                print(f"Could not write profile {name}: {e}")
+
+    def _write_folded(self, path, stacks):
+        with write_atomic(path) as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def _rotate(self):
+        """Delete the oldest per-request profiles beyond keep"""
+        dumps = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(('.prof', '.folded')) and not entry.name.startswith('stacks-'):
+                try:
+                    dumps.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    # Already rotated away by another worker
+                    pass
+        dumps.sort()
+        for _, path in dumps[:max(len(dumps) - self.keep, 0)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        return {
+            'sample_rate': self.sample_rate,
+            'mode': self.mode,
+            'directory': os.path.abspath(self.directory),
+            'keep': self.keep,
+            'profiled_requests': self.profiled,
+            'distinct_stacks': len(self.stacks),
+            'pid': os.getpid(),
+        }
@@ -26,9 +26,8 @@ def run_with_gunicorn():
     try:
         subprocess.check_call([
             "gunicorn", 
+            "-c", "gunicorn.conf.py",
             "--bind", "0.0.0.0:8000",
-            "--workers", "4",
-            "--timeout", "120",
             "app:app"
         ])
     except KeyboardInterrupt:
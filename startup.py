@@ -0,0 +1,138 @@
+"""
+Startup-time breakdown for the serving process
+Importing this module starts a report that splits boot time into the
+interpreter start (process start, from /proc, to this import), the first
+import of each heavy package, each artifact load and the time to the first
+successful prediction. Heavy imports are timed by briefly wrapping
+builtins.__import__; the wrapper is removed once the first prediction has
+been recorded. Times are offsets from the process start, so under
+`gunicorn --preload` a worker's report continues the master's timeline
+from the fork.
+"""
+
+import builtins
+import os
+import sys
+import time
+from contextlib import contextmanager
+from time import perf_counter
+
+TRACKED_IMPORTS = frozenset(['flask', 'numpy', 'pandas', 'xgboost', 'joblib', 'sklearn', 'scipy',
+                             'aiohttp'])
+
+def process_start_time():
+    """Wall-clock time this process was started (or forked), to /proc's 10 ms resolution"""
+    try:
+        with open('/proc/self/stat') as f:
+            # Fields after the command name; starttime is field 22 of the whole line
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        age = uptime - int(fields[19]) / os.sysconf('SC_CLK_TCK')
+        return time.time() - age
+    except (OSError, ValueError, IndexError):
+        return None
+
+class StartupReport:
+    """Timeline of one process's boot, up to its first prediction"""
+
+    def __init__(self):
+        self.imported_at = time.time()
+        self.process_started = process_start_time() or self.imported_at
+        self.pid = os.getpid()
+        self.forked_at = None
+        self.first_prediction = None
+        self.phases = []
+        self._nested = []
+        self._original_import = None
+
+    def _offset_ms(self, wall_time):
+        return round((wall_time - self.process_started) * 1000, 1)
+
+    @contextmanager
+    def phase(self, name, kind='load'):
+        """Time the enclosed block as one phase of the startup
+
+        Phases nest: a phase's self time excludes the phases and tracked
+        imports that ran inside it, so self times add up without double
+        counting.
+        """
+        self._nested.append(0.0)
+        started, start = time.time(), perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            nested = self._nested.pop()
+            if self._nested:
+                self._nested[-1] += elapsed
+            self.phases.append({'name': name, 'kind': kind, 'start_ms': self._offset_ms(started),
+                                'duration_ms': round(elapsed * 1000, 1),
+                                'self_ms': round((elapsed - nested) * 1000, 1)})
+
+    def track_imports(self, packages=TRACKED_IMPORTS):
+        """Time the first import of each package in packages until stop_tracking_imports()"""
+        if self._original_import is not None:
+            return
+        original = self._original_import = builtins.__import__
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            root = name.partition('.')[0]
+            if level or root not in packages or root in sys.modules:
+                return original(name, globals, locals, fromlist, level)
+            with self.phase(f"import {root}", kind='import'):
+                return original(name, globals, locals, fromlist, level)
+
+        builtins.__import__ = timed_import
+
+    def stop_tracking_imports(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def fork(self):
+        """Call in a freshly forked worker: the report now describes this process"""
+        self.pid = os.getpid()
+        self.forked_at = time.time()
+        self.first_prediction = None
+        self.phases.append({'name': 'fork worker', 'kind': 'fork',
+                            'start_ms': self._offset_ms(self.forked_at), 'duration_ms': 0.0, 'self_ms': 0.0})
+
+    def record_first_prediction(self, source='request'):
+        """Note the first successful prediction in this process and log the report (once)"""
+        if self.first_prediction is not None:
+            return
+        now = time.time()
+        self.first_prediction = {'source': source, 'at_ms': self._offset_ms(now)}
+        if self.forked_at is not None:
+            self.first_prediction['since_fork_ms'] = round((now - self.forked_at) * 1000, 1)
+        self.stop_tracking_imports()
+        self.log()
+
+    def as_dict(self):
+        kinds = {'interpreter': self._offset_ms(self.imported_at)}
+        for phase in self.phases:
+            kinds[phase['kind']] = round(kinds.get(phase['kind'], 0.0) + phase['self_ms'], 1)
+        return {
+            'pid': self.pid,
+            'process_started': round(self.process_started, 3),
+            'interpreter_start_ms': self._offset_ms(self.imported_at),
+            'total_ms_by_kind': kinds,
+            'phases': sorted(self.phases, key=lambda phase: (phase['start_ms'], -phase['duration_ms'])),
+            'first_prediction': self.first_prediction,
+        }
+
+    def log(self):
+        report = self.as_dict()
+        print(f"Startup report (pid {report['pid']}):")
+        print(f"  {'phase':<36} {'at ms':>9} {'total ms':>9} {'self ms':>9}")
+        print(f"  {'interpreter start':<36} {0.0:>9} {report['interpreter_start_ms']:>9} "
+              f"{report['interpreter_start_ms']:>9}")
+        for phase in report['phases']:
+            print(f"  {phase['name']:<36} {phase['start_ms']:>9} {phase['duration_ms']:>9} {phase['self_ms']:>9}")
+        if self.first_prediction is not None:
+            print(f"  {'first prediction (' + self.first_prediction['source'] + ')':<36} "
+                  f"{self.first_prediction['at_ms']:>9}")
+
+startup_report = StartupReport()
+startup_report.track_imports()
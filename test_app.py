@@ -71,6 +71,63 @@ def test_api():
     except Exception as e:
         print(f"[ERROR] Prediction endpoint error: {e}")
     
+    # Test batch prediction endpoint
+    batch_data = [test_data, dict(test_data, airline="SpiceJet"), {"airline": "IndiGo"}]
+    
+    try:
+        response = requests.post(f"{base_url}/predict/batch", 
+                               json=batch_data,
+                               headers={'Content-Type': 'application/json'})
+        if response.status_code == 200:
+            result = response.json()
+            print(f"[OK] Batch prediction endpoint working. {result['count']} priced, {result['errors']} rejected")
+        else:
+            print(f"[ERROR] Batch prediction endpoint failed: {response.status_code}")
+            print(f"Response: {response.text}")
+    except Exception as e:
+        print(f"[ERROR] Batch prediction endpoint error: {e}")
+    
+    # Test raw-record prediction endpoint
+    raw_data = {
+        "Airline": "IndiGo", "Date_of_Journey": "24/03/2019", "Source": "Banglore",
+        "Destination": "New Delhi", "Dep_Time": "22:20", "Arrival_Time": "01:10 22 Mar",
+        "Duration": "2h 50m", "Total_Stops": "non-stop"
+    }
+    
+    try:
+        response = requests.post(f"{base_url}/predict/raw", 
+                               json=[raw_data, dict(raw_data, Duration="")],
+                               headers={'Content-Type': 'application/json'})
+        if response.status_code == 200:
+            result = response.json()
+            print(f"[OK] Raw prediction endpoint working. {result['count']} priced, {result['errors']} rejected")
+        else:
+            print(f"[ERROR] Raw prediction endpoint failed: {response.status_code}")
+            print(f"Response: {response.text}")
+    except Exception as e:
+        print(f"[ERROR] Raw prediction endpoint error: {e}")
+    
+    # Test cache stats endpoint
+    try:
+        response = requests.get(f"{base_url}/cache/stats")
+        if response.status_code == 200:
+            stats = response.json()
+            print(f"[OK] Cache stats endpoint working. {stats['hits']} hits, {stats['misses']} misses")
+        else:
+            print(f"[ERROR] Cache stats endpoint failed: {response.status_code}")
+    except Exception as e:
+        print(f"[ERROR] Cache stats endpoint error: {e}")
+
+    # Test metrics endpoint
+    try:
+        response = requests.get(f"{base_url}/metrics")
+        if response.status_code == 200 and 'flight_requests_total' in response.text:
+            print(f"[OK] Metrics endpoint working. {len(response.text.splitlines())} lines")
+        else:
+            print(f"[ERROR] Metrics endpoint failed: {response.status_code}")
+    except Exception as e:
+        print(f"[ERROR] Metrics endpoint error: {e}")
+
     print("\n[SUCCESS] API testing completed!")
 
 if __name__ == "__main__":
@@ -0,0 +1,39 @@
+"""
+Tests for the request encoder against the original DataFrame preprocess_input:
+python -m pytest test_feature_encoder.py
+"""
+
+import random
+
+import numpy as np
+
+from benchmarks.preprocess import DICT_AIR, DICT_DES, legacy_preprocess_input, random_request
+from feature_encoder import DICT_STP, FEATURE_COLUMNS, FeatureEncoder
+
+def requests_(n=300, seed=42):
+    """Random payloads, including unknown airlines, sources, destinations and stop counts"""
+    rng = random.Random(seed)
+    return [random_request(rng) for _ in range(n)]
+
+def test_encode_matches_legacy_preprocess_input():
+    encoder = FeatureEncoder(DICT_AIR, DICT_DES, DICT_STP)
+    for data in requests_():
+        expected = legacy_preprocess_input(data, DICT_AIR, DICT_DES, DICT_STP).to_numpy(dtype=np.float32)
+        np.testing.assert_array_equal(encoder.encode(data), expected)
+
+def test_encode_many_and_reused_rows_match_encode():
+    encoder = FeatureEncoder(DICT_AIR, DICT_DES, DICT_STP)
+    items = requests_(50)
+    expected = np.vstack([encoder.encode(data) for data in items])
+    np.testing.assert_array_equal(encoder.encode_many(items), expected)
+    # Writing into a reused row must clear the previous request's source one-hot
+    row = encoder.empty(1)[0]
+    for data, expected_row in zip(items, expected):
+        np.testing.assert_array_equal(encoder.encode(data, out=row), expected_row)
+
+def test_encoder_follows_model_column_order():
+    columns = list(reversed(FEATURE_COLUMNS))
+    encoder = FeatureEncoder(DICT_AIR, DICT_DES, DICT_STP, columns=columns)
+    for data in requests_(50):
+        expected = legacy_preprocess_input(data, DICT_AIR, DICT_DES, DICT_STP)[columns].to_numpy(dtype=np.float32)
+        np.testing.assert_array_equal(encoder.encode(data), expected)
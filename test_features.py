@@ -0,0 +1,54 @@
+"""
+Tests for raw-record feature engineering and /predict/raw: python -m pytest test_features.py
+"""
+
+import pandas as pd
+
+import features
+
+RAW_RECORD = {
+    'Airline': 'IndiGo', 'Date_of_Journey': '24/03/2019', 'Source': 'Banglore',
+    'Destination': 'New Delhi', 'Dep_Time': '22:20', 'Arrival_Time': '01:10 22 Mar',
+    'Duration': '2h 50m', 'Total_Stops': 'non-stop',
+}
+
+def raw_records(*durations):
+    return pd.DataFrame([dict(RAW_RECORD, Duration=duration) for duration in durations])
+
+def test_parse_raw_engineers_notebook_columns():
+    parsed, valid = features.parse_raw(raw_records('2h 50m', '19h', '5m'))
+    assert valid.tolist() == [True, True, True]
+    assert parsed['Duration'].tolist() == [170, 1140, 5]
+    assert parsed['Duration_hour'].tolist() == [2, 19, 0]
+    assert parsed['Duration_minute'].tolist() == [50, 0, 5]
+    row = parsed.iloc[0]
+    assert (row['Journey_day'], row['Journey_month'], row['Journey_year']) == (24, 3, 2019)
+    assert (row['Dep_Time_hour'], row['Dep_Time_minute']) == (22, 20)
+    assert (row['Arrival_Time_hour'], row['Arrival_Time_minute']) == (1, 10)
+    assert row['Source_Banglore'] == 1 and row['Source_Delhi'] == 0
+
+def test_parse_raw_rejects_values_that_overflow_their_dtype():
+    # Duration_minute is int8 and Duration int16: these would wrap to -126 and -25536
+    parsed, valid = features.parse_raw(raw_records('2h 130m', '40000m', '1h 5m'))
+    assert valid.tolist() == [False, False, True]
+    # Only the values that do not fit are zeroed; the rows are what gets rejected
+    assert parsed['Duration_minute'].tolist() == [0, 0, 5]
+    assert parsed['Duration'].tolist() == [250, 0, 65]
+    assert (parsed[['Duration', 'Duration_hour', 'Duration_minute']] >= 0).all().all()
+
+def test_parse_raw_marks_unparseable_rows_invalid():
+    records = raw_records('2h 50m', 'soon', '1h')
+    records.loc[2, 'Date_of_Journey'] = '2019-03-24'
+    _, valid = features.parse_raw(records)
+    assert valid.tolist() == [True, False, False]
+
+def test_predict_raw_rejects_overflowing_durations_per_row(client):
+    records = [dict(RAW_RECORD, Duration=duration) for duration in ('2h 50m', '2h 130m', '40000m')]
+    response = client.post('/predict/raw', json=records)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body['count'], body['errors']) == (1, 2)
+    statuses = [result['status'] for result in body['predictions']]
+    assert statuses == ['success', 'error', 'error']
+    assert body['predictions'][0]['predicted_price'] > 0
+    assert [result['index'] for result in body['predictions'][1:]] == [1, 2]
@@ -0,0 +1,20 @@
+"""
+Tests for the load generator's coordinated-omission correction: python -m pytest test_load.py
+"""
+
+from benchmarks.load import corrected_latencies
+
+def test_stall_of_whole_intervals_backfills_every_missed_request():
+    # A 1 s stall with a request due every 0.25 s hides three requests, due 0.75, 0.5 and 0.25 s earlier
+    corrected = corrected_latencies([0.1, 1.0], expected_interval=0.25)
+    assert sorted(corrected) == [0.1, 0.25, 0.5, 0.75, 1.0]
+
+def test_stall_between_multiples_of_the_interval():
+    corrected = corrected_latencies([0.875], expected_interval=0.25)
+    assert sorted(corrected) == [0.375, 0.625, 0.875]
+
+def test_latencies_under_two_intervals_are_left_alone():
+    assert corrected_latencies([0.25, 0.375, 0.125], expected_interval=0.25) == [0.25, 0.375, 0.125]
+
+def test_no_interval_means_no_correction():
+    assert corrected_latencies([5.0], expected_interval=0) == [5.0]
@@ -0,0 +1,104 @@
+"""
+Tests for the multi-worker metrics merge: python -m pytest test_metrics.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import metrics
+
+def dead_pid():
+    """Pid of a process that has already exited"""
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+def serve(requests, directory=None, model=('v1', 'booster'), cache=None):
+    """Registry of a worker that has answered the given (endpoint, status) requests"""
+    registry = metrics.MetricsRegistry(directory=directory, extras=lambda: {
+        'model_version': model[0], 'backend': model[1],
+        'cache_stats': cache and dict(cache, size=cache['hits']),
+    })
+    for endpoint, status in requests:
+        timer = registry.start_request(endpoint)
+        timer.mark('predict')
+        registry.end_request(timer, status)
+    return registry
+
+def write_worker(directory, pid, requests, **extras):
+    """Write the snapshot file another worker's flusher would have left behind"""
+    snapshot = serve(requests, **extras).snapshot()
+    snapshot.update(worker=f"{pid}-1", pid=pid)
+    with open(os.path.join(directory, f"metrics-{pid}-1.json"), 'w') as f:
+        json.dump(snapshot, f)
+
+def series(page, name):
+    """{label string: value} for one metric of a rendered page"""
+    values = {}
+    for line in page.splitlines():
+        if line.startswith(name + '{') or line.startswith(name + ' '):
+            labels, value = line[len(name):].rsplit(' ', 1)
+            values[labels.strip('{}')] = float(value)
+    return values
+
+def test_render_sums_counters_over_workers_and_gauges_over_live_ones(tmp_path):
+    cache = dict.fromkeys(metrics.CACHE_EVENTS, 0)
+    # This process is the live worker answering the scrape; the other one has exited
+    write_worker(tmp_path, dead_pid(), [('predict', 200)] * 2 + [('batch', 200)],
+                 model=('v0', 'numpy'), cache=dict(cache, hits=1, misses=4))
+    registry = serve([('predict', 200)] * 3 + [('predict', 400)], directory=str(tmp_path),
+                     cache=dict(cache, hits=5))
+    registry.start_request('predict')
+
+    page = registry.render()
+
+    assert len(list(tmp_path.glob('metrics-*.json'))) == 2
+    assert series(page, 'flight_requests_total') == {
+        'endpoint="batch",status="200"': 1,
+        'endpoint="predict",status="200"': 5,
+        'endpoint="predict",status="400"': 1,
+    }
+    assert series(page, 'flight_request_duration_seconds_count') == {'endpoint="batch"': 1, 'endpoint="predict"': 6}
+    assert series(page, 'flight_stage_duration_seconds_count')['endpoint="predict",stage="predict"'] == 6
+    cache_events = series(page, 'flight_prediction_cache_events_total')
+    assert (cache_events['event="hits"'], cache_events['event="misses"']) == (6, 4)
+    # Gauges only count workers that are still running
+    assert series(page, 'flight_requests_in_flight') == {'': 1}
+    assert series(page, 'flight_workers') == {'': 1}
+    assert series(page, 'flight_model_info') == {'version="v1",backend="booster"': 1}
+    assert series(page, 'flight_prediction_cache_size') == {'': 5}
+    # Every series is service-wide: no per-process labels
+    assert 'pid=' not in page
+
+def test_retire_worker_keeps_totals_without_double_counting(tmp_path):
+    first, second = dead_pid(), dead_pid()
+    write_worker(tmp_path, first, [('predict', 200)] * 3)
+    write_worker(tmp_path, second, [('predict', 200)] * 2)
+    before, _ = metrics.collect(str(tmp_path))
+
+    metrics.retire_worker(str(tmp_path), first)
+    assert not os.path.exists(tmp_path / f"metrics-{first}-1.json")
+    after, live = metrics.collect(str(tmp_path))
+    assert after['requests'] == before['requests'] == {('predict', '200'): 5}
+    assert after['histograms'][('predict', None)].count == 5
+    assert live == []
+
+    # A scrape that read the worker's file just before it was retired must not count it twice
+    write_worker(tmp_path, first, [('predict', 200)] * 3)
+    stale, _ = metrics.collect(str(tmp_path))
+    assert stale['requests'] == {('predict', '200'): 5}
+
+    metrics.retire_worker(str(tmp_path), second)
+    retired = json.loads((tmp_path / metrics.RETIRED_FILE).read_text())
+    assert retired['workers'] == [f"{first}-1", f"{second}-1"]
+    final, _ = metrics.collect(str(tmp_path))
+    assert final['requests'] == {('predict', '200'): 5}
+
+def test_render_without_directory_labels_series_with_pid():
+    registry = metrics.MetricsRegistry()
+    registry.end_request(registry.start_request('predict'), 200)
+    page = registry.render()
+    assert series(page, 'flight_requests_total') == {f'pid="{os.getpid()}",endpoint="predict",status="200"': 1}
+    assert series(page, 'flight_workers') == {f'pid="{os.getpid()}"': 1}
@@ -0,0 +1,86 @@
+"""
+Tests for the micro-batching scheduler (no server needed): python -m pytest test_micro_batcher.py
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from micro_batcher import MicroBatcher
+
+class RecordingModel:
+    """predict_fn that returns row sums and records each batch's size"""
+
+    def __init__(self, error=None):
+        self.batch_sizes = []
+        self.error = error
+
+    def __call__(self, matrix):
+        self.batch_sizes.append(len(matrix))
+        if self.error is not None:
+            raise self.error
+        return matrix.sum(axis=1)
+
+def submit_concurrently(batcher, rows):
+    """Call batcher.predict from one thread per row; returns (results, errors) by row"""
+    results = [None] * len(rows)
+    errors = [None] * len(rows)
+    start = threading.Barrier(len(rows))
+
+    def worker(i):
+        start.wait()
+        try:
+            results[i] = batcher.predict(rows[i], timeout=10)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(rows))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=15)
+    return results, errors
+
+def test_flushes_when_batch_is_full():
+    model = RecordingModel()
+    # A wait far longer than the test: only reaching max_batch_size can flush the batch
+    batcher = MicroBatcher(model, n_features=2, max_batch_size=4, max_wait_ms=60_000)
+    rows = [np.array([i, 1], dtype=np.float32) for i in range(4)]
+    started = time.monotonic()
+    results, errors = submit_concurrently(batcher, rows)
+    assert time.monotonic() - started < 30
+    assert errors == [None] * 4
+    assert results == [float(i + 1) for i in range(4)]
+    assert model.batch_sizes == [4]
+    assert batcher.stats()['batch_size_histogram'] == {'4': 1}
+
+def test_flushes_partial_batch_after_wait():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, n_features=2, max_batch_size=64, max_wait_ms=50)
+    started = time.monotonic()
+    assert batcher.predict(np.array([2, 3], dtype=np.float32), timeout=10) == 5.0
+    # The lone row waited out the window before being scored on its own
+    assert time.monotonic() - started >= 0.05
+    assert model.batch_sizes == [1]
+    stats = batcher.stats()
+    assert stats['batches'] == 1 and stats['requests'] == 1
+
+def test_model_error_reaches_every_caller_in_the_batch():
+    model = RecordingModel(error=ValueError('bad batch'))
+    batcher = MicroBatcher(model, n_features=2, max_batch_size=3, max_wait_ms=60_000)
+    rows = [np.zeros(2, dtype=np.float32) for _ in range(3)]
+    results, errors = submit_concurrently(batcher, rows)
+    assert results == [None] * 3
+    assert all(isinstance(error, ValueError) and str(error) == 'bad batch' for error in errors)
+    assert model.batch_sizes == [3]
+
+def test_keeps_serving_after_a_failed_batch():
+    model = RecordingModel(error=RuntimeError('transient'))
+    batcher = MicroBatcher(model, n_features=1, max_batch_size=1, max_wait_ms=0)
+    with pytest.raises(RuntimeError):
+        batcher.predict(np.ones(1, dtype=np.float32), timeout=10)
+    model.error = None
+    assert batcher.predict(np.full(1, 7, dtype=np.float32), timeout=10) == 7.0
+    assert model.batch_sizes == [1, 1]
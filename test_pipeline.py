@@ -0,0 +1,56 @@
+"""
+Tests for the cached training pipeline: python -m pytest test_pipeline.py
+"""
+
+import numpy as np
+
+from pipeline import STAGES, StageCache, TrainingPipeline
+
+PARAMS = {'n_estimators': 5, 'max_depth': 3, 'random_state': 42}
+
+def run(cache, **kwargs):
+    """(pipeline, model, {stage: 'ran' | 'cached'}) of one training run on 200 sample rows"""
+    pipeline = TrainingPipeline(params=kwargs.pop('params', PARAMS), sample_rows=200, cache=cache, **kwargs)
+    model, encoders, metrics = pipeline.run()
+    return pipeline, model, {stage: status for stage, status, _ in pipeline.log}
+
+def test_rerun_loads_outputs_instead_of_running(tmp_path):
+    cache = StageCache(str(tmp_path))
+    first, model, statuses = run(cache)
+    assert statuses == dict.fromkeys(STAGES, 'ran')
+    assert all(cache.contains(stage, first.keys[stage]) for stage in STAGES)
+
+    second, cached_model, statuses = run(cache)
+    # Only what run() returns is read back; load, parse and split are not touched
+    assert statuses == {'fit': 'cached', 'evaluate': 'cached', 'encode': 'cached'}
+    assert second.keys == first.keys
+    matrix = np.zeros((3, len(model.get_booster().feature_names)), dtype=np.float32)
+    np.testing.assert_array_equal(cached_model.predict(matrix), model.predict(matrix))
+
+def test_changed_parameters_rerun_only_downstream_stages(tmp_path):
+    cache = StageCache(str(tmp_path))
+    first, _, _ = run(cache)
+
+    deeper, _, statuses = run(cache, params=dict(PARAMS, max_depth=4))
+    assert [stage for stage in STAGES if deeper.keys[stage] != first.keys[stage]] == ['fit', 'evaluate']
+    assert statuses == {'encode': 'cached', 'split': 'cached', 'fit': 'ran', 'evaluate': 'ran'}
+
+    resplit, _, statuses = run(cache, test_size=0.3)
+    assert [stage for stage in STAGES if resplit.keys[stage] != first.keys[stage]] == ['split', 'fit', 'evaluate']
+    assert statuses['split'] == statuses['fit'] == 'ran'
+
+def test_source_contents_are_part_of_the_key(tmp_path):
+    source = tmp_path / 'fares.csv'
+    source.write_text('Airline,Price\nIndiGo,3897\n')
+    before = TrainingPipeline(source=str(source), cache=StageCache(str(tmp_path / 'cache'))).keys
+    source.write_text('Airline,Price\nIndiGo,3898\n')
+    after = TrainingPipeline(source=str(source), cache=StageCache(str(tmp_path / 'cache'))).keys
+    assert all(before[stage] != after[stage] for stage in STAGES)
+
+def test_disabled_cache_runs_everything_and_writes_nothing(tmp_path):
+    cache = StageCache(str(tmp_path / 'cache'), enabled=False)
+    _, _, statuses = run(cache)
+    assert statuses == dict.fromkeys(STAGES, 'ran')
+    _, _, statuses = run(cache)
+    assert statuses == dict.fromkeys(STAGES, 'ran')
+    assert not (tmp_path / 'cache').exists()
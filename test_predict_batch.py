@@ -0,0 +1,42 @@
+"""
+Tests for /predict/batch through the Flask test client: python -m pytest test_predict_batch.py
+"""
+
+import app
+from benchmarks.common import sample_payloads
+
+def test_batch_prices_match_single_predictions_in_order(client):
+    payloads = sample_payloads(20, seed=7)
+    response = client.post('/predict/batch', json=payloads)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body['count'], body['errors'], body['status']) == (20, 0, 'success')
+    assert [result['index'] for result in body['predictions']] == list(range(20))
+    for payload, result in zip(payloads, body['predictions']):
+        single = client.post('/predict', json=payload).get_json()
+        assert result['status'] == 'success'
+        assert result['predicted_price'] == single['predicted_price']
+
+def test_batch_reports_bad_rows_by_index(client):
+    good = sample_payloads(3, seed=11)
+    missing = {key: value for key, value in good[0].items() if key != 'dep_time'}
+    unparseable = dict(good[1], duration='2h')
+    response = client.post('/predict/batch', json=[good[0], missing, 'not an itinerary', unparseable, good[2]])
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body['count'], body['errors']) == (2, 3)
+    statuses = [result['status'] for result in body['predictions']]
+    assert statuses == ['success', 'error', 'error', 'error', 'success']
+    assert [result['index'] for result in body['predictions']] == [0, 1, 2, 3, 4]
+    assert body['predictions'][1]['error'] == 'Missing required field: dep_time'
+    assert body['predictions'][2]['error'] == 'Expected a JSON object'
+    single = client.post('/predict', json=good[2]).get_json()
+    assert body['predictions'][4]['predicted_price'] == single['predicted_price']
+
+def test_batch_rejects_non_arrays_and_oversized_batches(client):
+    assert client.post('/predict/batch', json={'airline': 'IndiGo'}).status_code == 400
+    response = client.post('/predict/batch', json=[{}] * (app.MAX_BATCH_SIZE + 1))
+    assert response.status_code == 400
+    assert 'Batch too large' in response.get_json()['error']
+    body = client.post('/predict/batch', json=[]).get_json()
+    assert (body['predictions'], body['count'], body['errors']) == ([], 0, 0)
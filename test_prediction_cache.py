@@ -0,0 +1,87 @@
+"""
+Tests for the prediction cache (no server needed): python -m pytest test_prediction_cache.py
+"""
+
+from prediction_cache import PredictionCache
+
+class FakeClock:
+    """Monotonic clock that only moves when advanced"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+def make_cache(maxsize=3, ttl=10.0):
+    clock = FakeClock()
+    cache = PredictionCache(maxsize=maxsize, ttl=ttl, clock=clock)
+    cache.bind('v1')
+    return cache, clock
+
+def test_hit_and_miss():
+    cache, _ = make_cache()
+    assert cache.get((1, 2)) is None
+    cache.put((1, 2), 4321.0)
+    assert cache.get((1, 2)) == 4321.0
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['size']) == (1, 1, 1)
+
+def test_entry_expires_after_ttl():
+    cache, clock = make_cache(ttl=10.0)
+    cache.put('a', 1.0)
+    clock.advance(9.999)
+    assert cache.get('a') == 1.0
+    clock.advance(0.001)
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+    assert len(cache) == 0
+
+def test_put_refreshes_ttl():
+    cache, clock = make_cache(ttl=10.0)
+    cache.put('a', 1.0)
+    clock.advance(8)
+    cache.put('a', 2.0)
+    clock.advance(8)
+    assert cache.get('a') == 2.0
+
+def test_evicts_least_recently_used():
+    cache, _ = make_cache(maxsize=3)
+    for key in 'abc':
+        cache.put(key, float(ord(key)))
+    # Reading 'a' makes 'b' the least recently used entry
+    assert cache.get('a') is not None
+    cache.put('d', 4.0)
+    assert cache.get('b') is None
+    assert [cache.get(key) is not None for key in 'acd'] == [True, True, True]
+    cache.put('e', 5.0)
+    # 'a', 'c', 'd' were read in that order, so 'a' goes next
+    assert cache.get('a') is None
+    assert cache.stats()['evictions'] == 2
+    assert len(cache) == 3
+
+def test_bind_new_version_invalidates():
+    cache, _ = make_cache()
+    cache.put('a', 1.0)
+    cache.bind('v1')
+    assert cache.get('a') == 1.0
+    cache.bind('v2')
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert stats['model_version'] == 'v2'
+    assert stats['invalidations'] == 1
+
+def test_bind_empty_cache_is_not_an_invalidation():
+    cache, _ = make_cache()
+    cache.bind('v2')
+    assert cache.stats()['invalidations'] == 0
+
+def test_maxsize_zero_disables_cache():
+    cache, _ = make_cache(maxsize=0)
+    cache.put('a', 1.0)
+    assert cache.get('a') is None
+    assert len(cache) == 0
+    assert cache.stats()['misses'] == 0
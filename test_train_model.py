@@ -0,0 +1,50 @@
+"""
+Tests for incremental updates and their holdout gate, run in a scratch directory:
+python -m pytest test_train_model.py
+"""
+
+import json
+
+import joblib
+import pytest
+import xgboost as xgb
+
+import train_model
+from model_bundle import BUNDLE_DIR, SCHEMA_FILE, booster_version
+
+@pytest.fixture
+def published(tmp_path, monkeypatch):
+    """A small model published to an empty working directory, as train_model.py would"""
+    monkeypatch.chdir(tmp_path)
+    X, y, dict_air, dict_des, dict_stp = train_model.preprocess_data(train_model.create_sample_data(300))
+    model = xgb.XGBRegressor(**dict(train_model.MODEL_PARAMS, n_estimators=10)).fit(X, y)
+    return train_model.save_artifacts(model, dict_air, dict_des, dict_stp)
+
+def read_schema():
+    with open(f"{BUNDLE_DIR}/{SCHEMA_FILE}") as f:
+        return json.load(f)
+
+def test_update_worse_than_tolerance_is_not_published(published):
+    # A negative tolerance asks for an impossible improvement, so the gate must refuse
+    assert train_model.update_model(sample_rows=200, rounds=5, tolerance=-1.0) is False
+    assert read_schema()['model_version'] == published['model_version']
+    assert booster_version(joblib.load("xgb_best.pkl")) == published['model_version']
+
+def test_update_within_tolerance_is_published(published):
+    assert train_model.update_model(sample_rows=200, rounds=5, tolerance=float('inf')) is True
+    schema = read_schema()
+    assert schema['model_version'] != published['model_version']
+    assert schema['parent_version'] == published['model_version']
+    assert schema['update']['added_trees'] == 5
+    assert schema['encoders'] == published['encoders']
+    model, *_, version = train_model.load_current_model()
+    assert (version, model.get_booster().num_boosted_rounds()) == (schema['model_version'], 15)
+    # The pickles are replaced too, and carry the same version as the bundle
+    assert booster_version(joblib.load("xgb_best.pkl")) == schema['model_version']
+
+def test_holdout_gate_compares_rmse_against_tolerance(published, monkeypatch):
+    # Holdout RMSE 100 before, 100.5 after the update: within 1%, outside 0.1%
+    scores = iter([100.0, 100.5, 100.0, 100.5])
+    monkeypatch.setattr(train_model, 'rmse', lambda model, X, y: next(scores))
+    assert train_model.update_model(sample_rows=200, rounds=2, tolerance=0.001) is False
+    assert train_model.update_model(sample_rows=200, rounds=2, tolerance=0.01) is True
@@ -0,0 +1,45 @@
+"""
+Tests for the NumPy tree ensemble against XGBoost on the committed bundle:
+python -m pytest test_tree_ensemble.py
+"""
+
+import numpy as np
+import pytest
+
+from benchmarks.common import sample_payloads
+from feature_encoder import FeatureEncoder
+from model_bundle import load_bundle, load_tree_bundle
+from tree_ensemble import FlatTreeEnsemble
+
+@pytest.fixture(scope='module')
+def bundle():
+    model, dict_air, dict_des, dict_stp, schema = load_bundle()
+    ensemble = load_tree_bundle()[0]
+    encoder = FeatureEncoder(dict_air, dict_des, dict_stp, columns=model.get_booster().feature_names)
+    matrix = encoder.encode_many(sample_payloads(500, seed=3))
+    return model, ensemble, matrix
+
+def test_saved_trees_match_booster(bundle):
+    model, ensemble, matrix = bundle
+    np.testing.assert_allclose(ensemble.predict(matrix), model.predict(matrix), rtol=1e-5, atol=1e-2)
+
+def test_converted_trees_match_saved_ones(bundle):
+    model, ensemble, matrix = bundle
+    converted = FlatTreeEnsemble.from_booster(model)
+    assert (converted.n_trees, converted.n_nodes) == (ensemble.n_trees, ensemble.n_nodes)
+    np.testing.assert_array_equal(converted.predict(matrix), ensemble.predict(matrix))
+
+def test_missing_values_follow_default_direction(bundle):
+    model, ensemble, matrix = bundle
+    with_missing = matrix[:50].copy()
+    with_missing[::2, 2] = np.nan
+    with_missing[1::2, 0] = np.nan
+    np.testing.assert_allclose(ensemble.predict(with_missing), model.predict(with_missing), rtol=1e-5, atol=1e-2)
+
+def test_single_row_and_block_boundaries(bundle, monkeypatch):
+    model, ensemble, matrix = bundle
+    np.testing.assert_allclose(ensemble.predict(matrix[0]), model.predict(matrix[:1]), rtol=1e-5, atol=1e-2)
+    # Rows split across blocks score the same as in one block
+    whole = ensemble.predict(matrix)
+    monkeypatch.setattr('tree_ensemble.BLOCK_ROWS', 64)
+    np.testing.assert_array_equal(ensemble.predict(matrix), whole)
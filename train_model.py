@@ -1,21 +1,60 @@
 """
 Model training script for Flight Price Prediction System
 This script recreates the XGBoost model from the original notebook
+
+Usage: python train_model.py [--data Data_Train.xlsx] [--params best_params.json] [--no-cache]
+       python train_model.py --update new_fares.xlsx [--holdout holdout.xlsx]
+                             [--update-rounds 20] [--tolerance 0.01]
+
+Without --data it trains on generated sample data; with it, on raw records
+in the Data_Train.xlsx format (.xlsx, .csv or .parquet), feature-engineered
+by features.py. --params overrides MODEL_PARAMS with the JSON written by
+tune.py. Training goes through pipeline.py's stage cache (.stage_cache/),
+so a rerun only repeats the stages whose inputs changed; --no-cache runs
+them all.
+
+--update adds trees to the current model instead of retraining: the new
+records are encoded with the current encoders, XGBoost continues training
+from the current booster, and the result is only published if its RMSE on
+the holdout (--holdout, or 20% of the new records) is no worse than the
+current model's by more than --tolerance. --update-sample N does the same
+with N freshly generated sample rows.
 """
 
+import argparse
+import json
+import time
+
 import pandas as pd
 import numpy as np
 import joblib
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.metrics import mean_squared_error
 import xgboost as xgb
+import features
+from fileutil import write_atomic
+from model_bundle import booster_version, export_bundle, load_bundle, BUNDLE_DIR
 import warnings
 warnings.filterwarnings('ignore')
 
-def create_sample_data():
+# XGBoost parameters (simplified for demonstration)
+MODEL_PARAMS = {
+    'n_estimators': 100,
+    'max_depth': 6,
+    'learning_rate': 0.1,
+    'subsample': 0.8,
+    'colsample_bytree': 0.8,
+    'random_state': 42,
+}
+
+# Trees added per incremental update
+UPDATE_ROUNDS = 20
+# Allowed relative holdout RMSE increase for an update to be published
+UPDATE_TOLERANCE = 0.01
+
+def create_sample_data(n_samples=1000, seed=42):
     """Create sample flight data for demonstration"""
-    np.random.seed(42)
-    n_samples = 1000
+    np.random.seed(seed)
     
     # Sample data based on the original dataset structure
     airlines = ['Trujet', 'SpiceJet', 'Air Asia', 'IndiGo', 'GoAir', 'Vistara', 
@@ -62,69 +101,144 @@ def create_sample_data():
     
     return df
 
-def preprocess_data(df):
-    """Preprocess the data for training"""
-    # Create encoders
-    airlines = df.groupby(['Airline'])['Price'].mean().sort_values().index
-    dict_air = {key: idx for idx, key in enumerate(airlines, 0)}
-    
-    destinations = df.groupby(['Destination'])['Price'].mean().sort_values().index
-    dict_des = {key: idx for idx, key in enumerate(destinations, 0)}
-    
-    dict_stp = {'non-stop': 0, '1 stop': 1, '2 stops': 2, '3 stops': 3, '4 stops': 4}
-    
-    # Encode categorical variables
+def fit_encoders(df):
+    """Create the airline, destination and stops encoders from training data"""
+    return features.fit_encoders(df, df['Price'])
+
+def apply_encoders(df, dict_air, dict_des, dict_stp):
+    """Encode categorical variables in place and split into features and target"""
     df['Airline'] = df['Airline'].map(dict_air)
     df['Destination'] = df['Destination'].map(dict_des)
     df['Total_Stops'] = df['Total_Stops'].map(dict_stp)
     
-    # Prepare features and target
     X = df.drop(['Source', 'Price'], axis=1)
     y = df['Price']
     
+    return X, y
+
+def preprocess_data(df):
+    """Preprocess the data for training"""
+    dict_air, dict_des, dict_stp = fit_encoders(df)
+    X, y = apply_encoders(df, dict_air, dict_des, dict_stp)
     return X, y, dict_air, dict_des, dict_stp
 
-def train_model():
-    """Train the XGBoost model"""
-    print("Creating sample data...")
-    df = create_sample_data()
-    
-    print("Preprocessing data...")
-    X, y, dict_air, dict_des, dict_stp = preprocess_data(df)
-    
-    print("Splitting data...")
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    
-    print("Training XGBoost model...")
-    # XGBoost parameters (simplified for demonstration)
-    model = xgb.XGBRegressor(
-        n_estimators=100,
-        max_depth=6,
-        learning_rate=0.1,
-        subsample=0.8,
-        colsample_bytree=0.8,
-        random_state=42
-    )
-    
-    model.fit(X_train, y_train)
+def save_artifacts(model, dict_air, dict_des, dict_stp, metadata=None):
+    """Write the pickles (each via a temporary file and rename) and the native bundle"""
+    for obj, path in [(model, "xgb_best.pkl"), (dict_air, "dict_air.pkl"),
+                      (dict_des, "dict_des.pkl"), (dict_stp, "dict_stp.pkl")]:
+        with write_atomic(path, 'wb') as f:
+            joblib.dump(obj, f)
+    return export_bundle(model, dict_air, dict_des, dict_stp, metadata=metadata)
+
+def load_current_model():
+    """The published (model, dict_air, dict_des, dict_stp, version), preferring the native bundle"""
+    try:
+        model, dict_air, dict_des, dict_stp, schema = load_bundle(BUNDLE_DIR)
+        return model, dict_air, dict_des, dict_stp, schema['model_version']
+    except (OSError, ValueError):
+        model = joblib.load("xgb_best.pkl")
+        return (model, joblib.load("dict_air.pkl"), joblib.load("dict_des.pkl"),
+                joblib.load("dict_stp.pkl"), booster_version(model))
+
+def rmse(model, X, y):
+    return float(np.sqrt(mean_squared_error(y, model.predict(X))))
+
+def train_model(data_path=None, params_path=None, use_cache=True):
+    """Train the XGBoost model on sample data, or on raw records from data_path
+
+    Runs through pipeline.TrainingPipeline, which reuses every stage whose
+    inputs, parameters and code are unchanged since an earlier run.
+    """
+    from pipeline import StageCache, TrainingPipeline
+
+    params = dict(MODEL_PARAMS)
+    if params_path:
+        with open(params_path) as f:
+            params.update(json.load(f))
+        print(f"Using tuned parameters from {params_path}: {params}")
     
-    print("Evaluating model...")
-    y_pred = model.predict(X_test)
-    mse = mean_squared_error(y_test, y_pred)
-    r2 = r2_score(y_test, y_pred)
+    print(f"Training on {data_path or 'sample data'} (stage cache {'on' if use_cache else 'off'})...")
+    pipeline = TrainingPipeline(source=data_path, params=params, cache=StageCache(enabled=use_cache))
+    model, encoders, metrics = pipeline.run()
     
     print(f"Model Performance:")
-    print(f"RMSE: {np.sqrt(mse):.2f}")
-    print(f"R² Score: {r2:.4f}")
+    print(f"RMSE: {metrics['rmse']:.2f}")
+    print(f"R² Score: {metrics['r2']:.4f}")
     
-    print("Saving model and encoders...")
-    joblib.dump(model, "xgb_best.pkl")
-    joblib.dump(dict_air, "dict_air.pkl")
-    joblib.dump(dict_des, "dict_des.pkl")
-    joblib.dump(dict_stp, "dict_stp.pkl")
+    dict_air, dict_des, dict_stp = encoders['airline'], encoders['destination'], encoders['stops']
+    print("Saving model, encoders and native model bundle...")
+    schema = save_artifacts(model, dict_air, dict_des, dict_stp)
     
     print("Model training completed successfully!")
     print(f"Saved files: xgb_best.pkl, dict_air.pkl, dict_des.pkl, dict_stp.pkl")
+    print(f"Saved bundle: {BUNDLE_DIR}/ (version {schema['model_version']})")
+
+def update_model(data_path=None, sample_rows=None, holdout_path=None, rounds=UPDATE_ROUNDS,
+                 tolerance=UPDATE_TOLERANCE, params_path=None):
+    """Add trees fitted on new records to the published model; publish only if the holdout RMSE holds
+    
+    Returns True when the updated model was published.
+    """
+    start = time.perf_counter()
+    model, dict_air, dict_des, dict_stp, version = load_current_model()
+    booster = model.get_booster()
+    columns = booster.feature_names
+    print(f"Current model {version}: {booster.num_boosted_rounds()} trees")
+    
+    # New records are encoded with the current encoders so category codes keep their meaning
+    if data_path:
+        X_new, y_new = features.encode_training_set(features.load_raw(data_path), dict_air, dict_des,
+                                                    dict_stp, columns)
+    else:
+        df = create_sample_data(n_samples=sample_rows, seed=int(time.time()) % 2**31)
+        X_new, y_new = apply_encoders(df, dict_air, dict_des, dict_stp)
+    if holdout_path:
+        X_holdout, y_holdout = features.encode_training_set(features.load_raw(holdout_path), dict_air,
+                                                            dict_des, dict_stp, columns)
+    else:
+        X_new, X_holdout, y_new, y_holdout = train_test_split(X_new, y_new, test_size=0.2, random_state=42)
+    print(f"Updating with {len(X_new)} new rows, checking on {len(X_holdout)} holdout rows")
+    
+    params = dict(MODEL_PARAMS)
+    if params_path:
+        with open(params_path) as f:
+            params.update(json.load(f))
+    params['n_estimators'] = rounds
+    updated = xgb.XGBRegressor(**params)
+    updated.fit(X_new[columns], y_new, xgb_model=booster)
+    
+    before = rmse(model, X_holdout[columns], y_holdout)
+    after = rmse(updated, X_holdout[columns], y_holdout)
+    elapsed = time.perf_counter() - start
+    print(f"Holdout RMSE {before:.2f} -> {after:.2f} ({after / before - 1:+.2%}) "
+          f"with {rounds} added trees in {elapsed:.1f}s")
+    if after > before * (1 + tolerance):
+        print(f"Not published: holdout RMSE got worse by more than {tolerance:.0%}")
+        return False
+    
+    schema = save_artifacts(updated, dict_air, dict_des, dict_stp, metadata={
+        'parent_version': version,
+        'update': {'rows': len(X_new), 'added_trees': rounds, 'holdout_rows': len(X_holdout),
+                   'holdout_rmse_before': round(before, 4), 'holdout_rmse_after': round(after, 4)},
+    })
+    print(f"Published model {schema['model_version']} ({updated.get_booster().num_boosted_rounds()} trees) "
+          f"to {BUNDLE_DIR}/ and the pickles")
+    return True
 
 if __name__ == "__main__":
-    train_model()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', help='Raw records to train on (default: generated sample data)')
+    parser.add_argument('--params', help='JSON of XGBRegressor parameters from tune.py')
+    parser.add_argument('--no-cache', action='store_true', help='Run every training stage, ignoring .stage_cache/')
+    parser.add_argument('--update', metavar='DATA', help='Raw records to add to the current model')
+    parser.add_argument('--update-sample', type=int, metavar='N', help='Update with N generated sample rows')
+    parser.add_argument('--holdout', help='Raw records to check an update on (default: 20%% of the new ones)')
+    parser.add_argument('--update-rounds', type=int, default=UPDATE_ROUNDS, help='Trees added per update')
+    parser.add_argument('--tolerance', type=float, default=UPDATE_TOLERANCE,
+                        help='Allowed relative holdout RMSE increase for an update (0.01 = 1%%)')
+    args = parser.parse_args()
+    if args.update or args.update_sample:
+        published = update_model(args.update, args.update_sample, args.holdout, args.update_rounds,
+                                 args.tolerance, args.params)
+        raise SystemExit(0 if published else 1)
+    train_model(args.data, args.params, use_cache=not args.no_cache)
@@ -0,0 +1,172 @@
+"""
+Pure-NumPy evaluator for the trained XGBoost tree ensemble
+The trees are flattened into structure-of-arrays buffers (feature index,
+threshold, children, default direction, leaf value) and batches are scored
+by stepping every row through all trees one level at a time. Scoring needs
+only NumPy; xgboost is imported only to convert a booster.
+
+Usage: python tree_ensemble.py   (check against model.predict on sample data)
+"""
+
+import json
+
+import numpy as np
+
+# Objectives whose prediction is the raw margin (identity link)
+IDENTITY_OBJECTIVES = {'reg:squarederror', 'reg:linear', 'reg:pseudohubererror', 'reg:absoluteerror'}
+
+# Rows scored per block, bounding the (rows x trees) work arrays
+BLOCK_ROWS = 4096
+
+class FlatTreeEnsemble:
+    """Tree ensemble stored as flat node arrays shared by all trees
+
+    Leaves point to themselves as both children, so rows that reach a leaf
+    early simply stay there while deeper trees finish.
+    """
+
+    def __init__(self, feature, threshold, left, right, default_left, value, roots,
+                 base_score, max_depth, feature_names=None):
+        self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float32)
+        self.left = np.ascontiguousarray(left, dtype=np.int32)
+        self.right = np.ascontiguousarray(right, dtype=np.int32)
+        self.default_left = np.ascontiguousarray(default_left, dtype=bool)
+        self.value = np.ascontiguousarray(value, dtype=np.float32)
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        self.base_score = float(base_score)
+        self.max_depth = int(max_depth)
+        self.feature_names = list(feature_names) if feature_names else None
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @classmethod
+    def from_json(cls, model_json, iteration_range=(0, 0)):
+        """Build from the JSON model format written by Booster.save_raw('json')"""
+        learner = model_json['learner']
+        objective = learner['objective']['name']
+        if objective not in IDENTITY_OBJECTIVES:
+            raise ValueError(f"Unsupported objective for NumPy scoring: {objective}")
+        booster = learner['gradient_booster']
+        if booster['name'] != 'gbtree':
+            raise ValueError(f"Unsupported booster for NumPy scoring: {booster['name']}")
+
+        trees = booster['model']['trees']
+        begin, end = iteration_range
+        if end:
+            per_iteration = int(booster['model']['gbtree_model_param']['num_parallel_tree'])
+            trees = trees[begin * per_iteration:end * per_iteration]
+
+        feature, threshold, left, right, default_left, value, roots = [], [], [], [], [], [], []
+        max_depth = 0
+        offset = 0
+        for tree in trees:
+            if tree['categories_nodes']:
+                raise ValueError("Categorical splits are not supported for NumPy scoring")
+            tree_left = np.asarray(tree['left_children'], dtype=np.int64)
+            tree_right = np.asarray(tree['right_children'], dtype=np.int64)
+            is_leaf = tree_left == -1
+            own = np.arange(len(tree_left)) + offset
+
+            feature.append(np.where(is_leaf, 0, tree['split_indices']))
+            threshold.append(np.where(is_leaf, 0.0, tree['split_conditions']))
+            left.append(np.where(is_leaf, own, tree_left + offset))
+            right.append(np.where(is_leaf, own, tree_right + offset))
+            default_left.append(np.asarray(tree['default_left'], dtype=bool))
+            value.append(np.where(is_leaf, tree['split_conditions'], 0.0))
+            roots.append(offset)
+            max_depth = max(max_depth, _tree_depth(tree_left, tree_right))
+            offset += len(tree_left)
+
+        base_score = learner['learner_model_param']['base_score']
+        return cls(
+            np.concatenate(feature), np.concatenate(threshold), np.concatenate(left),
+            np.concatenate(right), np.concatenate(default_left), np.concatenate(value),
+            roots, float(str(base_score).strip('[]')), max_depth,
+            feature_names=learner.get('feature_names'),
+        )
+
+    @classmethod
+    def from_booster(cls, model):
+        """Convert a trained Booster or XGBRegressor"""
+        booster = model.get_booster() if hasattr(model, 'get_booster') else model
+        best_iteration = getattr(model, 'best_iteration', None)
+        iteration_range = (0, best_iteration + 1) if best_iteration is not None else (0, 0)
+        ensemble = cls.from_json(json.loads(bytes(booster.save_raw(raw_format='json'))), iteration_range)
+        if booster.feature_names:
+            ensemble.feature_names = list(booster.feature_names)
+        return ensemble
+
+    def save(self, path):
+        """Write the flat arrays to an .npz file"""
+        np.savez(
+            path, feature=self.feature, threshold=self.threshold, left=self.left,
+            right=self.right, default_left=self.default_left, value=self.value,
+            roots=self.roots, base_score=np.float64(self.base_score),
+            max_depth=np.int64(self.max_depth),
+            feature_names=np.array(self.feature_names or [], dtype=str),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Read an ensemble written by save()"""
+        with np.load(path) as data:
+            return cls(
+                data['feature'], data['threshold'], data['left'], data['right'],
+                data['default_left'], data['value'], data['roots'],
+                float(data['base_score']), int(data['max_depth']),
+                feature_names=[str(name) for name in data['feature_names']],
+            )
+
+    def predict(self, matrix):
+        """Score a 2-D feature matrix, returning float32 predictions"""
+        matrix = np.asarray(matrix, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        out = np.empty(len(matrix), dtype=np.float32)
+        for start in range(0, len(matrix), BLOCK_ROWS):
+            block = matrix[start:start + BLOCK_ROWS]
+            out[start:start + len(block)] = self._predict_block(block)
+        return out
+
+    def _predict_block(self, block):
+        rows = np.arange(len(block))[:, None]
+        node = np.broadcast_to(self.roots, (len(block), self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            x = block[rows, self.feature[node]]
+            go_left = np.where(np.isnan(x), self.default_left[node], x < self.threshold[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.value[node].sum(axis=1, dtype=np.float64) + self.base_score
+
+def _tree_depth(left, right):
+    """Number of splits on the longest root-to-leaf path"""
+    depth = 0
+    level = [0]
+    while True:
+        level = [child for n in level if left[n] != -1 for child in (left[n], right[n])]
+        if not level:
+            return depth
+        depth += 1
+
+if __name__ == "__main__":
+    from model_bundle import load_bundle
+    from train_model import create_sample_data, preprocess_data
+
+    model = load_bundle()[0]
+    X, y, *_ = preprocess_data(create_sample_data())
+    matrix = X.to_numpy(dtype=np.float32)
+
+    ensemble = FlatTreeEnsemble.from_booster(model)
+    expected = model.predict(X)
+    actual = ensemble.predict(matrix)
+
+    print(f"Trees: {ensemble.n_trees}, nodes: {ensemble.n_nodes}, max depth: {ensemble.max_depth}")
+    print(f"Max abs difference vs model.predict on {len(matrix)} rows: {np.abs(actual - expected).max():.6f}")
+    np.testing.assert_allclose(actual, expected, rtol=1e-5, atol=1e-2)
+    print("[OK] NumPy ensemble matches model.predict")
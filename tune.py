@@ -0,0 +1,218 @@
+"""
+Budgeted hyperparameter search for the Flight Price Prediction model
+Searches the notebook's GridSearchCV param_grid with Hyperband: brackets
+of successive halving that start many configurations on a few boosting
+rounds and give more rounds only to the best third at each rung. Boosting
+rounds are the resource, so n_estimators is not searched directly: each
+surviving configuration continues training its fold boosters from where
+the previous rung stopped, and the number of rounds comes from early
+stopping on the mean validation curve across the K folds (as xgb.cv picks
+it). The search stops early when the time or round budget runs out and
+keeps the best configuration seen.
+
+Usage: python tune.py [--data Data_Train.xlsx] [--time-budget 600] [--round-budget N]
+                      [--folds 5] [--eta 3] [--brackets N] [--output best_params.json]
+
+The output holds exactly the keyword arguments for
+xgb.XGBRegressor(**best_params); `python train_model.py --params best_params.json`
+trains with them.
+"""
+
+import argparse
+import itertools
+import json
+import math
+import random
+import time
+
+import numpy as np
+import xgboost as xgb
+from sklearn.model_selection import KFold
+
+from fileutil import write_atomic
+
+# The notebook's GridSearchCV grid; n_estimators only sets the maximum rounds here
+PARAM_GRID = {
+    'n_estimators': [100, 200, 300],
+    'max_depth': [3, 5, 7],
+    'learning_rate': [0.01, 0.1, 0.2],
+    'subsample': [0.8, 1.0],
+    'colsample_bytree': [0.8, 1.0]
+}
+
+DEFAULT_OUTPUT = 'best_params.json'
+
+class BudgetExhausted(Exception):
+    pass
+
+class Trial:
+    """One configuration: its fold boosters and their validation RMSE per round"""
+
+    def __init__(self, params, n_folds):
+        self.params = params
+        self.boosters = [None] * n_folds
+        self.curves = [[] for _ in range(n_folds)]
+
+    @property
+    def rounds(self):
+        return len(self.curves[0])
+
+    def mean_curve(self):
+        return np.mean(self.curves, axis=0)
+
+    @property
+    def score(self):
+        return float(self.mean_curve().min()) if self.rounds else math.inf
+
+    @property
+    def best_rounds(self):
+        return int(self.mean_curve().argmin()) + 1
+
+    def converged(self, early_stopping_rounds):
+        """True once the mean validation RMSE stopped improving"""
+        return self.rounds > 0 and self.rounds - self.best_rounds >= early_stopping_rounds
+
+    def xgb_params(self):
+        """Keyword arguments for xgb.XGBRegressor"""
+        return dict(self.params, n_estimators=self.best_rounds)
+
+class HalvingSearch:
+    """Hyperband over a parameter grid with K-fold early-stopped boosting rounds as the resource"""
+
+    def __init__(self, X, y, param_grid=PARAM_GRID, folds=5, eta=3, min_rounds=None,
+                 early_stopping_rounds=20, time_budget=None, round_budget=None, seed=42, nthread=None):
+        grid = {name: values for name, values in param_grid.items() if name != 'n_estimators'}
+        self.configs = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+        self.max_rounds = max(param_grid.get('n_estimators', [300]))
+        self.eta = eta
+        self.min_rounds = min_rounds or max(1, round(self.max_rounds / eta ** 3))
+        self.early_stopping_rounds = early_stopping_rounds
+        self.time_budget = time_budget
+        self.round_budget = round_budget
+        self.rng = random.Random(seed)
+        self.base_params = {'objective': 'reg:squarederror', 'eval_metric': 'rmse', 'seed': seed}
+        if nthread:
+            self.base_params['nthread'] = nthread
+
+        X = np.asarray(X, dtype=np.float32)
+        y = np.asarray(y, dtype=np.float32)
+        self.folds = []
+        for train_index, valid_index in KFold(n_splits=folds, shuffle=True, random_state=seed).split(X):
+            self.folds.append((xgb.DMatrix(X[train_index], label=y[train_index]),
+                               xgb.DMatrix(X[valid_index], label=y[valid_index])))
+
+        self.trials = []
+        self.rounds_used = 0
+        self.started = None
+        self.exhausted = False
+
+    def _check_budget(self):
+        if self.time_budget is not None and time.perf_counter() - self.started > self.time_budget:
+            raise BudgetExhausted(f"time budget of {self.time_budget:.0f}s used")
+        if self.round_budget is not None and self.rounds_used >= self.round_budget:
+            raise BudgetExhausted(f"round budget of {self.round_budget} used")
+
+    def _advance(self, trial, rounds):
+        """Continue every fold booster of trial up to rounds (or until it early-stops)"""
+        if trial.converged(self.early_stopping_rounds) or trial.rounds >= rounds:
+            return
+        self._check_budget()
+        params = dict(self.base_params, **trial.params)
+        extra = rounds - trial.rounds
+        for fold, (dtrain, dvalid) in enumerate(self.folds):
+            history = {}
+            trial.boosters[fold] = xgb.train(params, dtrain, num_boost_round=extra,
+                                             xgb_model=trial.boosters[fold], evals=[(dvalid, 'valid')],
+                                             evals_result=history, verbose_eval=False)
+            trial.curves[fold].extend(history['valid']['rmse'])
+        self.rounds_used += extra * len(self.folds)
+
+    def run_bracket(self, bracket):
+        """Successive halving from n configurations at max_rounds / eta**bracket rounds"""
+        n_brackets = self.n_brackets()
+        n_configs = min(len(self.configs),
+                        math.ceil(n_brackets / (bracket + 1) * self.eta ** bracket))
+        trials = [Trial(params, len(self.folds)) for params in self.rng.sample(self.configs, n_configs)]
+        self.trials.extend(trials)
+        for rung in range(bracket + 1):
+            rounds = min(self.max_rounds, round(self.max_rounds * self.eta ** (rung - bracket)))
+            for trial in trials:
+                self._advance(trial, rounds)
+            trials.sort(key=lambda trial: trial.score)
+            print(f"  bracket {bracket} rung {rung}: {len(trials):>3} configs at {rounds:>4} rounds, "
+                  f"best rmse {trials[0].score:.2f} ({self.elapsed():.0f}s, {self.rounds_used:,} rounds)")
+            trials = trials[:max(1, len(trials) // self.eta)]
+
+    def n_brackets(self):
+        return int(math.log(self.max_rounds / self.min_rounds, self.eta) + 1e-9) + 1
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def run(self, brackets=None):
+        """Run the brackets, most aggressive first, and return the best trial"""
+        self.started = time.perf_counter()
+        brackets = self.n_brackets() if brackets is None else min(brackets, self.n_brackets())
+        try:
+            for bracket in reversed(range(self.n_brackets() - brackets, self.n_brackets())):
+                self.run_bracket(bracket)
+        except BudgetExhausted as e:
+            self.exhausted = True
+            print(f"Stopping early: {e}")
+        return self.best()
+
+    def best(self):
+        scored = [trial for trial in self.trials if trial.rounds]
+        if not scored:
+            raise RuntimeError("Budget ran out before any configuration was evaluated")
+        return min(scored, key=lambda trial: trial.score)
+
+def load_training_data(data_path=None):
+    """(X, y) from raw records through features.py, or from train_model's sample data"""
+    if data_path:
+        import features
+        X, y, *_ = features.build_training_set(features.load_raw(data_path))
+    else:
+        from train_model import create_sample_data, preprocess_data
+        X, y, *_ = preprocess_data(create_sample_data())
+    return X, y
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', help='Raw records to tune on (default: train_model sample data)')
+    parser.add_argument('--time-budget', type=float, help='Seconds to search for (default: unlimited)')
+    parser.add_argument('--round-budget', type=int, help='Total boosting rounds across all fits')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--eta', type=int, default=3, help='Keep 1/eta of configurations per rung')
+    parser.add_argument('--brackets', type=int, help='Hyperband brackets to run (1 = plain successive halving)')
+    parser.add_argument('--early-stopping-rounds', type=int, default=20)
+    parser.add_argument('--nthread', type=int, help='XGBoost threads per fit (default: all cores)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    X, y = load_training_data(args.data)
+    search = HalvingSearch(X, y, folds=args.folds, eta=args.eta,
+                           early_stopping_rounds=args.early_stopping_rounds, time_budget=args.time_budget,
+                           round_budget=args.round_budget, seed=args.seed, nthread=args.nthread)
+    grid_size = len(search.configs) * len(PARAM_GRID['n_estimators'])
+    grid_rounds = len(search.configs) * sum(PARAM_GRID['n_estimators']) * args.folds
+    print(f"Tuning on {len(y):,} rows, {args.folds} folds: {len(search.configs)} configurations, "
+          f"{search.n_brackets()} brackets of {search.min_rounds}..{search.max_rounds} rounds")
+
+    best = search.run(args.brackets)
+    best_params = best.xgb_params()
+
+    with write_atomic(args.output) as f:
+        json.dump(best_params, f, indent=2)
+        f.write('\n')
+
+    print(f"\nBest cross-validated RMSE {best.score:.2f} with {best_params}")
+    evaluated = sum(1 for trial in search.trials if trial.rounds)
+    print(f"Evaluated {evaluated} trials with {search.rounds_used:,} boosting rounds in "
+          f"{search.elapsed():.0f}s; GridSearchCV over the same grid fits {grid_size * args.folds} "
+          f"models with {grid_rounds:,} rounds")
+    print(f"Best params written to {args.output}")
+
+if __name__ == "__main__":
+    main()